@@ -1,8 +1,12 @@
 -- Price Data Table Initialization Script
 -- Execute this SQL in your MySQL database before running the application
+-- Fresh databases: this file already contains the schema of scripts/migrations/003-008
+-- (rollup / minute bars / latest price / daily stats tables, partition-ready price_data key);
+-- do NOT apply those migrations on top of it. Existing databases upgrade with the migrations instead.
+-- Optional monthly partitioning of price_data: python src/maintenance.py partition-price-data
 
 CREATE TABLE IF NOT EXISTS price_data (
-  id INT AUTO_INCREMENT PRIMARY KEY,
+  id BIGINT NOT NULL AUTO_INCREMENT,
   trade_date DATE NOT NULL,
   trade_time TIME NOT NULL,
   data_type VARCHAR(50) NOT NULL,
@@ -10,10 +14,11 @@ CREATE TABLE IF NOT EXISTS price_data (
   recycle_price DECIMAL(10, 4) DEFAULT 0,
   high_price DECIMAL(10, 4) DEFAULT 0,
   low_price DECIMAL(10, 4) DEFAULT 0,
-  source VARCHAR(30) DEFAULT 'playwright' COMMENT '数据来源: gold_api/exchange_rate/fawazahmed0/playwright',
-  currency VARCHAR(10) DEFAULT 'CNY' COMMENT '计价币种: CNY/USD',
+  source VARCHAR(30) NOT NULL DEFAULT 'playwright' COMMENT '数据来源: gold_api/exchange_rate/fawazahmed0/playwright',
+  currency VARCHAR(10) NOT NULL DEFAULT 'CNY' COMMENT '计价币种: CNY/USD',
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  UNIQUE KEY uk_price_data (trade_date, trade_time, data_type, source, currency),
+  PRIMARY KEY (trade_date, trade_time, data_type, source, currency),
+  INDEX idx_id (id),
   INDEX idx_type_created (data_type, created_at DESC),
   INDEX idx_date_type_recycle (trade_date, data_type, recycle_price),
   INDEX idx_type_date_created (data_type, trade_date, created_at),
@@ -45,3 +50,68 @@ CREATE TABLE IF NOT EXISTS daily_ohlc (
   UNIQUE KEY uk_date_type_source (trade_date, data_type, source),
   INDEX idx_type_date (data_type, trade_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Daily OHLC rollup of price_data (migration 003)
+CREATE TABLE IF NOT EXISTS price_daily_rollup (
+  trade_date DATE NOT NULL,
+  data_type VARCHAR(50) NOT NULL,
+  open_price DECIMAL(10, 4) NOT NULL,
+  high_price DECIMAL(10, 4) NOT NULL,
+  low_price DECIMAL(10, 4) NOT NULL,
+  close_price DECIMAL(10, 4) NOT NULL,
+  open_time TIME NOT NULL COMMENT '当日首个点的 trade_time，用于增量更新 open',
+  close_time TIME NOT NULL COMMENT '当日最后一个点的 trade_time，用于增量更新 close',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (data_type, trade_date),
+  INDEX idx_date (trade_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 1-minute OHLC bars (migrations 004 + 008)
+CREATE TABLE IF NOT EXISTS minute_ohlc (
+  trade_date DATE NOT NULL,
+  minute_time TIME NOT NULL COMMENT '分钟起点 HH:MM:00（北京时间）',
+  data_type VARCHAR(50) NOT NULL,
+  source VARCHAR(30) NOT NULL,
+  currency VARCHAR(10) NOT NULL DEFAULT 'CNY',
+  open_price DECIMAL(10, 4) NOT NULL,
+  high_price DECIMAL(10, 4) NOT NULL,
+  low_price DECIMAL(10, 4) NOT NULL,
+  close_price DECIMAL(10, 4) NOT NULL,
+  real_time_price DECIMAL(10, 4) NOT NULL DEFAULT 0 COMMENT '分钟内最后一个点的 real_time_price',
+  first_time TIME NOT NULL COMMENT '分钟内首个点的 trade_time，用于合并 open',
+  last_time TIME NOT NULL COMMENT '分钟内最后一个点的 trade_time，用于合并 close',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (data_type, trade_date, minute_time, source),
+  INDEX idx_trade_date (trade_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Latest tick per data_type / source / currency (migration 005)
+CREATE TABLE IF NOT EXISTS latest_price (
+  data_type VARCHAR(50) NOT NULL,
+  source VARCHAR(30) NOT NULL,
+  currency VARCHAR(10) NOT NULL,
+  trade_date DATE NOT NULL,
+  trade_time TIME NOT NULL,
+  tick_at DATETIME NOT NULL COMMENT 'trade_date + trade_time，迟到 / 重放的旧点不覆盖新点',
+  real_time_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  recycle_price DECIMAL(10, 4) NOT NULL,
+  high_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  low_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '该点入库时刻（与 price_data.created_at 同义）',
+  PRIMARY KEY (data_type, source, currency)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Incremental daily stats behind /api/price-overview (migration 006)
+CREATE TABLE IF NOT EXISTS daily_stats (
+  data_type VARCHAR(50) NOT NULL,
+  trade_date DATE NOT NULL COMMENT '当前价所属交易日（北京时间）',
+  tick_at DATETIME NOT NULL COMMENT '当前价的 trade_date + trade_time',
+  recycle_price DECIMAL(10, 4) NOT NULL,
+  real_time_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  source VARCHAR(30) NULL,
+  updated_at DATETIME NULL COMMENT '当前价入库时刻',
+  yesterday_close DECIMAL(10, 4) NULL COMMENT 'trade_date 前一日的收盘价',
+  today_high DECIMAL(10, 4) NULL COMMENT 'trade_date 当日最高',
+  today_low DECIMAL(10, 4) NULL COMMENT 'trade_date 当日最低',
+  PRIMARY KEY (data_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
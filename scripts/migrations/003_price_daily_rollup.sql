@@ -0,0 +1,19 @@
+-- Daily OHLC rollup of price_data (one row per trade_date + data_type)
+-- Existing databases only: scripts/init.sql already creates this schema on fresh installs.
+-- Maintained incrementally by PriceWriter.batch_insert_data.
+-- Backfill existing history once after creating the table:
+--   python src/maintenance.py rebuild-daily-rollup --start 2000-01-01
+
+CREATE TABLE IF NOT EXISTS price_daily_rollup (
+  trade_date DATE NOT NULL,
+  data_type VARCHAR(50) NOT NULL,
+  open_price DECIMAL(10, 4) NOT NULL,
+  high_price DECIMAL(10, 4) NOT NULL,
+  low_price DECIMAL(10, 4) NOT NULL,
+  close_price DECIMAL(10, 4) NOT NULL,
+  open_time TIME NOT NULL COMMENT '当日首个点的 trade_time，用于增量更新 open',
+  close_time TIME NOT NULL COMMENT '当日最后一个点的 trade_time，用于增量更新 close',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (data_type, trade_date),
+  INDEX idx_date (trade_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,22 @@
+-- 1-minute OHLC bars of price_data (one row per data_type + source + minute, recycle_price)
+-- Existing databases only: scripts/init.sql already creates this schema on fresh installs.
+-- Closed bars are upserted by the ingest pipeline (ingest.bars).
+-- Backfill recent history once after creating the table:
+--   python src/maintenance.py rebuild-minute-bars --start 2026-10-01
+
+CREATE TABLE IF NOT EXISTS minute_ohlc (
+  trade_date DATE NOT NULL,
+  minute_time TIME NOT NULL COMMENT '分钟起点 HH:MM:00（北京时间）',
+  data_type VARCHAR(50) NOT NULL,
+  source VARCHAR(30) NOT NULL,
+  currency VARCHAR(10) NOT NULL DEFAULT 'CNY',
+  open_price DECIMAL(10, 4) NOT NULL,
+  high_price DECIMAL(10, 4) NOT NULL,
+  low_price DECIMAL(10, 4) NOT NULL,
+  close_price DECIMAL(10, 4) NOT NULL,
+  real_time_price DECIMAL(10, 4) NOT NULL DEFAULT 0 COMMENT '分钟内最后一个点的 real_time_price',
+  first_time TIME NOT NULL COMMENT '分钟内首个点的 trade_time，用于合并 open',
+  last_time TIME NOT NULL COMMENT '分钟内最后一个点的 trade_time，用于合并 close',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (data_type, trade_date, minute_time, source)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,32 @@
+-- Latest tick per (data_type, source, currency): O(1) point lookups for "latest" readers.
+-- Existing databases only: scripts/init.sql already creates this schema on fresh installs.
+-- Apply BEFORE deploying the code that writes it (PriceWriter.batch_insert_data upserts it in the
+-- same transaction as the tick insert). The INSERT below backfills it once from price_data.
+
+CREATE TABLE IF NOT EXISTS latest_price (
+  data_type VARCHAR(50) NOT NULL,
+  source VARCHAR(30) NOT NULL,
+  currency VARCHAR(10) NOT NULL,
+  trade_date DATE NOT NULL,
+  trade_time TIME NOT NULL,
+  tick_at DATETIME NOT NULL COMMENT 'trade_date + trade_time，迟到 / 重放的旧点不覆盖新点',
+  real_time_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  recycle_price DECIMAL(10, 4) NOT NULL,
+  high_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  low_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '该点入库时刻（与 price_data.created_at 同义）',
+  PRIMARY KEY (data_type, source, currency)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO latest_price
+  (data_type, source, currency, trade_date, trade_time, tick_at,
+   real_time_price, recycle_price, high_price, low_price, created_at)
+SELECT data_type, COALESCE(source, 'playwright'), COALESCE(currency, 'CNY'), trade_date, trade_time,
+       TIMESTAMP(trade_date, trade_time), COALESCE(real_time_price, 0), recycle_price,
+       COALESCE(high_price, 0), COALESCE(low_price, 0), created_at
+FROM (
+  SELECT *, ROW_NUMBER() OVER (PARTITION BY data_type, source, currency
+                               ORDER BY trade_date DESC, trade_time DESC, created_at DESC) AS rn
+  FROM price_data WHERE recycle_price > 0
+) sub WHERE rn = 1
+ON DUPLICATE KEY UPDATE tick_at = tick_at;
@@ -0,0 +1,19 @@
+-- Incremental per-data_type daily stats behind /api/price-overview (one row per data_type).
+-- Existing databases only: scripts/init.sql already creates this schema on fresh installs.
+-- Written through from the in-memory DailyStatsStore after every ingested batch; seeded from
+-- price_data on first start. Check against raw ticks with:
+--   python src/maintenance.py reconcile-daily-stats [--fix]
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+  data_type VARCHAR(50) NOT NULL,
+  trade_date DATE NOT NULL COMMENT '当前价所属交易日（北京时间）',
+  tick_at DATETIME NOT NULL COMMENT '当前价的 trade_date + trade_time',
+  recycle_price DECIMAL(10, 4) NOT NULL,
+  real_time_price DECIMAL(10, 4) NOT NULL DEFAULT 0,
+  source VARCHAR(30) NULL,
+  updated_at DATETIME NULL COMMENT '当前价入库时刻',
+  yesterday_close DECIMAL(10, 4) NULL COMMENT 'trade_date 前一日的收盘价',
+  today_high DECIMAL(10, 4) NULL COMMENT 'trade_date 当日最高',
+  today_low DECIMAL(10, 4) NULL COMMENT 'trade_date 当日最低',
+  PRIMARY KEY (data_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
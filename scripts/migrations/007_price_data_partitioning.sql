@@ -0,0 +1,24 @@
+-- Prepare price_data for monthly RANGE COLUMNS(trade_date) partitioning.
+-- Existing databases only: scripts/init.sql already creates this schema on fresh installs.
+-- MySQL requires every unique key (including the primary key) of a partitioned table to contain the
+-- partitioning column, so the former unique key uk_price_data becomes the primary key and the
+-- surrogate id stays as a plain AUTO_INCREMENT column with its own index (nothing reads by id).
+-- The ALTER rebuilds the table: run it in a maintenance window. Collectors can keep running, the
+-- ingest spool (INGEST_SPOOL_DIR) buffers ticks on disk while the table is locked.
+--
+-- Partition boundaries depend on the existing data, so the partitioning itself is applied afterwards:
+--   python src/maintenance.py partition-price-data --ahead 3
+
+-- Primary key columns must be NOT NULL; legacy rows may carry NULL source / currency.
+UPDATE IGNORE price_data SET source = 'playwright' WHERE source IS NULL;
+UPDATE IGNORE price_data SET currency = 'CNY' WHERE currency IS NULL;
+DELETE FROM price_data WHERE source IS NULL OR currency IS NULL;
+
+ALTER TABLE price_data
+  MODIFY id BIGINT NOT NULL AUTO_INCREMENT,
+  MODIFY source VARCHAR(30) NOT NULL DEFAULT 'playwright' COMMENT '数据来源: gold_api/exchange_rate/fawazahmed0/playwright',
+  MODIFY currency VARCHAR(10) NOT NULL DEFAULT 'CNY' COMMENT '计价币种: CNY/USD',
+  DROP PRIMARY KEY,
+  DROP INDEX uk_price_data,
+  ADD PRIMARY KEY (trade_date, trade_time, data_type, source, currency),
+  ADD INDEX idx_id (id);
@@ -0,0 +1,6 @@
+-- Tiered retention (db.retention): the background compactor deletes minute bars older than
+-- Existing databases only: scripts/init.sql already creates this schema on fresh installs.
+-- RETENTION_MINUTE_MONTHS with "DELETE FROM minute_ohlc WHERE trade_date < ? LIMIT ?". The primary key
+-- starts with data_type, so add an index on trade_date to keep each batch a short range delete.
+
+ALTER TABLE minute_ohlc ADD INDEX idx_trade_date (trade_date);
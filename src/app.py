@@ -31,16 +31,37 @@ def load_config():
         },
         'api': {
             'host': os.environ.get('API_HOST', '0.0.0.0'),
-            'port': int(os.environ.get('API_PORT', '8083'))
+            'port': int(os.environ.get('API_PORT', '8083')),
+            # werkzeug：开发服务器（每个 SSE 连接一个线程）；asgi：uvicorn 事件循环承载长连接
+            'server_mode': os.environ.get('SERVER_MODE', 'werkzeug').lower()
         }
     }
 
 
+def serve_asgi(app, api_config):
+    import uvicorn
+
+    from asgi import create_asgi_app
+
+    uvicorn.run(
+        create_asgi_app(app),
+        host=api_config['host'],
+        port=api_config['port'],
+        lifespan='on',
+        log_config=None,
+        # 每个连接的请求头 / 缓冲都很小，瓶颈是文件描述符上限（ulimit -n）
+        backlog=int(os.environ.get('ASGI_BACKLOG', '4096')),
+        timeout_keep_alive=30,
+    )
+
+
 def main():
     setup_logging()
     config = load_config()
 
     mysql_manager = DatabaseManager(config['mysql'])
+    mysql_manager.warm_tick_store()
+    mysql_manager.warm_daily_stats()
 
     collector_manager = CollectorManager(mysql_manager)
     collector_manager.start_all()
@@ -48,12 +69,15 @@ def main():
     app = create_app(mysql_manager)
 
     try:
-        app.run(
-            host=config['api']['host'],
-            port=config['api']['port'],
-            debug=False,
-            use_reloader=False
-        )
+        if config['api']['server_mode'] == 'asgi':
+            serve_asgi(app, config['api'])
+        else:
+            app.run(
+                host=config['api']['host'],
+                port=config['api']['port'],
+                debug=False,
+                use_reloader=False
+            )
     except KeyboardInterrupt:
         logging.info("收到停止信号，正在关闭服务...")
     finally:
@@ -37,12 +37,12 @@ def _freshness_seconds(latest_at: Any, now: datetime) -> int | None:
     return int(sec)
 
 
-def _data_status(freshness: int | None) -> str:
+def _data_status(freshness: int | None, normal_within: int = 120) -> str:
     if freshness is None:
         return "abnormal"
-    if freshness <= 120:
+    if freshness <= normal_within:
         return "normal"
-    if freshness <= 600:
+    if freshness <= max(600, normal_within * 2):
         return "delayed"
     return "abnormal"
 
@@ -62,8 +62,13 @@ def build_quality_metrics_payload(
     *,
     window_seconds: int = 3600,
     expected_interval_seconds: int = 60,
+    heartbeat_seconds: int = 0,
 ) -> dict[str, Any]:
+    # 入库死区开启时价格不变只按心跳写入：最少行数按心跳估计，新鲜度容忍一个心跳周期
+    if heartbeat_seconds > 0:
+        expected_interval_seconds = max(expected_interval_seconds, heartbeat_seconds)
     expected_count = max(1, int(window_seconds / expected_interval_seconds))
+    normal_within = max(120, heartbeat_seconds + 60)
 
     cnt_map: dict[tuple[str, str], int] = {}
     for r in counts_last_hour:
@@ -90,7 +95,7 @@ def build_quality_metrics_payload(
                 "source": source,
                 "latest_at": str(latest_at or ""),
                 "freshness_seconds": freshness,
-                "data_status": _data_status(freshness),
+                "data_status": _data_status(freshness, normal_within),
                 "count_last_hour": cnt,
                 "expected_count_last_hour": expected_count,
                 "missing_rate": round(missing_rate, 4),
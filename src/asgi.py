@@ -0,0 +1,153 @@
+# asgi.py — ASGI 入口：普通请求交给 Flask（WsgiToAsgi 线程池），长连接流在事件循环内处理
+"""
+SERVER_MODE=asgi 时由 app.py 通过 uvicorn 加载。
+
+请求 / 响应类接口继续走 Flask Blueprint（鉴权、限流、审计、错误处理保持不变）；
+STREAM_ROUTES 中的长连接端点由协程直接实现，每个空闲订阅者只占一个协程与一个小队列，
+不再各占一个 OS 线程。新增实时端点时在 STREAM_ROUTES 注册即可。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, MutableMapping
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask
+
+from api_errors import ApiError, build_error_payload
+from realtime.alert_hub import CLOSED, AlertHub, AsyncSubscription
+from realtime.sse import (
+    PING,
+    PING_INTERVAL_SECONDS,
+    SUBSCRIPTION_TIMEOUT_SECONDS,
+    TIMEOUT,
+    notify_alert,
+    parse_subscribe_params,
+    render_event,
+)
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+StreamHandler = Callable[[Flask, Scope, Receive, Send], Awaitable[None]]
+
+_SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"connection", b"keep-alive"),
+    # 禁止反向代理缓冲 SSE
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def _query_getter(scope: Scope) -> Callable[[str, Any], Any]:
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+
+    def get(name: str, default: Any = None) -> Any:
+        values = query.get(name)
+        return values[0] if values else default
+
+    return get
+
+
+async def _send_json(send: Send, status: int, payload: Dict[str, Any]) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _watch_disconnect(receive: Receive, sub: AsyncSubscription) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            sub.close()
+            return
+
+
+async def price_alert_subscribe(app: Flask, scope: Scope, receive: Receive, send: Send) -> None:
+    """/api/price-alert/subscribe 的协程实现，事件格式与 Flask 路由一致。"""
+    try:
+        params = parse_subscribe_params(_query_getter(scope))
+    except ApiError as err:
+        await _send_json(send, err.http_status, build_error_payload(err))
+        return
+
+    hub: AlertHub = app.extensions["alert_hub"]
+    loop = asyncio.get_running_loop()
+    sub = AsyncSubscription(params.data_type, params.target, params.op, loop)
+    hub.add(sub)
+    watcher = loop.create_task(_watch_disconnect(receive, sub))
+    try:
+        await send({"type": "http.response.start", "status": 200, "headers": _SSE_HEADERS})
+        deadline = loop.time() + SUBSCRIPTION_TIMEOUT_SECONDS
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                await _send_chunk(send, TIMEOUT)
+                break
+
+            event = await sub.next_event(timeout=min(PING_INTERVAL_SECONDS, remaining))
+            if event is None:
+                await _send_chunk(send, PING)
+                continue
+            if event == CLOSED:
+                return
+
+            chunk, done = render_event(event, params)
+            await _send_chunk(send, chunk)
+            if event[0] == "alert":
+                # 渠道推送是阻塞网络 IO，放到默认线程池
+                loop.run_in_executor(None, notify_alert, params, event[1])
+            if done:
+                break
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(sub)
+
+
+async def _send_chunk(send: Send, chunk: str) -> None:
+    await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+
+
+STREAM_ROUTES: Dict[str, StreamHandler] = {
+    "/api/price-alert/subscribe": price_alert_subscribe,
+}
+
+
+def create_asgi_app(app: Flask) -> Callable[[Scope, Receive, Send], Awaitable[None]]:
+    """包装 route.create_app() 返回的 Flask 应用。"""
+    wsgi = WsgiToAsgi(app)
+
+    async def asgi_app(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+        if scope["type"] == "http" and scope.get("method") == "GET":
+            handler = STREAM_ROUTES.get(scope.get("path", ""))
+            if handler is not None:
+                await handler(app, scope, receive, send)
+                return
+        await wsgi(scope, receive, send)
+
+    return asgi_app
+
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
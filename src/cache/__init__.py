@@ -1,5 +1,8 @@
 """进程内缓存等基础设施（HTTP 层可复用）。"""
 
+from .data_versions import DataVersions
+from .single_flight import SingleFlight
+from .tick_store import TickStore
 from .ttl_cache import TtlCache
 
-__all__ = ["TtlCache"]
+__all__ = ["DataVersions", "SingleFlight", "TickStore", "TtlCache"]
@@ -0,0 +1,210 @@
+"""
+价格概览的增量日统计：每个 data_type 保存当前价、昨日收盘、今日高低。
+
+入库的每批 tick 经 DailyStatsStore.apply() 增量更新（所有来源合并，按 trade_date + trade_time 定先后），
+状态整体写回小表 daily_stats，未运行采集器的进程直接读该表。北京时间跨日不需要定时任务：
+view(today) 在读取时按条目所属交易日滚动——条目停留在昨日时，其最新价即昨日收盘、今日高低为空，
+与 PriceReader.get_price_overview_data 的窗口查询口径一致。
+
+冷启动时由 load() 从 daily_stats（或原始 tick 对账结果）载入，载入前 view() 返回 None，调用方回退 SQL。
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pytz
+
+BEIJING_TZ = pytz.timezone("Asia/Shanghai")
+
+# daily_stats 表列（也是 load() / rows() 的条目格式）
+FIELDS = ("data_type", "trade_date", "tick_at", "recycle_price", "real_time_price", "source",
+          "updated_at", "yesterday_close", "today_high", "today_low")
+
+
+def _now() -> datetime:
+    return datetime.now(BEIJING_TZ).replace(tzinfo=None)
+
+
+def _as_date(v: Any) -> date:
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return datetime.strptime(str(v), "%Y-%m-%d").date()
+
+
+def _tick_at(item: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(f"{_as_date(item['trade_date'])} {item['trade_time']}", "%Y-%m-%d %H:%M:%S")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _opt_float(v: Any) -> Optional[float]:
+    return float(v) if v is not None else None
+
+
+def view(entry: Dict[str, Any], today: date) -> Optional[Dict[str, Any]]:
+    """条目在 today 的概览行；条目早于昨日时不返回（与窗口查询只取昨日起的当前价一致）。"""
+    day = _as_date(entry["trade_date"])
+    row = {
+        "data_type": entry["data_type"],
+        "recycle_price": float(entry["recycle_price"]),
+        "real_time_price": float(entry.get("real_time_price") or 0),
+        "source": entry.get("source"),
+        "updated_at": entry.get("updated_at"),
+    }
+    if day == today:
+        row.update(yesterday_close=_opt_float(entry.get("yesterday_close")),
+                   today_high=_opt_float(entry.get("today_high")),
+                   today_low=_opt_float(entry.get("today_low")))
+        return row
+    if day == today - timedelta(days=1):
+        row.update(yesterday_close=row["recycle_price"], today_high=None, today_low=None)
+        return row
+    return None
+
+
+class DailyStatsStore:
+    """线程安全；apply 只在入库路径调用，view 由 API 线程调用。"""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty: Set[str] = set()
+        self._rolled = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, entries: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries = {}
+            for e in entries:
+                entry = {k: e.get(k) for k in FIELDS}
+                entry["trade_date"] = _as_date(entry["trade_date"])
+                self._entries[entry["data_type"]] = entry
+            self._dirty.clear()
+            self._rolled = False
+            self._loaded = True
+
+    def apply(self, data_list: Iterable[Dict[str, Any]]) -> bool:
+        """并入一批 tick（recycle_price > 0），返回是否有条目变化；变化的条目记为待写回。"""
+        now = _now()
+        changed = False
+        with self._lock:
+            for item in data_list or ():
+                price = float(item.get("recycle_price") or 0)
+                at = _tick_at(item)
+                if price <= 0 or at is None:
+                    continue
+                if self._apply_locked(item, price, at, now):
+                    self._dirty.add(item["data_type"])
+                    changed = True
+        return changed
+
+    def _apply_locked(self, item: Dict[str, Any], price: float, at: datetime, now: datetime) -> bool:
+        data_type = item["data_type"]
+        entry = self._entries.get(data_type)
+        current = {"tick_at": at, "recycle_price": price,
+                   "real_time_price": float(item.get("real_time_price") or 0),
+                   "source": item.get("source", "playwright"), "updated_at": item.get("created_at") or now}
+        if entry is None or at.date() > entry["trade_date"]:
+            # 跨日：前一交易日的最新价若恰为昨日，即为今日的昨日收盘
+            prev = entry if entry is not None and entry["trade_date"] == at.date() - timedelta(days=1) else None
+            self._entries[data_type] = {
+                "data_type": data_type, "trade_date": at.date(), **current,
+                "yesterday_close": prev["recycle_price"] if prev is not None else None,
+                "today_high": price, "today_low": price,
+            }
+            self._rolled = True
+            return True
+        if at.date() < entry["trade_date"]:
+            return False  # 迟到的前一交易日数据不影响当日统计
+        entry["today_high"] = max(entry["today_high"] or price, price)
+        entry["today_low"] = min(entry["today_low"] or price, price)
+        if at >= entry["tick_at"]:
+            entry.update(current)
+        return True
+
+    def view(self, today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+        """概览行（北京时间 today）；未载入时返回 None。"""
+        today = today or _now().date()
+        with self._lock:
+            if not self._loaded:
+                return None
+            rows = [view(e, today) for e in self._entries.values()]
+        return [r for r in rows if r is not None]
+
+    def replace(self, entries: Iterable[Dict[str, Any]]) -> List[str]:
+        """对账修复：用原始数据条目覆盖内存条目（仅当其不比内存旧），返回被覆盖的 data_type。"""
+        replaced = []
+        with self._lock:
+            for e in entries:
+                mine = self._entries.get(e["data_type"])
+                if mine is None or e["tick_at"] >= mine["tick_at"]:
+                    self._entries[e["data_type"]] = {k: e.get(k) for k in FIELDS}
+                    replaced.append(e["data_type"])
+            self._dirty.update(replaced)
+        return replaced
+
+    @property
+    def rolled_over(self) -> bool:
+        """自上次 take_dirty 以来是否有条目跨日或新增（应立即写回）。"""
+        return self._rolled
+
+    def take_dirty(self) -> List[Dict[str, Any]]:
+        """取出并清空待写回条目（写回 daily_stats）；写回失败时调用方用 mark_dirty 放回。"""
+        with self._lock:
+            rows = [dict(self._entries[t]) for t in self._dirty if t in self._entries]
+            self._dirty.clear()
+            self._rolled = False
+        return rows
+
+    def mark_dirty(self, data_types: Iterable[str]) -> None:
+        with self._lock:
+            self._dirty.update(data_types)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """全部条目（写回 daily_stats）。"""
+        with self._lock:
+            return [dict(e) for e in self._entries.values()]
+
+
+def entries_from_overview(rows: Iterable[Dict[str, Any]], today: date) -> List[Dict[str, Any]]:
+    """原始 tick 窗口查询（PriceReader.get_price_overview_data）的结果 → 条目，用于冷启动与对账。"""
+    out = []
+    for r in rows:
+        day = _as_date(r["trade_date"])
+        tick_at = _tick_at(r) or datetime.combine(day, datetime.min.time())
+        on_today = day == today
+        out.append({
+            "data_type": r["data_type"], "trade_date": day, "tick_at": tick_at,
+            "recycle_price": float(r["recycle_price"]), "real_time_price": float(r.get("real_time_price") or 0),
+            "source": r.get("source"), "updated_at": r.get("updated_at"),
+            "yesterday_close": _opt_float(r.get("yesterday_close")) if on_today else None,
+            "today_high": _opt_float(r.get("today_high")) if on_today else None,
+            "today_low": _opt_float(r.get("today_low")) if on_today else None,
+        })
+    return out
+
+
+_COMPARED = ("recycle_price", "yesterday_close", "today_high", "today_low")
+
+
+def diff(store_rows: List[Dict[str, Any]], raw_rows: List[Dict[str, Any]], tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+    """两组概览行（view 格式）逐字段比较，返回不一致项：{data_type, field, store, raw}。"""
+    store = {r["data_type"]: r for r in store_rows}
+    out = []
+    for raw in raw_rows:
+        mine = store.get(raw["data_type"], {})
+        for field in _COMPARED:
+            a, b = mine.get(field), raw.get(field)
+            if (a is None) != (b is None) or (a is not None and abs(float(a) - float(b)) > tolerance):
+                out.append({"data_type": raw["data_type"], "field": field, "store": a, "raw": b})
+    return out
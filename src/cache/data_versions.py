@@ -0,0 +1,70 @@
+"""
+按 data_type 的数据版本号：写入路径每次提交后递增，缓存键带上版本即可在新数据到达时自然失效。
+
+版本令牌形如 "<epoch>.<n>"：epoch 在 bump_all()（如 rollup 重建）时递增，使全部键一起失效；
+不带 data_type 的令牌为全局版本，任一 data_type 写入都会递增。
+
+配置了 L2 后端（store）时计数保存在共享存储中，多个 worker 看到同一版本；L2 不可用时
+退回进程内计数，令牌加 "l" 前缀，不会与共享令牌混淆。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from cache.redis_backend import BackendError, log_backend_error
+
+_KEY_PREFIX = "au:ver:"
+_EPOCH = "__epoch__"
+_GLOBAL = "__all__"
+
+
+class DataVersions:
+    """线程安全。"""
+
+    def __init__(self, store: Optional[Any] = None) -> None:
+        self.store = store
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._global = 0
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, data_types: Iterable[str]) -> None:
+        types = {t for t in data_types if t}
+        if not types:
+            return
+        with self._lock:
+            self._global += 1
+            for t in types:
+                self._versions[t] = self._versions.get(t, 0) + 1
+        if self.store is not None:
+            try:
+                self.store.incr(_KEY_PREFIX + _GLOBAL, *(_KEY_PREFIX + t for t in sorted(types)))
+            except BackendError as e:
+                log_backend_error(e)
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self._epoch += 1
+        if self.store is not None:
+            try:
+                self.store.incr(_KEY_PREFIX + _EPOCH)
+            except BackendError as e:
+                log_backend_error(e)
+
+    def token(self, data_type: Optional[str] = None) -> str:
+        if self.store is not None:
+            try:
+                epoch, n = self.store.mget(_KEY_PREFIX + _EPOCH, _KEY_PREFIX + (data_type or _GLOBAL))
+                return f"{int(epoch or 0)}.{int(n or 0)}"
+            except BackendError as e:
+                log_backend_error(e)
+        with self._lock:
+            n = self._global if data_type is None else self._versions.get(data_type, 0)
+            prefix = "l" if self.store is not None else ""
+            return f"{prefix}{self._epoch}.{n}"
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
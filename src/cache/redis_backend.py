@@ -0,0 +1,279 @@
+"""
+L2 共享缓存后端：最小 Redis 协议（RESP2）客户端，仅用标准库。
+
+多 worker 部署时各进程的 L1（TtlCache）之外共享一份响应缓存、限流计数与数据版本号。
+支持 TCP 与 Unix socket：
+
+    redis://[:password@]host:6379/0
+    unix:///var/run/redis/redis.sock?db=0&password=...
+
+任何网络 / 协议错误都抛 BackendError，调用方据此降级为仅用 L1。连接 / IO 失败后熔断：冷却期内
+（cooldown 秒起，连续失败翻倍至 max_cooldown）直接抛 BackendError 不触网，冷却结束只放行一个探测请求，
+成功后恢复；L2 不可达时请求与入库写线程不会每次都等待连接超时。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+from urllib.parse import parse_qs, unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """L2 后端不可用或返回错误。"""
+
+
+class ReplyError(BackendError):
+    """服务端返回的错误响应（连接本身仍可用）。"""
+
+
+def _encode_command(args: Sequence[Any]) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = str(arg).encode("ascii")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+class _Connection:
+    __slots__ = ("sock", "reader")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+    def read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise BackendError("连接被关闭")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise ReplyError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            n = int(payload)
+            if n < 0:
+                return None
+            data = self.reader.read(n + 2)
+            if len(data) != n + 2:
+                raise BackendError("连接被关闭")
+            return data[:-2]
+        if kind == b"*":
+            n = int(payload)
+            return None if n < 0 else [self.read_reply() for _ in range(n)]
+        raise BackendError(f"无法解析的响应: {line[:32]!r}")
+
+
+class RedisBackend:
+    """线程安全的小连接池；每条命令 / 每个 pipeline 借用一个连接。"""
+
+    def __init__(self, url: str, timeout: float = 0.25, max_idle: int = 8,
+                 cooldown: float = 5.0, max_cooldown: float = 30.0) -> None:
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        self.url = url
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        if parsed.scheme == "unix":
+            self._address: Any = unquote(parsed.path)
+            self._family = socket.AF_UNIX
+            db = query.get("db", ["0"])[0]
+        elif parsed.scheme == "redis":
+            self._address = (parsed.hostname or "127.0.0.1", parsed.port or 6379)
+            self._family = socket.AF_INET
+            db = (parsed.path or "/0").lstrip("/") or "0"
+        else:
+            raise ValueError(f"不支持的 L2 缓存地址: {url}")
+        self._db = int(db)
+        self._password = unquote(parsed.password) if parsed.password else query.get("password", [None])[0]
+        self._idle: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._open_until = 0.0  # 熔断截止时刻（monotonic）；0 表示闭合
+        self._next_cooldown = cooldown
+        self.errors = 0
+        self.short_circuited = 0
+
+    # ── 熔断 ──────────────────────────────────────────────
+    def _admit(self) -> None:
+        with self._lock:
+            if not self._open_until:
+                return
+            now = time.monotonic()
+            if now < self._open_until:
+                self.short_circuited += 1
+                raise BackendError("L2 缓存熔断中（最近连接失败）")
+            # 冷却结束：本请求作为探测放行，其余请求在其结果出来前继续快速失败
+            self._open_until = now + self._next_cooldown
+
+    def _trip(self) -> None:
+        with self._lock:
+            self.errors += 1
+            self._open_until = time.monotonic() + self._next_cooldown
+            self._next_cooldown = min(self._next_cooldown * 2, self.max_cooldown)
+
+    def _recover(self) -> None:
+        if self._open_until:
+            with self._lock:
+                self._open_until = 0.0
+                self._next_cooldown = self.cooldown
+
+    @property
+    def open(self) -> bool:
+        return bool(self._open_until) and time.monotonic() < self._open_until
+
+    # ── 连接 ──────────────────────────────────────────────
+    def _connect(self) -> _Connection:
+        sock = socket.socket(self._family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._address)
+            if self._family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            sock.close()
+            raise BackendError(f"连接 L2 缓存失败: {e}") from e
+        conn = _Connection(sock)
+        setup = []
+        if self._password:
+            setup.append(("AUTH", self._password))
+        if self._db:
+            setup.append(("SELECT", self._db))
+        if setup:
+            try:
+                self._roundtrip(conn, setup)
+            except BackendError:
+                conn.close()
+                raise
+        return conn
+
+    def _roundtrip(self, conn: _Connection, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        replies: List[Any] = []
+        error: Optional[ReplyError] = None
+        try:
+            conn.sock.sendall(b"".join(_encode_command(c) for c in commands))
+            for _ in commands:
+                try:
+                    replies.append(conn.read_reply())
+                except ReplyError as e:
+                    # 读完剩余响应，连接仍可复用
+                    error = error or e
+                    replies.append(None)
+        except OSError as e:
+            raise BackendError(f"L2 缓存 IO 失败: {e}") from e
+        if error is not None:
+            raise error
+        return replies
+
+    def pipeline(self, *commands: Sequence[Any]) -> List[Any]:
+        """一次往返发送多条命令，按顺序返回响应。"""
+        self._admit()
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            try:
+                conn = self._connect()
+            except BackendError:
+                self._trip()
+                raise
+        try:
+            replies = self._roundtrip(conn, commands)
+        except ReplyError:
+            self._release(conn)
+            self._recover()
+            raise
+        except BackendError:
+            conn.close()
+            self._trip()
+            raise
+        self._release(conn)
+        self._recover()
+        return replies
+
+    def _release(self, conn: _Connection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def execute(self, *args: Any) -> Any:
+        return self.pipeline(args)[0]
+
+    # ── 缓存 / 计数语义 ──────────────────────────────────
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self.execute("DEL", key)
+
+    def mget(self, *keys: str) -> List[Optional[bytes]]:
+        return self.execute("MGET", *keys)
+
+    def incr(self, *keys: str) -> List[int]:
+        return self.pipeline(*[("INCR", k) for k in keys])
+
+    def incr_window(self, key: str, window_seconds: float) -> int:
+        """固定窗口计数：首次计数时建立 window_seconds 过期，返回窗口内累计次数。"""
+        _, count = self.pipeline(
+            ("SET", key, 0, "PX", max(1, int(window_seconds * 1000)), "NX"),
+            ("INCR", key),
+        )
+        return int(count)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_shared: Optional[RedisBackend] = None
+_shared_lock = threading.Lock()
+_last_error_log = 0.0
+
+
+def shared_backend() -> Optional[RedisBackend]:
+    """按 CACHE_L2_URL 创建的进程级单例；未配置时返回 None（仅用 L1）。"""
+    global _shared
+    url = os.environ.get("CACHE_L2_URL", "").strip()
+    if not url:
+        return None
+    with _shared_lock:
+        if _shared is None or _shared.url != url:
+            _shared = RedisBackend(url, timeout=float(os.environ.get("CACHE_L2_TIMEOUT", "0.25")))
+        return _shared
+
+
+def log_backend_error(e: Exception) -> None:
+    """L2 故障时每 60s 最多记一条告警，避免刷屏。"""
+    global _last_error_log
+    now = time.monotonic()
+    if now - _last_error_log >= 60:
+        _last_error_log = now
+        logger.warning(f"[cache-l2] 不可用，降级为进程内缓存: {e}")
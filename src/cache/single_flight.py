@@ -0,0 +1,100 @@
+"""
+单飞（single-flight）：同一 key 的并发计算合并为一次。
+
+缓存条目过期瞬间的并发未命中只有第一个调用方（leader）执行加载函数，其余调用方等待并共享
+同一结果（或同一异常），避免每个 TTL 周期对 MySQL 形成一次惊群。
+do_background 用于 stale-while-revalidate：在小线程池中发起加载，同 key 已在加载时不重复发起。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """线程安全；stats() 中 shared 即被合并掉（省下）的加载次数。"""
+
+    def __init__(self, background_workers: int = 4) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._shared = 0
+        self._background = 0
+        self._background_workers = background_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        return self._run(key, call, fn)
+
+    def _run(self, key: str, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.value
+
+    def do_background(self, key: str, fn: Callable[[], Any]) -> bool:
+        """后台执行 fn；同 key 已在执行则直接返回 False。期间到来的 do(key) 调用会等待这次结果。"""
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = _Call()
+            self._calls[key] = call
+            self._executed += 1
+            self._background += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._background_workers, thread_name_prefix="cache-refresh")
+        self._executor.submit(self._run_logged, key, call, fn)
+        return True
+
+    def _run_logged(self, key: str, call: _Call, fn: Callable[[], Any]) -> None:
+        try:
+            self._run(key, call, fn)
+        except Exception as e:
+            logger.warning(f"[single-flight] 后台刷新 {key} 失败: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "shared": self._shared,
+                "background": self._background,
+                "in_flight": len(self._calls),
+            }
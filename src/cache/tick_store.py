@@ -0,0 +1,223 @@
+"""
+进程内行情 tick 环形缓冲。
+
+按 (data_type, source) 各保留一个定长 deque，只存最近 window_days 个交易日的点位，
+供最新价 / 近期历史 / 近 1 小时 / 日内走势直接从内存读取。
+
+「覆盖起点」covered_from 之后写入的每一条 tick 都经过本缓冲，因此起点之后的窗口查询
+可以完全由内存回答；覆盖不足（冷启动、未运行采集器的进程）时各读方法返回 None，
+调用方回退 MySQL。
+
+缓冲内的先后与窗口一律按 tick_at = trade_date + trade_time（应用侧北京时间）计算：库内 created_at
+是数据库会话时钟（docker-compose 自带的 MySQL 为 UTC），与实时 tick 的北京时间不可直接比较。
+读出的 created_at 列同样取 tick_at，调用方用北京时间窗口过滤即可。
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+BEIJING_TZ = pytz.timezone("Asia/Shanghai")
+
+# 与 PriceReader 的 latest / history / time_range 查询列保持一致
+_ROW_FIELDS = ("trade_date", "trade_time", "data_type", "real_time_price", "recycle_price", "created_at")
+
+Key = Tuple[str, str]
+
+
+def _now() -> datetime:
+    return datetime.now(BEIJING_TZ).replace(tzinfo=None)
+
+
+def _as_date(v: Any) -> date:
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return datetime.strptime(str(v), "%Y-%m-%d").date()
+
+
+def _as_timedelta(v: Any) -> timedelta:
+    """trade_time 统一为 timedelta（与 mysql-connector 读取 TIME 列的类型一致）。"""
+    if isinstance(v, timedelta):
+        return v
+    if isinstance(v, dtime):
+        return timedelta(hours=v.hour, minutes=v.minute, seconds=v.second)
+    h, m, s = str(v).split(":")
+    return timedelta(hours=int(h), minutes=int(m), seconds=int(float(s)))
+
+
+def _normalize(item: Dict[str, Any]) -> Dict[str, Any]:
+    trade_date = _as_date(item["trade_date"])
+    trade_time = _as_timedelta(item["trade_time"])
+    return {
+        "trade_date": trade_date,
+        "trade_time": trade_time,
+        "data_type": item["data_type"],
+        "real_time_price": float(item.get("real_time_price") or 0),
+        "recycle_price": float(item.get("recycle_price") or 0),
+        "source": item.get("source", "playwright"),
+        "currency": item.get("currency", "CNY"),
+        "tick_at": datetime.combine(trade_date, dtime.min) + trade_time,
+    }
+
+
+def _project(row: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: row[k] for k in _ROW_FIELDS if k != "created_at"}
+    out["created_at"] = row["tick_at"]
+    return out
+
+
+class TickStore:
+    """线程安全；写入 O(1) 追加，读取只遍历目标 data_type 的缓冲。"""
+
+    def __init__(self, window_days: int = 2, max_ticks_per_key: int = 10000) -> None:
+        self.window_days = max(1, int(window_days))
+        self.max_ticks_per_key = max(1, int(max_ticks_per_key))
+        self._buffers: Dict[Key, deque] = {}
+        self._keys_by_type: Dict[str, set] = {}
+        # 某个 key 因 maxlen 丢弃过旧点时，记录被丢弃点之后的覆盖起点
+        self._truncated_at: Dict[Key, datetime] = {}
+        self._covered_from: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    # ── 写入 ──────────────────────────────────────────────
+    def extend(self, data_list: Iterable[Dict[str, Any]]) -> None:
+        """追加采集器标准化后的 tick；首次写入即建立覆盖起点。"""
+        now = _now()
+        rows = []
+        for item in data_list or ():
+            try:
+                rows.append(_normalize(item))
+            except (KeyError, TypeError, ValueError):
+                continue
+        with self._lock:
+            if self._covered_from is None:
+                self._covered_from = now
+            for row in rows:
+                self._append_locked(row)
+            self._evict_locked(now)
+
+    def load(self, rows: Iterable[Dict[str, Any]], covered_from: datetime) -> None:
+        """冷启动预热：载入库内窗口数据（按 trade_date, trade_time 升序），覆盖起点设为窗口起点。"""
+        now = _now()
+        with self._lock:
+            self._buffers.clear()
+            self._keys_by_type.clear()
+            self._truncated_at.clear()
+            for item in rows:
+                try:
+                    self._append_locked(_normalize(item))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            self._covered_from = covered_from
+            self._evict_locked(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers.clear()
+            self._keys_by_type.clear()
+            self._truncated_at.clear()
+            self._covered_from = None
+
+    def _append_locked(self, row: Dict[str, Any]) -> None:
+        key = (row["data_type"], row["source"])
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = deque(maxlen=self.max_ticks_per_key)
+            self._buffers[key] = buf
+            self._keys_by_type.setdefault(row["data_type"], set()).add(key)
+        if len(buf) == buf.maxlen:
+            self._truncated_at[key] = buf[1]["tick_at"] if len(buf) > 1 else row["tick_at"]
+        buf.append(row)
+
+    def _evict_locked(self, now: datetime) -> None:
+        oldest_day = now.date() - timedelta(days=self.window_days - 1)
+        for buf in self._buffers.values():
+            while buf and buf[0]["trade_date"] < oldest_day:
+                buf.popleft()
+        window_start = datetime.combine(oldest_day, dtime.min)
+        if self._covered_from is not None and self._covered_from < window_start:
+            self._covered_from = window_start
+
+    # ── 读取（返回 None 表示内存无法确定答案，需回退数据库） ──────────
+    def covers(self, start: datetime, data_type: Optional[str] = None) -> bool:
+        with self._lock:
+            return self._covers_locked(start, data_type)
+
+    def _covers_locked(self, start: datetime, data_type: Optional[str]) -> bool:
+        if self._covered_from is None or start < self._covered_from:
+            return False
+        keys = self._keys_by_type.get(data_type, ()) if data_type else self._truncated_at.keys()
+        return all(self._truncated_at.get(k, start) <= start for k in keys)
+
+    def _merged_locked(self, data_type: str) -> List[Dict[str, Any]]:
+        buffers = [self._buffers[k] for k in self._keys_by_type.get(data_type, ())]
+        if len(buffers) == 1:
+            return list(buffers[0])
+        return list(heapq.merge(*buffers, key=lambda r: r["tick_at"]))
+
+    def latest(self, data_type: str) -> Optional[Dict[str, Any]]:
+        """最新一条 recycle_price > 0 的点；缓冲内没有则返回 None。"""
+        with self._lock:
+            best = None
+            for key in self._keys_by_type.get(data_type, ()):
+                for row in reversed(self._buffers[key]):
+                    if row["recycle_price"] > 0:
+                        if best is None or row["tick_at"] > best["tick_at"]:
+                            best = row
+                        break
+            return _project(best) if best is not None else None
+
+    def latest_by_type(self) -> Optional[List[Dict[str, Any]]]:
+        """每个 data_type 的最新一条（窗口：昨日起）；覆盖不足返回 None。"""
+        since_day = _now().date() - timedelta(days=1)
+        with self._lock:
+            if not self._covers_locked(datetime.combine(since_day, dtime.min), None):
+                return None
+            out = []
+            for data_type, keys in self._keys_by_type.items():
+                tails = [self._buffers[k][-1] for k in keys if self._buffers[k]]
+                tails = [r for r in tails if r["trade_date"] >= since_day]
+                if tails:
+                    out.append(_project(max(tails, key=lambda r: r["tick_at"])))
+            return out
+
+    def history(self, data_type: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """最近 limit 条（升序）；缓冲内不足 limit 条时无法排除库内更早数据，返回 None。"""
+        with self._lock:
+            rows = [r for r in self._merged_locked(data_type) if r["recycle_price"] > 0]
+        if len(rows) < limit:
+            return None
+        return [_project(r) for r in rows[-limit:]]
+
+    def since(self, data_type: str, start: datetime) -> Optional[List[Dict[str, Any]]]:
+        """tick_at >= start（北京时间）的点（升序）。"""
+        with self._lock:
+            if not self._covers_locked(start, data_type):
+                return None
+            rows = self._merged_locked(data_type)
+        return [_project(r) for r in rows if r["tick_at"] >= start and r["recycle_price"] > 0]
+
+    def day(self, data_type: str, date_str: str) -> Optional[List[Dict[str, Any]]]:
+        """指定交易日的全部点（升序）。"""
+        day = _as_date(date_str)
+        with self._lock:
+            if not self._covers_locked(datetime.combine(day, dtime.min), data_type):
+                return None
+            rows = self._merged_locked(data_type)
+        return [_project(r) for r in rows if r["trade_date"] == day and r["recycle_price"] > 0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "covered_from": self._covered_from.isoformat() if self._covered_from else None,
+                "keys": len(self._buffers),
+                "ticks": sum(len(b) for b in self._buffers.values()),
+            }
@@ -1,38 +1,207 @@
 """
-线程安全的简单 TTL 缓存。
+线程安全的有界 TTL 缓存。
 
-用于热点只读 API 的短期响应缓存；多进程部署时各进程独立，不保证跨实例一致。
+用于热点只读 API 的短期响应缓存与限流计数；多进程部署时各进程独立，不保证跨实例一致。
+
+- 过期时间在 set 时按条目指定（ttl 秒），get 仍接受可选的 ttl 作为「最大存活时间」以兼容旧调用；
+- set 可附加 stale_ttl：过了 ttl（软过期）后条目仍可经 get_stale 读出，直到 ttl + stale_ttl（硬过期），
+  供 stale-while-revalidate 使用；
+- 条目数 / 估算字节数超限时按 LRU 淘汰；
+- 键按哈希分到若干分段，每段一把锁，热点键不再全部串行在同一把锁上；
+- 可选后台清扫线程定期删除已过期条目（未被再次访问的过期键也会释放）。
 """
 
 from __future__ import annotations
 
+import sys
 import threading
 import time
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
+# (value, stored_at, expires_at, size, fresh_until)；expires_at 为硬过期，fresh_until 为软过期
+_Entry = Tuple[Any, float, float, int, float]
+
+_INF = float("inf")
+
+
+def _approx_size(value: Any, _depth: int = 0) -> int:
+    """JSON 形态载荷的近似字节数（浅层 getsizeof 递归求和，深度受限）。"""
+    size = sys.getsizeof(value)
+    if _depth >= 6:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _approx_size(k, _depth + 1) + _approx_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            size += _approx_size(v, _depth + 1)
+    elif hasattr(value, "__dict__"):
+        size += _approx_size(vars(value), _depth + 1)
+    return size
+
+
+_COUNTERS = ("hits", "stale_hits", "misses", "evictions", "expirations")
 
-class TtlCache:
-    """键值 + 写入时间戳；get 时若未过期则返回值，否则返回 None。"""
 
-    __slots__ = ("_data", "_lock")
+class _Stripe:
+    __slots__ = ("lock", "data", "bytes", "hits", "stale_hits", "misses", "evictions", "expirations")
 
     def __init__(self) -> None:
-        self._data: dict[str, tuple[Any, float]] = {}
-        self._lock = threading.Lock()
-
-    def get(self, key: str, ttl: float = 10.0) -> Optional[Any]:
-        """若存在且未超过 ttl（秒），返回缓存值；否则返回 None。"""
-        with self._lock:
-            entry = self._data.get(key)
-            if entry and (time.time() - entry[1]) < ttl:
-                return entry[0]
+        self.lock = threading.Lock()
+        # 按访问顺序排列：末尾为最近使用
+        self.data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.bytes = 0
+        # 计数随分段锁更新，不引入额外的全局锁
+        self.hits = self.stale_hits = self.misses = self.evictions = self.expirations = 0
+
+
+class TtlCache:
+    """
+    get 命中未过期条目时返回值，否则返回 None。
+
+    max_entries / max_bytes 为全局上限，平均分摊到各分段（分段内 LRU，整体为近似 LRU）；
+    均为 None 时不限容量（仅按 TTL 过期）。default_ttl 为 set 未指定 ttl 时的过期秒数，
+    None 表示不过期。sweep_interval 非空时启动后台清扫线程。
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        stripes: int = 16,
+        sweep_interval: Optional[float] = None,
+    ) -> None:
+        n = max(1, int(stripes))
+        self._stripes: List[_Stripe] = [_Stripe() for _ in range(n)]
+        self._max_entries = -(-int(max_entries) // n) if max_entries else None
+        self._max_bytes = -(-int(max_bytes) // n) if max_bytes else None
+        self.default_ttl = default_ttl
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if sweep_interval:
+            self.start_sweeper(sweep_interval)
+
+    def _stripe(self, key: str) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        返回未过期的缓存值；否则返回 None。
+
+        ttl（秒）为可选的额外约束：写入时间距今超过 ttl 也视为未命中（兼容旧的 get(key, ttl=...) 调用）。
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.get(key)
+            if entry is not None:
+                now = time.time()
+                value, stored_at, expires_at, size, fresh_until = entry
+                if now >= expires_at:
+                    del stripe.data[key]
+                    stripe.bytes -= size
+                    stripe.expirations += 1
+                elif now < fresh_until and (ttl is None or (now - stored_at) < ttl):
+                    stripe.data.move_to_end(key)
+                    stripe.hits += 1
+                    return value
+            stripe.misses += 1
+        return None
+
+    def get_stale(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """硬过期前返回 (value, 是否仍新鲜)；不存在或已硬过期返回 None。"""
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.get(key)
+            if entry is not None:
+                now = time.time()
+                value, _, expires_at, size, fresh_until = entry
+                if now >= expires_at:
+                    del stripe.data[key]
+                    stripe.bytes -= size
+                    stripe.expirations += 1
+                else:
+                    stripe.data.move_to_end(key)
+                    fresh = now < fresh_until
+                    if fresh:
+                        stripe.hits += 1
+                    else:
+                        stripe.stale_hits += 1
+                    return value, fresh
+            stripe.misses += 1
         return None
 
-    def set(self, key: str, value: Any) -> None:
-        with self._lock:
-            self._data[key] = (value, time.time())
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, stale_ttl: float = 0) -> None:
+        """写入；ttl（秒）为本条目的（软）过期时间，缺省用 default_ttl；stale_ttl 为其后仍可陈旧读取的秒数。"""
+        if ttl is None:
+            ttl = self.default_ttl
+        size = _approx_size(value) if self._max_bytes else 0
+        now = time.time()
+        fresh_until = now + ttl if ttl is not None else _INF
+        expires_at = fresh_until + stale_ttl
+        stripe = self._stripe(key)
+        with stripe.lock:
+            old = stripe.data.pop(key, None)
+            if old is not None:
+                stripe.bytes -= old[3]
+            stripe.data[key] = (value, now, expires_at, size, fresh_until)
+            stripe.bytes += size
+            while len(stripe.data) > 1 and (
+                (self._max_entries is not None and len(stripe.data) > self._max_entries)
+                or (self._max_bytes is not None and stripe.bytes > self._max_bytes)
+            ):
+                _, (_, _, _, old_size, _) = stripe.data.popitem(last=False)
+                stripe.bytes -= old_size
+                stripe.evictions += 1
+
+    def delete(self, key: str) -> None:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.data.pop(key, None)
+            if entry is not None:
+                stripe.bytes -= entry[3]
 
     def clear(self) -> None:
         """清空全部条目（供测试或运维重置进程内缓存）。"""
-        with self._lock:
-            self._data.clear()
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.data.clear()
+                stripe.bytes = 0
+
+    def sweep(self) -> int:
+        """删除全部已过期条目，返回删除数。"""
+        now = time.time()
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                expired = [k for k, e in stripe.data.items() if now >= e[2]]
+                for k in expired:
+                    stripe.bytes -= stripe.data.pop(k)[3]
+                stripe.expirations += len(expired)
+            removed += len(expired)
+        return removed
+
+    def start_sweeper(self, interval: float) -> None:
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=run, name="ttl-cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+
+    def __len__(self) -> int:
+        return sum(len(s.data) for s in self._stripes)
+
+    def stats(self) -> Dict[str, int]:
+        out = {name: sum(getattr(s, name) for s in self._stripes) for name in _COUNTERS}
+        out["entries"] = len(self)
+        out["bytes"] = sum(s.bytes for s in self._stripes)
+        return out
@@ -2,7 +2,6 @@
 BaseCollector — 所有数据采集器的抽象基类
 """
 import logging
-import threading
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -14,15 +13,20 @@ from collectors import stats as collector_stats
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 logger = logging.getLogger(__name__)
 
+MAX_BACKOFF = 3600  # 最大退避 1 小时
+FAILURE_THRESHOLD = 5
+
 
 class BaseCollector(ABC):
     name: str = 'base'
     interval: int = 60  # 采集间隔（秒）
+    scheduled: bool = True  # False 表示自行管理线程（如 Playwright），不交给调度器
 
-    def __init__(self, mysql_manager):
+    def __init__(self, mysql_manager, ingest=None):
         self.mysql_manager = mysql_manager
+        self.ingest = ingest  # IngestPipeline；未提供时直接同步写库
         self.is_running = False
-        self._thread = None
+        self.consecutive_failures = 0
 
     @abstractmethod
     def fetch(self) -> list:
@@ -41,51 +45,54 @@ class BaseCollector(ABC):
         }
         """
 
+    def emit(self, data: list):
+        """
+        交出一批数据入库；可在 fetch 过程中提前调用，适用于分批到达的结果。
+        配置了入库流水线时推入队列，由写线程合并批量写入。
+        """
+        if not data:
+            return
+        if self.ingest is not None:
+            self.ingest.submit(data)
+            logger.debug(f"[{self.name}] 提交 {len(data)} 条数据")
+        else:
+            self.mysql_manager.batch_insert_data(data)
+            logger.info(f"[{self.name}] 写入 {len(data)} 条数据")
+
     def start(self):
+        """标记为运行中；周期调度由 CollectorManager 的调度器负责（scheduled=True 时）。"""
         self.is_running = True
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
         logger.info(f"[{self.name}] 采集器已启动，间隔 {self.interval}s")
 
     def stop(self):
         self.is_running = False
         logger.info(f"[{self.name}] 采集器已停止")
 
-    def _run(self):
-        consecutive_failures = 0
-        max_backoff = 3600  # 最大退避 1 小时
-        failure_threshold = 5
-
-        while self.is_running:
-            started = time.monotonic()
-            try:
-                data = self.fetch()
-                if data:
-                    self.mysql_manager.batch_insert_data(data)
-                    logger.info(f"[{self.name}] 写入 {len(data)} 条数据")
-
-                latency_ms = (time.monotonic() - started) * 1000.0
-                collector_stats.record_success(self.name, latency_ms)
-                if consecutive_failures > 0:
-                    logger.info(f"[{self.name}] 采集器恢复正常")
-                consecutive_failures = 0
-            except Exception as e:
-                collector_stats.record_failure(self.name)
-                consecutive_failures += 1
-                logger.error(f"[{self.name}] 采集异常 (连续失败 {consecutive_failures} 次): {e}")
-                if consecutive_failures == failure_threshold:
-                    logger.error(f"[{self.name}] 达到失败阈值，采集器进入降级状态！")
-            
-            if consecutive_failures > 0:
-                current_sleep = min(max_backoff, self.interval * (2 ** (consecutive_failures - 1)))
-                logger.info(f"[{self.name}] 退避重试，休眠 {current_sleep}s ...")
-            else:
-                current_sleep = self.interval
-            
-            slept = 0
-            while slept < current_sleep and self.is_running:
-                time.sleep(1)
-                slept += 1
+    def run_once(self):
+        """
+        执行一轮采集并写入，返回下一轮的退避秒数；成功时返回 None（按 interval 正常节奏）。
+        连续失败时退避按 interval * 2^(n-1) 指数增长，上限 MAX_BACKOFF。
+        """
+        started = time.monotonic()
+        try:
+            self.emit(self.fetch())
+
+            latency_ms = (time.monotonic() - started) * 1000.0
+            collector_stats.record_success(self.name, latency_ms)
+            if self.consecutive_failures > 0:
+                logger.info(f"[{self.name}] 采集器恢复正常")
+            self.consecutive_failures = 0
+            return None
+        except Exception as e:
+            collector_stats.record_failure(self.name)
+            self.consecutive_failures += 1
+            logger.error(f"[{self.name}] 采集异常 (连续失败 {self.consecutive_failures} 次): {e}")
+            if self.consecutive_failures == FAILURE_THRESHOLD:
+                logger.error(f"[{self.name}] 达到失败阈值，采集器进入降级状态！")
+
+        backoff = min(MAX_BACKOFF, self.interval * (2 ** (self.consecutive_failures - 1)))
+        logger.info(f"[{self.name}] 退避重试，{backoff}s 后再次采集 ...")
+        return backoff
 
     @staticmethod
     def now_beijing():
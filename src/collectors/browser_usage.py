@@ -0,0 +1,55 @@
+"""
+浏览器进程资源占用：按 /proc 汇总某进程全部子孙进程（Playwright driver + Chromium 各进程）的
+RSS 与 CPU 时间，供 PlaywrightCollector 的回收看门狗与健康度上报使用。非 Linux 时返回 None。
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional
+
+_PROC = "/proc"
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _stat_fields(pid: int) -> Optional[List[str]]:
+    try:
+        with open(f"{_PROC}/{pid}/stat") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    # comm 可能含空格 / 括号，从最后一个 ')' 之后切分；返回的第 0 项为 state
+    return raw[raw.rindex(")") + 2:].split()
+
+
+def descendants(root: int) -> List[int]:
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir(_PROC):
+        if not name.isdigit():
+            continue
+        fields = _stat_fields(int(name))
+        if fields:
+            children.setdefault(int(fields[1]), []).append(int(name))
+    out: List[int] = []
+    stack = list(children.get(root, []))
+    while stack:
+        pid = stack.pop()
+        out.append(pid)
+        stack.extend(children.get(pid, []))
+    return out
+
+
+def tree_usage(root: Optional[int] = None) -> Optional[Dict[str, float]]:
+    """root（默认当前进程）全部子孙进程的 RSS 字节数与累计 CPU 秒数。"""
+    if not os.path.isdir(_PROC):
+        return None
+    pids = descendants(os.getpid() if root is None else root)
+    rss = cpu = 0.0
+    for pid in pids:
+        fields = _stat_fields(pid)
+        if not fields:
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / _CLK_TCK  # utime + stime
+        rss += int(fields[21]) * _PAGE_SIZE
+    return {"processes": len(pids), "rss_bytes": rss, "cpu_seconds": cpu}
@@ -3,14 +3,15 @@ ExchangeRateCollector — 对接 open.er-api.com
 免费、无需 API Key，获取 USD/CNY 等主要汇率
 更新频率：1 小时（汇率变动慢，无需频繁）
 写入 exchange_rate 表，同时更新 price_data 换算值
+
+条件请求：带上次的 ETag / Last-Modified，304 时不解析不写库；
+time_last_update 未变化时同样跳过写库。
 """
-import json
 import logging
 import threading
-from urllib.request import Request, urlopen
-from urllib.error import URLError
 
 from collectors.base import BaseCollector
+from net.http_client import HttpError, Validators, http_client
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +31,20 @@ class ExchangeRateCollector(BaseCollector):
     name = 'exchange_rate'
     interval = 3600  # 1 小时
 
+    def __init__(self, mysql_manager, ingest=None):
+        super().__init__(mysql_manager, ingest)
+        self._validators = Validators()
+        self._last_update = None
+
     def fetch(self) -> list:
         try:
-            req = Request(BASE_URL, headers={'User-Agent': 'au-mesage/1.0'})
-            with urlopen(req, timeout=10) as resp:
-                body = json.loads(resp.read().decode())
+            resp = http_client.get(BASE_URL, headers=self._validators.headers(BASE_URL), timeout=10)
+            if resp.status == 304:
+                logger.debug(f"[{self.name}] 汇率未变化 (304)")
+                return []
+            if not 200 <= resp.status < 300:
+                raise HttpError(f"HTTP {resp.status}")
+            body = resp.json()
 
             if body.get('result') != 'success':
                 logger.warning(f"[{self.name}] API 返回非成功状态: {body.get('result')}")
@@ -49,11 +59,17 @@ class ExchangeRateCollector(BaseCollector):
             with _rate_cache['lock']:
                 _rate_cache['USD_CNY'] = float(cny_rate)
 
-            # 写入 exchange_rate 表
-            self.mysql_manager.upsert_exchange_rate('USD', 'CNY', float(cny_rate), self.name)
-            logger.info(f"[{self.name}] USD/CNY = {cny_rate}")
+            last_update = body.get('time_last_update_unix') or body.get('time_last_update_utc')
+            if last_update is not None and last_update == self._last_update:
+                logger.debug(f"[{self.name}] time_last_update 未变化，跳过写入")
+            else:
+                # 写入 exchange_rate 表
+                self.mysql_manager.upsert_exchange_rate('USD', 'CNY', float(cny_rate), self.name)
+                self._last_update = last_update
+                logger.info(f"[{self.name}] USD/CNY = {cny_rate}")
+            self._validators.remember(BASE_URL, resp)
 
-        except (URLError, Exception) as e:
+        except Exception as e:
             logger.warning(f"[{self.name}] 汇率获取失败: {e}")
 
         # 不写 price_data，返回空列表
@@ -3,13 +3,14 @@ Fawazahmed0Collector — 对接 cdn.jsdelivr.net/@fawazahmed0/currency-api
 免费、无需 API Key，提供 XAU/XAG 对 CNY/USD 的日收盘汇率
 每日采集一次（数据为前一日收盘）
 同时写入 daily_ohlc 表作为日线基准价
+
+条件请求：按 URL 带上次的 ETag / Last-Modified，304 时不解析不写库；
+响应 date 与上次写入相同时同样跳过 upsert_daily_ohlc。
 """
-import json
 import logging
-from urllib.request import Request, urlopen
-from urllib.error import URLError
 
 from collectors.base import BaseCollector
+from net.http_client import HttpError, Validators, http_client
 
 logger = logging.getLogger(__name__)
 
@@ -25,18 +26,31 @@ class Fawazahmed0Collector(BaseCollector):
     name = 'fawazahmed0'
     interval = 86400  # 每天一次
 
+    def __init__(self, mysql_manager, ingest=None):
+        super().__init__(mysql_manager, ingest)
+        self._validators = Validators()
+        self._last_dates = {}  # symbol -> 已写入的 API date
+
     def fetch(self) -> list:
         date_str = self.today_str()
 
         for symbol, target_currencies in SYMBOLS:
             try:
                 url = BASE_URL.format(symbol=symbol.lower())
-                req = Request(url, headers={'User-Agent': 'au-mesage/1.0'})
-                with urlopen(req, timeout=15) as resp:
-                    body = json.loads(resp.read().decode())
+                resp = http_client.get(url, headers=self._validators.headers(url), timeout=15)
+                if resp.status == 304:
+                    logger.debug(f"[{self.name}] {symbol} 未变化 (304)")
+                    continue
+                if not 200 <= resp.status < 300:
+                    raise HttpError(f"HTTP {resp.status}")
+                body = resp.json()
 
                 symbol_data = body.get(symbol.lower(), {})
                 api_date = body.get('date', date_str)
+                if self._last_dates.get(symbol) == api_date:
+                    logger.debug(f"[{self.name}] {symbol} 日期 {api_date} 已写入，跳过")
+                    self._validators.remember(url, resp)
+                    continue
 
                 for currency in target_currencies:
                     rate = symbol_data.get(currency)
@@ -59,9 +73,11 @@ class Fawazahmed0Collector(BaseCollector):
                     # fawazahmed0 数据仅写入 daily_ohlc 表，不写 price_data
                     # 避免 CNY/盎司 价格与 gold_api 的 USD/盎司 混在同一 data_type
 
+                self._last_dates[symbol] = api_date
+                self._validators.remember(url, resp)
                 logger.info(f"[{self.name}] {symbol} 日线数据已写入，日期 {api_date}")
 
-            except (URLError, Exception) as e:
+            except Exception as e:
                 logger.warning(f"[{self.name}] 获取 {symbol} 失败: {e}")
 
         # 数据仅写入 daily_ohlc 表，不写 price_data
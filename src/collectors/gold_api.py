@@ -2,13 +2,17 @@
 GoldAPICollector — 对接 api.gold-api.com
 免费、无需 API Key，提供 XAU/XAG/XPT/XPD 实时 USD 现货价
 更新频率：60 秒
+
+各品种并发请求，经共享 HTTP 客户端复用到 api.gold-api.com 的 keep-alive 连接；
+每个品种返回即写入，整轮受 CYCLE_DEADLINE 约束，耗时取决于最慢的单次请求而非总和。
 """
-import json
 import logging
-from urllib.request import Request, urlopen
-from urllib.error import URLError
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 
 from collectors.base import BaseCollector
+from net.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -22,39 +26,58 @@ SYMBOLS = [
 
 BASE_URL = 'https://api.gold-api.com/price/{symbol}'
 
+REQUEST_TIMEOUT = 10
+# 单轮截止时间（秒）；超时未返回的品种本轮放弃
+CYCLE_DEADLINE = float(os.environ.get('GOLD_API_CYCLE_DEADLINE', '15'))
+
 
 class GoldAPICollector(BaseCollector):
     name = 'gold_api'
     interval = 60
 
+    def __init__(self, mysql_manager, ingest=None):
+        super().__init__(mysql_manager, ingest)
+        self._executor = ThreadPoolExecutor(max_workers=len(SYMBOLS), thread_name_prefix='gold-api')
+
+    def _fetch_symbol(self, data_type: str, symbol: str, date_str: str, time_str: str, timeout: float):
+        try:
+            body = http_client.get_json(BASE_URL.format(symbol=symbol), timeout=timeout)
+            price = float(body.get('price', 0))
+        except Exception as e:
+            logger.warning(f"[{self.name}] 获取 {symbol} 失败: {e}")
+            return None
+        if price <= 0:
+            return None
+        return {
+            'trade_date': date_str,
+            'trade_time': time_str,
+            'data_type': data_type,
+            'real_time_price': price,
+            'recycle_price': price,   # spot 无买卖价差，视为相同
+            'high_price': 0,
+            'low_price': 0,
+            'source': self.name,
+            'currency': 'USD',
+        }
+
     def fetch(self) -> list:
-        results = []
         date_str = self.today_str()
         time_str = self.time_str()
+        deadline = time.monotonic() + CYCLE_DEADLINE
+        timeout = min(REQUEST_TIMEOUT, CYCLE_DEADLINE)
+
+        futures = {
+            self._executor.submit(self._fetch_symbol, data_type, symbol, date_str, time_str, timeout): symbol
+            for data_type, symbol in SYMBOLS
+        }
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                row = future.result()
+                if row:
+                    self.emit([row])
+        except FuturesTimeout:
+            pending = sorted(futures[f] for f in futures if not f.done())
+            logger.warning(f"[{self.name}] 本轮超过 {CYCLE_DEADLINE}s 截止，未完成: {pending}")
 
-        for data_type, symbol in SYMBOLS:
-            try:
-                url = BASE_URL.format(symbol=symbol)
-                req = Request(url, headers={'User-Agent': 'au-mesage/1.0'})
-                with urlopen(req, timeout=10) as resp:
-                    body = json.loads(resp.read().decode())
-
-                price = float(body.get('price', 0))
-                if price <= 0:
-                    continue
-
-                results.append({
-                    'trade_date': date_str,
-                    'trade_time': time_str,
-                    'data_type': data_type,
-                    'real_time_price': price,
-                    'recycle_price': price,   # spot 无买卖价差，视为相同
-                    'high_price': 0,
-                    'low_price': 0,
-                    'source': self.name,
-                    'currency': 'USD',
-                })
-            except (URLError, Exception) as e:
-                logger.warning(f"[{self.name}] 获取 {symbol} 失败: {e}")
-
-        return results
+        # 结果已逐条写入
+        return []
@@ -1,14 +1,20 @@
 """
 CollectorManager — 统一调度所有数据采集器
-根据环境变量决定启用哪些采集器
+根据环境变量决定启用哪些采集器；周期采集由单个截止时间调度器派发到有界线程池
 """
+import importlib.util
 import logging
 import os
 
 from collectors.gold_api import GoldAPICollector
 from collectors.exchange_rate import ExchangeRateCollector
 from collectors.fawazahmed0 import Fawazahmed0Collector
+from collectors.scheduler import Scheduler
 from collectors.source_config import source_config_cache
+from ingest.bars import MinuteBarBuilder
+from ingest.pipeline import IngestPipeline, set_active
+from ingest.deadband import deadband_from_env
+from ingest.spool import spool_from_env
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +23,30 @@ class CollectorManager:
     def __init__(self, mysql_manager):
         self.mysql_manager = mysql_manager
         self.collectors = []
+        # 所有采集器共用的写后入库流水线；经磁盘 spool 落盘后再写库，数据库故障期间不丢数据
+        self.ingest = IngestPipeline(
+            mysql_manager.batch_insert_data,
+            max_queue=int(os.environ.get('INGEST_QUEUE_SIZE', '10000')),
+            flush_rows=int(os.environ.get('INGEST_FLUSH_ROWS', '500')),
+            flush_interval_ms=int(os.environ.get('INGEST_FLUSH_MS', '500')),
+            spool=spool_from_env(),
+            deadband=deadband_from_env(),
+            bars=MinuteBarBuilder(),
+            bar_sink=mysql_manager.upsert_minute_bars,
+        )
+        self.scheduler = Scheduler(
+            max_workers=int(os.environ.get('COLLECTOR_WORKERS', '4')),
+            jitter=float(os.environ.get('COLLECTOR_JITTER', '0.05')),
+        )
         source_config_cache.bind_db(mysql_manager)
         self._setup()
 
     def _setup(self):
         source_config_cache.refresh(force=True)
         candidates = [
-            ("gold_api", lambda: GoldAPICollector(self.mysql_manager)),
-            ("exchange_rate", lambda: ExchangeRateCollector(self.mysql_manager)),
-            ("fawazahmed0", lambda: Fawazahmed0Collector(self.mysql_manager)),
+            ("gold_api", lambda: GoldAPICollector(self.mysql_manager, self.ingest)),
+            ("exchange_rate", lambda: ExchangeRateCollector(self.mysql_manager, self.ingest)),
+            ("fawazahmed0", lambda: Fawazahmed0Collector(self.mysql_manager, self.ingest)),
         ]
 
         for source_id, factory in candidates:
@@ -36,13 +57,20 @@ class CollectorManager:
 
         playwright_enabled = source_config_cache.is_enabled("playwright")
         if playwright_enabled and os.environ.get("ENABLE_PLAYWRIGHT", "true").lower() != "false":
-            try:
+            isolation = os.environ.get("PLAYWRIGHT_ISOLATION", "process").lower()
+            if importlib.util.find_spec("playwright") is None:
+                logger.warning("playwright 未安装，跳过 Playwright 采集器")
+            elif isolation == "thread":
                 from collectors.playwright_collector import PlaywrightCollector
 
-                self.collectors.append(PlaywrightCollector(self.mysql_manager))
-                logger.info("Playwright 采集器已启用")
-            except ImportError:
-                logger.warning("playwright 未安装，跳过 Playwright 采集器")
+                self.collectors.append(PlaywrightCollector(self.mysql_manager, self.ingest))
+                logger.info("Playwright 采集器已启用（进程内线程）")
+            else:
+                # 浏览器与解析在子进程内运行，tick 经管道回到本进程的入库流水线
+                from collectors.playwright_process import PlaywrightProcessCollector
+
+                self.collectors.append(PlaywrightProcessCollector(self.mysql_manager, self.ingest))
+                logger.info("Playwright 采集器已启用（独立子进程）")
         elif not playwright_enabled:
             logger.info("Playwright 采集器已禁用（data_source_config）")
         else:
@@ -52,9 +80,52 @@ class CollectorManager:
                     f"{[c.name for c in self.collectors]}")
 
     def start_all(self):
+        self.ingest.start()
+        set_active(self.ingest)
         for c in self.collectors:
             c.start()
+            if c.scheduled:
+                self.scheduler.add(c.name, c.interval, c.run_once)
+        reconcile_interval = int(os.environ.get('DAILY_STATS_RECONCILE_INTERVAL', '3600'))
+        if reconcile_interval > 0:
+            self.scheduler.add('daily-stats-reconcile', reconcile_interval, self._reconcile_daily_stats)
+        if int(os.environ.get('PARTITION_MONTHS_AHEAD', '3')) > 0:
+            self.scheduler.add('price-data-partitions', 86400, self._maintain_partitions)
+        if self.mysql_manager.retention.enabled:
+            # 启动后稍等再压缩，避开预热与首轮采集
+            self.scheduler.add('retention-compaction', int(os.environ.get('RETENTION_INTERVAL', '3600')),
+                               self._compact_history, delay=300)
+        self.scheduler.start()
+
+    def _reconcile_daily_stats(self):
+        """定时按原始 tick 核对增量日统计，不一致时修复"""
+        try:
+            self.mysql_manager.reconcile_daily_stats(fix=True)
+        except Exception as e:
+            logger.warning(f"日统计对账失败: {e}")
+
+    def _maintain_partitions(self):
+        """每日预建 price_data 未来分区（表未分区时为空操作）"""
+        try:
+            self.mysql_manager.maintain_partitions(int(os.environ.get('PARTITION_MONTHS_AHEAD', '3')))
+        except Exception as e:
+            logger.warning(f"price_data 分区维护失败: {e}")
+
+    def _compact_history(self):
+        """分层保留：分批压缩超出保留期的原始 tick / 分钟 K 线（调度线程池内运行，不占用入库写线程）"""
+        try:
+            self.mysql_manager.compact_history()
+        except Exception as e:
+            logger.warning(f"分层保留压缩失败: {e}")
 
     def stop_all(self):
+        self.scheduler.stop()
         for c in self.collectors:
             c.stop()
+        # 采集器停止后刷写队列剩余数据
+        self.ingest.stop()
+        try:
+            self.mysql_manager.flush_daily_stats(force=True)
+        except Exception as e:
+            logger.warning(f"停机写回日统计失败: {e}")
+        set_active(None)
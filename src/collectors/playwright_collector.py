@@ -1,6 +1,18 @@
 """
 PlaywrightCollector — 通过 Playwright 抓取金紫荆网站国内零售价
 可选采集器，通过 ENABLE_PLAYWRIGHT=true 启用
+
+行情页是实时更新的 SPA：页内 MutationObserver 在表格变化后把整表快照经暴露的 binding
+推回 Python（亚秒级），只有价格变化的品种入库；每 interval 秒再取一次整表快照全部入库作为心跳；reload 只用于恢复
+（快照失败、表格消失或超过 PLAYWRIGHT_STALE_SECONDS 无任何推送）。
+
+图片 / 字体 / 媒体与统计脚本在 context 层拦截（PLAYWRIGHT_BLOCK_RESOURCES）；累计 reload 达到
+PLAYWRIGHT_RECYCLE_RELOADS 次时重建 context 与页面，浏览器进程树 RSS 超过 PLAYWRIGHT_MAX_RSS_MB
+时重启整个浏览器，回收长期运行的内存泄漏。RSS / CPU / 页面加载耗时上报到 collectors.stats。
+
+配置 PLAYWRIGHT_CDP_URL 时不在本机启动 Chromium，而是经 CDP 连接共享浏览器、使用自己的 context
+（多个应用副本可共用一个浏览器；此时不做 RSS 重启）。默认由 collectors.playwright_process
+在独立子进程中运行本采集器。
 """
 import logging
 import os
@@ -11,141 +23,188 @@ from datetime import datetime
 import pytz
 from playwright.sync_api import sync_playwright
 
+from collectors import browser_usage, quote_page
+from collectors import stats as collector_stats
 from collectors.base import BaseCollector
 
 logger = logging.getLogger(__name__)
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 
+PUSH_DEBOUNCE_MS = 250
+PUMP_MS = 500  # sync API 只在调用期间分发 binding 回调，空闲时以该粒度等待
+
 
 class PlaywrightCollector(BaseCollector):
     name = 'playwright'
     interval = 60
+    scheduled = False  # 浏览器生命周期绑定在自有线程上
 
-    def __init__(self, mysql_manager):
-        super().__init__(mysql_manager)
+    def __init__(self, mysql_manager, ingest=None):
+        super().__init__(mysql_manager, ingest)
         self.website_url = os.environ.get('WEBSITE_URL', 'https://i.jzj9999.com/quoteh5/')
-        self.data_buffer = []
-        self.data_lock = threading.Lock()
+        self.cdp_url = os.environ.get('PLAYWRIGHT_CDP_URL', '').strip()
+        self.stale_seconds = float(os.environ.get('PLAYWRIGHT_STALE_SECONDS', '600'))
+        self.block_types = quote_page.blocked_types(
+            os.environ.get('PLAYWRIGHT_BLOCK_RESOURCES', ','.join(sorted(quote_page.DEFAULT_BLOCKED_TYPES))))
+        self.recycle_reloads = int(os.environ.get('PLAYWRIGHT_RECYCLE_RELOADS', '50'))
+        self.max_rss_bytes = float(os.environ.get('PLAYWRIGHT_MAX_RSS_MB', '1024')) * (1 << 20)
+        self._playwright = None
         self.browser = None
+        self.context = None
         self.page = None
+        self.pushes = 0
+        self.reloads = 0
+        self.recycles = 0
+        self.blocked_requests = 0
+        self.last_load_ms = None
+        self._page_reloads = 0
+        self._last_push = time.monotonic()
+        self._last_usage = None
+        self._last_prices = {}  # 品名 → 最近一次入库的价格列，推送据此只发变化的品种
 
     def start(self):
         """Playwright 需要独立线程管理浏览器生命周期，覆盖父类 start"""
         self.is_running = True
         self._thread = threading.Thread(target=self._run_playwright, daemon=True)
         self._thread.start()
-        self._save_thread = threading.Thread(target=self._save_job, daemon=True)
-        self._save_thread.start()
         logger.info(f"[{self.name}] Playwright 采集器已启动")
 
     def fetch(self) -> list:
-        """由 _run_playwright 直接调用，此方法仅供接口兼容"""
-        return self._refresh_and_get_data()
+        """整表快照一次 evaluate；由 _run_playwright 定时调用作为心跳"""
+        items = self.page.evaluate(quote_page.SNAPSHOT_JS)
+        quote_page.changed_items(items, self._last_prices)  # 心跳整表入库，同时刷新推送的比较基准
+        return quote_page.rows_from_snapshot(items, datetime.now(BEIJING_TZ), self.name)
+
+    def _on_push(self, source, items):
+        """页内 observer 推送（运行在 Playwright 线程内）；只入库价格有变化的品种"""
+        self.pushes += 1
+        self._last_push = time.monotonic()
+        changed = quote_page.changed_items(items, self._last_prices)
+        if changed:
+            self.emit(quote_page.rows_from_snapshot(changed, datetime.now(BEIJING_TZ), self.name))
+
+    def _route(self, route):
+        request = route.request
+        if quote_page.should_block(request.resource_type, request.url, self.block_types):
+            self.blocked_requests += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def _open_page(self):
+        """新建 context + 页面并加载；回收时先关闭旧 context（其渲染进程随之退出）"""
+        if self.context is not None:
+            self.context.close()
+        self.context = self.browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        )
+        self.context.route('**/*', self._route)
+        self.page = self.context.new_page()
+        self.page.set_default_timeout(30000)
+        # binding 跨导航保留，reload 后只需重新挂 observer
+        self.page.expose_binding(quote_page.PUSH_BINDING, self._on_push)
+        self._page_reloads = 0
+        self._load()
+
+    def _load(self, reload=False):
+        # SPA 长时间长连时 networkidle 可能永不触发，改用 domcontentloaded + 等待表格
+        started = time.monotonic()
+        if reload and self._page_reloads >= self.recycle_reloads > 0:
+            logger.info(f"[playwright] 已 reload {self._page_reloads} 次，重建页面")
+            self.recycles += 1
+            self._open_page()
+            return
+        if reload:
+            self.reloads += 1
+            self._page_reloads += 1
+            self.page.reload(wait_until='domcontentloaded')
+        else:
+            self.page.goto(self.website_url, wait_until='domcontentloaded')
+        self.page.wait_for_selector(quote_page.ROW_SELECTOR, timeout=30000)
+        self.page.evaluate(quote_page.INSTALL_OBSERVER_JS, PUSH_DEBOUNCE_MS)
+        self.last_load_ms = round((time.monotonic() - started) * 1000.0, 2)
+        self._last_push = time.monotonic()
+
+    def _watchdog(self):
+        """上报浏览器资源占用；进程树 RSS 超过上限时重启浏览器"""
+        usage = browser_usage.tree_usage()
+        metrics = {
+            'pushes': self.pushes,
+            'reloads': self.reloads,
+            'recycles': self.recycles,
+            'blocked_requests': self.blocked_requests,
+            'last_load_ms': self.last_load_ms,
+        }
+        if usage is not None:
+            now = time.monotonic()
+            if self._last_usage is not None and now > self._last_usage[0]:
+                metrics['cpu_percent'] = round(
+                    (usage['cpu_seconds'] - self._last_usage[1]) / (now - self._last_usage[0]) * 100.0, 1)
+            self._last_usage = (now, usage['cpu_seconds'])
+            metrics['rss_mb'] = round(usage['rss_bytes'] / (1 << 20), 1)
+            metrics['processes'] = usage['processes']
+        self.report_browser(metrics)
+        if self.cdp_url:
+            return
+        if usage is not None and self.max_rss_bytes > 0 and usage['rss_bytes'] > self.max_rss_bytes:
+            logger.warning(f"[playwright] 浏览器 RSS {metrics['rss_mb']}MB 超过上限，重启浏览器")
+            self.recycles += 1
+            self._launch()
+
+    def report_browser(self, metrics):
+        collector_stats.record_browser(self.name, metrics)
+
+    def _launch(self):
+        if self.browser is not None:
+            self.browser.close()
+            self.context = None
+        if self.cdp_url:
+            self.browser = self._playwright.chromium.connect_over_cdp(self.cdp_url)
+            self._open_page()
+            return
+        self.browser = self._playwright.chromium.launch(
+            headless=True,
+            args=['--disable-blink-features=AutomationControlled',
+                  '--disable-dev-shm-usage', '--no-sandbox']
+        )
+        self._open_page()
 
     def _run_playwright(self):
         try:
             with sync_playwright() as p:
-                self.browser = p.chromium.launch(
-                    headless=True,
-                    args=['--disable-blink-features=AutomationControlled',
-                          '--disable-dev-shm-usage', '--no-sandbox']
-                )
-                context = self.browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
-                self.page = context.new_page()
-                self.page.set_default_timeout(30000)
-                # SPA 长时间长连时 networkidle 可能永不触发，改用 domcontentloaded + 等待表格
-                self.page.goto(self.website_url, wait_until='domcontentloaded')
-                self.page.wait_for_selector('.quote-price-table .price-table-row', timeout=30000)
-                logger.info("[playwright] 浏览器初始化完成，开始监控数据...")
+                self._playwright = p
+                self._launch()
+                logger.info("[playwright] 浏览器初始化完成，开始监听页面推送...")
 
+                next_snapshot = time.monotonic() + self.interval
                 while self.is_running:
                     try:
-                        data = self._refresh_and_get_data()
-                        if data:
-                            with self.data_lock:
-                                self.data_buffer.extend(data)
-                            logger.info(f"[playwright] 获取 {len(data)} 条数据，缓冲区 {len(self.data_buffer)} 条")
-                        time.sleep(self.interval)
+                        self.page.wait_for_timeout(PUMP_MS)
+                        now = time.monotonic()
+                        if now - self._last_push > self.stale_seconds:
+                            logger.warning(f"[playwright] {self.stale_seconds:.0f}s 无页面推送，重新加载")
+                            self._load(reload=True)
+                        elif now >= next_snapshot:
+                            next_snapshot = now + self.interval
+                            data = self.fetch()
+                            if not data:
+                                raise RuntimeError("报价表为空")
+                            self.emit(data)
+                            self._watchdog()
                     except Exception as e:
                         logger.error(f"[playwright] 采集循环错误: {e}")
                         time.sleep(30)
+                        try:
+                            self._load(reload=True)
+                        except Exception as e2:
+                            logger.error(f"[playwright] 页面恢复失败: {e2}")
         except Exception as e:
             logger.error(f"[playwright] 运行错误: {e}")
         finally:
             if self.browser:
                 self.browser.close()
 
-    def _refresh_and_get_data(self) -> list:
-        try:
-            self.page.reload(wait_until='domcontentloaded')
-            self.page.wait_for_selector('.quote-price-table .price-table-row', timeout=15000)
-            elements = self.page.query_selector_all('.quote-price-table .price-table-row')
-            extracted = []
-
-            for element in elements:
-                try:
-                    # 行结构：el-col-8 品名 + 三个 el-col-6（回购/销售/最高+现价等，第四列可能含两个价）
-                    name_el = element.query_selector('.symbol-name')
-                    product_name = name_el.inner_text().strip() if name_el else '未知商品'
-
-                    def get_price(nth):
-                        # nth 为 el-row 下第 n 个子节点；第 1 列为 el-col-8，价从第 2 列起为 el-col-6
-                        el = element.query_selector(
-                            f'.el-col-6:nth-child({nth}) .symbol-price-rise,'
-                            f'.el-col-6:nth-child({nth}) .symbol-price-fall,'
-                            f'.el-col-6:nth-child({nth}) .symbole-price span'
-                        )
-                        raw = el.inner_text().strip() if el else '0'
-                        cleaned = ''.join(c for c in raw if c.isdigit() or c in '.-')
-                        return float(cleaned) if cleaned else 0.0
-
-                    # 与页面列顺序一致：回购、销售、最高（第四列多价时取首个匹配，一般为最高价）
-                    buyback = get_price(2)
-                    selling = get_price(3)
-                    high = get_price(4)
-
-                    beijing_now = datetime.now(BEIJING_TZ)
-                    extracted.append({
-                        'trade_date': beijing_now.strftime('%Y-%m-%d'),
-                        'trade_time': beijing_now.strftime('%H:%M:%S'),
-                        'data_type': product_name,
-                        'real_time_price': selling,
-                        'recycle_price': buyback,
-                        'high_price': high,
-                        'low_price': 0,
-                        'source': self.name,
-                        'currency': 'CNY',
-                    })
-                except Exception as e:
-                    logger.error(f"[playwright] 解析行错误: {e}")
-
-            return extracted
-        except Exception as e:
-            logger.error(f"[playwright] 页面刷新错误: {e}")
-            return []
-
-    def _save_job(self):
-        while self.is_running:
-            time.sleep(30)
-            to_store = []
-            with self.data_lock:
-                if self.data_buffer:
-                    to_store = self.data_buffer.copy()
-                    self.data_buffer = []
-            
-            if to_store:
-                try:
-                    self.mysql_manager.batch_insert_data(to_store)
-                    logger.info(f"[playwright] 存储 {len(to_store)} 条数据")
-                except Exception as e:
-                    logger.error(f"[playwright] 存储错误: {e}")
-                    # 如果存储失败，考虑把数据加回去，但要注意顺序或重复
-                    with self.data_lock:
-                        self.data_buffer = to_store + self.data_buffer
-
     def stop(self):
         self.is_running = False
         if self.browser:
@@ -0,0 +1,185 @@
+"""
+PlaywrightProcessCollector — 在独立子进程中运行 PlaywrightCollector，与 API 进程隔离
+
+浏览器自动化、页内推送分发与解析都在子进程内，不与 API 线程争用 GIL；浏览器崩溃或卡死只影响
+子进程，由父进程按退避重启。IPC 为本地管道上的 JSON 行：
+- 子 → 父（子进程 stdout）：{"type": "ticks", "rows": [...]} / {"type": "browser", "metrics": {...}}；
+- 父 → 子（子进程 stdin）：父进程关闭管道或退出即通知子进程停止。
+父进程收到的 tick 经 BaseCollector.emit 进入常规入库流水线。子进程日志输出到继承的 stderr。
+
+子进程每个采集周期至少发送一条 browser 指标；超过 PLAYWRIGHT_HANG_SECONDS 没有任何协议消息时
+（浏览器卡在 CDP 调用里、进程仍存活）父进程的看门狗线程 kill 子进程，走正常的退避重启。
+
+子进程入口：python -m collectors.playwright_process
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from collectors import stats as collector_stats
+from collectors.base import MAX_BACKOFF, BaseCollector
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESTART_DELAY = 30
+
+
+def decode_message(line):
+    """解析子进程输出的一行；非协议行返回 None"""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) and 'type' in message else None
+
+
+class PlaywrightProcessCollector(BaseCollector):
+    name = 'playwright'
+    interval = 60
+    scheduled = False  # 子进程自行驱动采集节奏
+
+    def __init__(self, mysql_manager, ingest=None):
+        super().__init__(mysql_manager, ingest)
+        self.proc = None
+        self.restarts = 0
+        self.hangs = 0
+        self.hang_seconds = float(os.environ.get('PLAYWRIGHT_HANG_SECONDS', str(self.interval * 5)))
+        self._last_message = time.monotonic()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def fetch(self) -> list:
+        """数据由子进程推送，此方法仅供接口兼容"""
+        return []
+
+    def start(self):
+        self.is_running = True
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._supervise, name='playwright-supervisor', daemon=True)
+        self._thread.start()
+        logger.info(f"[{self.name}] Playwright 子进程采集器已启动")
+
+    def _spawn(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(p for p in (_SRC_DIR, env.get('PYTHONPATH')) if p)
+        return subprocess.Popen(
+            [sys.executable, '-m', 'collectors.playwright_process'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env,
+        )
+
+    def _supervise(self):
+        delay = RESTART_DELAY
+        while self.is_running:
+            started = time.monotonic()
+            try:
+                self.proc = self._spawn()
+                self._last_message = time.monotonic()
+                threading.Thread(target=self._watch, args=(self.proc,),
+                                 name='playwright-watchdog', daemon=True).start()
+                self._pump(self.proc.stdout)
+                code = self.proc.wait()
+            except Exception as e:
+                logger.error(f"[playwright] 子进程运行错误: {e}")
+                code = None
+            if not self.is_running:
+                return
+            collector_stats.record_failure(self.name)
+            self.restarts += 1
+            # 运行超过一个退避周期视为恢复过，退避从头计
+            delay = RESTART_DELAY if time.monotonic() - started > delay else min(MAX_BACKOFF, delay * 2)
+            logger.error(f"[playwright] 子进程退出（code={code}），{delay}s 后重启")
+            if self._stopped.wait(delay):
+                return
+
+    def _watch(self, proc):
+        """子进程存活但长时间无消息（卡死）时 kill，_pump 随之读到 EOF 进入重启流程"""
+        step = max(0.01, min(5.0, self.hang_seconds / 4))
+        while proc.poll() is None and not self._stopped.wait(step):
+            silent = time.monotonic() - self._last_message
+            if self.hang_seconds > 0 and silent > self.hang_seconds and proc.poll() is None:
+                self.hangs += 1
+                logger.error(f"[playwright] 子进程 {silent:.0f}s 无消息，判定卡死并终止")
+                proc.kill()
+                return
+
+    def _pump(self, stream):
+        """逐行读取子进程输出直到 EOF（子进程退出）"""
+        for line in stream:
+            message = decode_message(line)
+            if message is None:
+                continue
+            self._last_message = time.monotonic()
+            if message['type'] == 'ticks':
+                self.emit(message.get('rows') or [])
+            elif message['type'] == 'browser':
+                metrics = dict(message.get('metrics') or {}, pid=self.proc.pid if self.proc else None,
+                               restarts=self.restarts, hangs=self.hangs)
+                collector_stats.record_browser(self.name, metrics)
+
+    def stop(self):
+        self.is_running = False
+        self._stopped.set()
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=10)
+            except Exception:
+                proc.kill()
+        logger.info("[playwright] 子进程已停止")
+
+
+class _PipeSink:
+    """子进程内替代入库流水线：tick 写成 JSON 行交给父进程"""
+
+    def __init__(self, out):
+        self._out = out
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        data = json.dumps(message, ensure_ascii=False, default=str)
+        with self._lock:
+            self._out.write(data + '\n')
+            self._out.flush()
+
+    def submit(self, rows):
+        self.send({'type': 'ticks', 'rows': rows})
+        return len(rows)
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - playwright-worker - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr,
+    )
+    # 协议独占原 stdout；其余输出（含第三方 print 与 Playwright driver 继承的 fd 1）改走 stderr
+    out = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    sink = _PipeSink(out)
+
+    from collectors.playwright_collector import PlaywrightCollector
+
+    class WorkerCollector(PlaywrightCollector):
+        def report_browser(self, metrics):
+            sink.send({'type': 'browser', 'metrics': metrics})
+
+    collector = WorkerCollector(None, sink)
+
+    def watch_parent():
+        sys.stdin.read()  # 父进程关闭管道（停止或退出）时返回
+        collector.is_running = False
+
+    threading.Thread(target=watch_parent, name='parent-watch', daemon=True).start()
+    collector.is_running = True
+    collector._run_playwright()
+
+
+if __name__ == '__main__':
+    main()
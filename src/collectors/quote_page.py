@@ -0,0 +1,115 @@
+"""
+金紫荆行情页（SPA）的页内提取脚本与解析，供 PlaywrightCollector 使用；不依赖 playwright，便于测试。
+
+- SNAPSHOT_JS：一次 evaluate 把整张报价表序列化为 [{name, prices: [回购, 销售, 最高]}]；
+- INSTALL_OBSERVER_JS：在页面内挂 MutationObserver，表格内容变化后（去抖）经暴露的 binding
+  把快照推回 Python，幂等，重新加载页面后需再次执行；
+- rows_from_snapshot：把快照转为标准化 tick；
+- changed_items：推送只保留价格相对上次入库有变化的品种（页面任一单元格变化都会触发整表推送）；
+- should_block：浏览器请求拦截策略（图片 / 字体 / 媒体与统计脚本不加载）。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List
+from urllib.parse import urlsplit
+
+ROW_SELECTOR = '.quote-price-table .price-table-row'
+PUSH_BINDING = '__auQuotePush'
+
+DEFAULT_BLOCKED_TYPES = frozenset({'image', 'font', 'media'})
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'hm.baidu.com', 'cnzz.com', 'umeng.com',
+)
+
+# 行结构：el-col-8 品名 + 三个 el-col-6（回购/销售/最高+现价等，第四列可能含两个价时取首个匹配）
+SNAPSHOT_JS = """
+() => Array.from(document.querySelectorAll('%(rows)s')).map(row => {
+    const name = row.querySelector('.symbol-name');
+    const price = nth => {
+        const el = row.querySelector(
+            `.el-col-6:nth-child(${nth}) .symbol-price-rise,` +
+            `.el-col-6:nth-child(${nth}) .symbol-price-fall,` +
+            `.el-col-6:nth-child(${nth}) .symbole-price span`);
+        return el ? el.innerText.trim() : '0';
+    };
+    return {name: name ? name.innerText.trim() : '未知商品', prices: [price(2), price(3), price(4)]};
+})
+""" % {'rows': ROW_SELECTOR}
+
+INSTALL_OBSERVER_JS = """
+(debounceMs) => {
+    if (window.__auQuoteObserver) return false;
+    const snapshot = %(snapshot)s;
+    let timer = null, last = '';
+    const flush = () => {
+        timer = null;
+        const items = snapshot();
+        const text = JSON.stringify(items);
+        if (!items.length || text === last) return;
+        last = text;
+        window.%(binding)s(items);
+    };
+    window.__auQuoteObserver = new MutationObserver(() => {
+        if (timer === null) timer = setTimeout(flush, debounceMs);
+    });
+    window.__auQuoteObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+    flush();
+    return true;
+}
+""" % {'snapshot': SNAPSHOT_JS.strip(), 'binding': PUSH_BINDING}
+
+
+def parse_price(raw: Any) -> float:
+    cleaned = ''.join(c for c in str(raw or '') if c.isdigit() or c in '.-')
+    try:
+        return float(cleaned) if cleaned else 0.0
+    except ValueError:
+        return 0.0
+
+
+def rows_from_snapshot(items: List[Dict[str, Any]], now: datetime, source: str = 'playwright') -> List[Dict[str, Any]]:
+    """快照 → 标准化 tick；同一批共用一个采集时刻。"""
+    trade_date = now.strftime('%Y-%m-%d')
+    trade_time = now.strftime('%H:%M:%S')
+    rows = []
+    for item in items or []:
+        prices = list(item.get('prices') or []) + ['0'] * 3
+        buyback, selling, high = (parse_price(p) for p in prices[:3])
+        rows.append({
+            'trade_date': trade_date,
+            'trade_time': trade_time,
+            'data_type': item.get('name') or '未知商品',
+            'real_time_price': selling,
+            'recycle_price': buyback,
+            'high_price': high,
+            'low_price': 0,
+            'source': source,
+            'currency': 'CNY',
+        })
+    return rows
+
+
+def changed_items(items: List[Dict[str, Any]], last: Dict[str, tuple]) -> List[Dict[str, Any]]:
+    """返回价格与 last 中记录不同（或首次出现）的品种，并把 last 更新为本次快照的价格。"""
+    changed = []
+    for item in items or []:
+        name = item.get('name') or '未知商品'
+        prices = tuple(item.get('prices') or ())
+        if last.get(name) != prices:
+            last[name] = prices
+            changed.append(item)
+    return changed
+
+
+def blocked_types(raw: str) -> FrozenSet[str]:
+    """PLAYWRIGHT_BLOCK_RESOURCES 形如 "image,font,media"；空字符串表示不按类型拦截。"""
+    return frozenset(t.strip() for t in raw.split(',') if t.strip())
+
+
+def should_block(resource_type: str, url: str, types: Iterable[str] = DEFAULT_BLOCKED_TYPES) -> bool:
+    if resource_type in types:
+        return True
+    host = (urlsplit(url).hostname or '').lower()
+    return any(host == h or host.endswith('.' + h) for h in BLOCKED_HOSTS)
@@ -0,0 +1,125 @@
+"""
+Scheduler — 采集器的集中调度：单个调度线程 + 按截止时间排序的小根堆 + 有界工作线程池
+
+- 计划时刻基于 time.monotonic()，成功一轮后下一次 = 上一计划时刻 + interval，不随执行耗时漂移；
+  执行超过间隔时跳过已错过的时刻，并计入 overruns。
+- 任务返回退避秒数时（连续失败），从完成时刻起按退避重新排期。
+- 每次排期叠加 [0, jitter * interval) 的随机抖动（不累积到计划时刻），避免各源同时请求。
+- 调度线程只在最近截止时间或有新任务 / stop() 时被唤醒，无轮询。
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from collectors import stats as collector_stats
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class _Job:
+    name: str
+    interval: float
+    fn: Callable[[], Optional[float]]
+    base: float  # 未加抖动的计划时刻（monotonic）
+    runs: int = 0
+    overruns: int = 0
+    last_lag_ms: Optional[float] = None
+
+
+class Scheduler:
+    def __init__(self, max_workers: int = 4, jitter: float = 0.05) -> None:
+        self.jitter = jitter
+        self._heap: List[Tuple[float, int, _Job]] = []
+        self._jobs: Dict[str, _Job] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='collector')
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, interval: float, fn: Callable[[], Optional[float]], delay: float = 0.0) -> None:
+        """登记周期任务：fn 返回 None 表示按 interval 正常节奏，返回秒数表示退避。"""
+        with self._cond:
+            job = _Job(name=name, interval=interval, fn=fn, base=time.monotonic() + delay)
+            self._jobs[name] = job
+            self._push(job)
+            self._cond.notify()
+
+    def _push(self, job: _Job) -> None:
+        jitter = random.uniform(0, self.jitter * job.interval) if self.jitter > 0 else 0.0
+        heapq.heappush(self._heap, (job.base + jitter, next(self._seq), job))
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name='collector-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """立即唤醒调度线程退出；不再派发新任务，未开始的任务被取消。"""
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self) -> None:
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due = self._heap[0][0]
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                _, _, job = heapq.heappop(self._heap)
+                job.last_lag_ms = (now - due) * 1000.0
+                self._executor.submit(self._execute, job)
+
+    def _execute(self, job: _Job) -> None:
+        try:
+            backoff = job.fn()
+        except Exception as e:
+            logger.error(f"[{job.name}] 调度任务异常: {e}")
+            backoff = None
+        with self._cond:
+            job.runs += 1
+            if self._stopped:
+                return
+            now = time.monotonic()
+            if backoff is not None:
+                job.base = now + backoff
+            else:
+                job.base += job.interval
+                if job.base <= now:
+                    missed = int((now - job.base) // job.interval) + 1
+                    job.base += missed * job.interval
+                    job.overruns += missed
+                    collector_stats.record_overrun(job.name, missed)
+                    logger.warning(f"[{job.name}] 执行超过间隔，错过 {missed} 个计划时刻")
+            self._push(job)
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                job.name: {
+                    'runs': job.runs,
+                    'overruns': job.overruns,
+                    'last_lag_ms': None if job.last_lag_ms is None else round(job.last_lag_ms, 2),
+                    'next_in_s': round(max(0.0, job.base - now), 3),
+                }
+                for job in self._jobs.values()
+            }
@@ -14,19 +14,24 @@ _lock = threading.Lock()
 _stats: dict[str, dict[str, Any]] = {}
 
 
+def _row(name: str) -> dict[str, Any]:
+    return _stats.setdefault(
+        name,
+        {
+            "source_id": name,
+            "last_success_at": None,
+            "last_failure_at": None,
+            "failure_count": 0,
+            "last_latency_ms": None,
+            "overruns": 0,
+        },
+    )
+
+
 def record_success(name: str, latency_ms: float) -> None:
     now = datetime.now(BEIJING_TZ).isoformat()
     with _lock:
-        row = _stats.setdefault(
-            name,
-            {
-                "source_id": name,
-                "last_success_at": None,
-                "last_failure_at": None,
-                "failure_count": 0,
-                "last_latency_ms": None,
-            },
-        )
+        row = _row(name)
         row["last_success_at"] = now
         row["last_latency_ms"] = round(latency_ms, 2)
         row["failure_count"] = 0
@@ -35,23 +40,27 @@ def record_success(name: str, latency_ms: float) -> None:
 def record_failure(name: str) -> None:
     now = datetime.now(BEIJING_TZ).isoformat()
     with _lock:
-        row = _stats.setdefault(
-            name,
-            {
-                "source_id": name,
-                "last_success_at": None,
-                "last_failure_at": None,
-                "failure_count": 0,
-                "last_latency_ms": None,
-            },
-        )
+        row = _row(name)
         row["last_failure_at"] = now
         row["failure_count"] = int(row.get("failure_count") or 0) + 1
 
 
+def record_overrun(name: str, missed: int) -> None:
+    """一轮采集耗时超过间隔，错过 missed 个计划时刻。"""
+    with _lock:
+        row = _row(name)
+        row["overruns"] = int(row.get("overruns") or 0) + missed
+
+
+def record_browser(name: str, metrics: dict[str, Any]) -> None:
+    """浏览器型采集器的资源占用（RSS / CPU / 页面加载耗时等），整体覆盖。"""
+    with _lock:
+        _row(name)["browser"] = dict(metrics)
+
+
 def snapshot() -> list[dict[str, Any]]:
     with _lock:
-        return [dict(v) for v in _stats.values()]
+        return [{k: dict(x) if isinstance(x, dict) else x for k, x in v.items()} for v in _stats.values()]
 
 
 def reset_for_tests() -> None:
@@ -1,22 +1,44 @@
 """数据库管理门面类 — 组合连接池 + 子模块，对外保持统一接口。"""
 
+import logging
+import os
+import time
+from datetime import date, datetime, time as dtime, timedelta
 from typing import Dict, List, Optional
 
+import pytz
+
+from cache import daily_stats
+from cache.daily_stats import DailyStatsStore
+from cache.data_versions import DataVersions
+from cache.redis_backend import shared_backend
+from cache.tick_store import TickStore
+from db.forward_fill import fill_lookback_seconds, forward_fill, last_per_minute
 from db.pool import ConnectionPool
 from db.price_writer import PriceWriter
 from db.price_reader import PriceReader
 from db.trend_reader import TrendReader
 from db.exchange_reader import ExchangeReader
 from db.admin_store import AdminStore
+from db.partitions import PartitionManager
+from db.retention import TIER_DAILY, TIER_MINUTE, TIER_RAW, compactor_from_env, retention_from_env
+
+BEIJING_TZ = pytz.timezone("Asia/Shanghai")
 
 
 class DatabaseManager:
     """
     组合式数据库管理器。
-    - writer:  采集器写入操作 (price_data / exchange_rate / daily_ohlc)
+    - writer:  采集器写入操作 (price_data / price_daily_rollup / minute_ohlc / exchange_rate / daily_ohlc)
     - reader:  价格查询操作 (overview / latest / history)
     - trend:   趋势查询操作 (ohlc / intraday / ratio)
     - exchange: 汇率查询操作
+    - ticks:   进程内最近交易日 tick 缓冲，latest / history / 近 1 小时 / 日内优先由内存回答
+    - versions: 按 data_type 的写入版本号，API 缓存键据此在新数据提交后失效
+    - daily_stats: 概览用的增量日统计（当前价 / 昨收 / 今日高低），写回 daily_stats 表
+    - partitions: price_data 按月分区的预建与删除 / 归档
+    - retention / compactor: 分层保留策略（原始 tick → 分钟 K 线 → 日线 rollup）与后台压缩，
+      按日期范围读取的接口据此自动选层
     所有方法通过委托暴露，保持 mysql_manager.xxx() 的调用方式。
     """
 
@@ -27,10 +49,115 @@ class DatabaseManager:
         self.trend = TrendReader(self.pool)
         self.exchange = ExchangeReader(self.pool)
         self.admin = AdminStore(self.pool)
+        self.partitions = PartitionManager(self.pool)
+        self.retention = retention_from_env()
+        self.compactor = compactor_from_env(self.pool, self.writer, self.partitions)
+        self.ticks = TickStore(window_days=int(os.environ.get("TICK_STORE_WINDOW_DAYS", "2")))
+        self.versions = DataVersions(store=shared_backend())
+        self.daily_stats = DailyStatsStore()
+        self._daily_stats_interval = float(os.environ.get("DAILY_STATS_FLUSH_SECONDS", "5"))
+        self._daily_stats_flushed_at = 0.0
+
+    def warm_tick_store(self) -> bool:
+        """冷启动时从库内载入窗口数据；失败则保持冷状态（读取继续回退数据库）。"""
+        start = datetime.now(BEIJING_TZ).date() - timedelta(days=self.ticks.window_days - 1)
+        try:
+            rows = self.reader.get_ticks_since(start.strftime("%Y-%m-%d"))
+        except Exception as e:
+            logging.warning(f"tick 缓冲预热失败，读取将回退数据库: {e}")
+            return False
+        self.ticks.load(rows, covered_from=datetime.combine(start, dtime.min))
+        logging.info(f"tick 缓冲预热完成，载入 {len(rows)} 条")
+        return True
+
+    def warm_daily_stats(self) -> bool:
+        """载入增量日统计：优先 daily_stats 表，表为空时由原始 tick 计算一次并写回。"""
+        today = datetime.now(BEIJING_TZ).date()
+        rows = self.reader.get_daily_stats()
+        if not rows:
+            raw = self.reader.get_price_overview_data(
+                today.strftime("%Y-%m-%d"), (today - timedelta(days=1)).strftime("%Y-%m-%d"))
+            if not raw:
+                logging.warning("日统计预热无数据，概览将回退窗口查询")
+                return False
+            rows = daily_stats.entries_from_overview(raw, today)
+        self.daily_stats.load(rows)
+        self._write_daily_stats()
+        logging.info(f"日统计预热完成，{len(rows)} 个品种")
+        return True
+
+    def _write_daily_stats(self) -> None:
+        try:
+            self.writer.upsert_daily_stats(self.daily_stats.rows())
+        except Exception as e:
+            logging.warning(f"写回 daily_stats 失败（内存统计不受影响）: {e}")
+
+    def flush_daily_stats(self, force: bool = False) -> None:
+        """
+        只写回 apply 改动过的条目；节流到每 DAILY_STATS_FLUSH_SECONDS 至多一次，
+        跨日 / 新品种立即写回，force=True（停机、对账修复）时无条件写回。
+        """
+        now = time.monotonic()
+        if not (force or self.daily_stats.rolled_over or now - self._daily_stats_flushed_at >= self._daily_stats_interval):
+            return
+        rows = self.daily_stats.take_dirty()
+        if not rows:
+            return
+        self._daily_stats_flushed_at = now
+        try:
+            self.writer.upsert_daily_stats(rows)
+        except Exception as e:
+            self.daily_stats.mark_dirty(r["data_type"] for r in rows)
+            logging.warning(f"写回 daily_stats 失败（内存统计不受影响，下次重试）: {e}")
+
+    def reconcile_daily_stats(self, fix: bool = False) -> List[Dict]:
+        """
+        按原始 tick 窗口查询核对日统计（本进程已载入时核对内存，否则核对 daily_stats 表），
+        返回不一致项；fix=True 时用原始结果覆盖并写回表。
+        """
+        today = datetime.now(BEIJING_TZ).date()
+        raw = daily_stats.entries_from_overview(self.reader.get_price_overview_data(
+            today.strftime("%Y-%m-%d"), (today - timedelta(days=1)).strftime("%Y-%m-%d")), today)
+        raw_rows = [r for r in (daily_stats.view(e, today) for e in raw) if r is not None]
+        if self.daily_stats.loaded:
+            mine = self.daily_stats.view(today)
+        else:
+            mine = [r for r in (daily_stats.view(e, today) for e in self.reader.get_daily_stats()) if r is not None]
+        mismatches = daily_stats.diff(mine, raw_rows)
+        if mismatches:
+            logging.warning(f"日统计与原始数据不一致 {len(mismatches)} 项: {mismatches}")
+            if fix:
+                if self.daily_stats.loaded:
+                    self.daily_stats.replace(raw)
+                    self.flush_daily_stats(force=True)
+                else:
+                    self.writer.upsert_daily_stats(raw)
+                self.versions.bump_all()
+        return mismatches
 
     # ── 写入委托 ──────────────────────────────────────────
     def batch_insert_data(self, data_list: List[Dict]):
-        return self.writer.batch_insert_data(data_list)
+        result = self.writer.batch_insert_data(data_list)
+        self.ticks.extend(data_list)
+        if self.daily_stats.apply(data_list) and self.daily_stats.loaded:
+            self.flush_daily_stats()
+        self.versions.bump(item.get("data_type") for item in data_list)
+        return result
+
+    def upsert_minute_bars(self, bars: List[Dict]):
+        """入库流水线关闭的分钟 K 线；新分钟可见后日内 / 近 1 小时缓存随版本失效。"""
+        self.writer.upsert_minute_bars(bars)
+        self.versions.bump(b.get("data_type") for b in bars)
+
+    def rebuild_minute_bars(self, trade_date: str) -> int:
+        self._require_raw_tier(trade_date)
+        count = self.writer.rebuild_minute_bars(trade_date)
+        self.versions.bump_all()
+        return count
+
+    def data_version(self, data_type: Optional[str] = None) -> str:
+        """缓存键使用的数据版本令牌；不带 data_type 时为全局版本。"""
+        return self.versions.token(data_type)
 
     def upsert_exchange_rate(self, base: str, target: str, rate: float, source: str):
         return self.writer.upsert_exchange_rate(base, target, rate, source)
@@ -42,6 +169,45 @@ class DatabaseManager:
             trade_date, data_type, source, currency,
             open_price, high_price, low_price, close_price, volume)
 
+    def partition_price_data(self, months_ahead: int = 3) -> int:
+        return self.partitions.partition_table(datetime.now(BEIJING_TZ).date(), months_ahead)
+
+    def maintain_partitions(self, months_ahead: int = 3, drop_before=None, archive: bool = False) -> Dict:
+        """预建未来分区；给出 drop_before（date）时删除（或归档）整月早于它的分区。"""
+        result = {"created": self.partitions.ensure_future(datetime.now(BEIJING_TZ).date(), months_ahead),
+                  "dropped": []}
+        if drop_before is not None:
+            result["dropped"] = self.partitions.drop_before(drop_before, archive=archive)
+            if result["dropped"]:
+                self.versions.bump_all()
+        return result
+
+    def compact_history(self) -> Dict[str, int]:
+        """按保留策略压缩一轮（后台任务 / 运维命令调用）；未配置保留期时不做任何事。"""
+        if not self.retention.enabled:
+            return {}
+        stats = self.compactor.run(self.retention, datetime.now(BEIJING_TZ).date())
+        if stats["raw_deleted"] or stats["partitions_dropped"] or stats["minute_deleted"]:
+            self.versions.bump_all()
+            logging.info(f"分层保留压缩完成: {stats}")
+        return stats
+
+    def rebuild_daily_rollup(self, trade_date: str) -> int:
+        self._require_raw_tier(trade_date)
+        count = self.writer.rebuild_daily_rollup(trade_date)
+        self.versions.bump_all()
+        return count
+
+    def raw_cutoff(self) -> Optional[date]:
+        """原始 tick 保留的最早交易日（含）；未配置 RETENTION_RAW_DAYS 时为 None。"""
+        return self.retention.raw_cutoff(datetime.now(BEIJING_TZ).date())
+
+    def _require_raw_tier(self, trade_date: str) -> None:
+        """重建会先删除当天的分钟 K 线 / rollup 再按原始 tick 重算；原始 tick 已被压缩删除的日期必须拒绝。"""
+        day = datetime.strptime(trade_date, "%Y-%m-%d").date()
+        if self.retention.tier(day, datetime.now(BEIJING_TZ).date()) != TIER_RAW:
+            raise ValueError(f"{trade_date} 早于原始 tick 保留期（RETENTION_RAW_DAYS），已无原始数据可供重建")
+
     # ── 价格查询委托 ──────────────────────────────────────
     def query_data(
         self,
@@ -50,24 +216,68 @@ class DatabaseManager:
         data_type: Optional[str] = None,
         limit: Optional[int] = None,
     ):
-        return self.reader.query_data(start_date, end_date, data_type, limit)
+        """按日期范围导出：原始 tick 保留期内读 price_data，更早的日期依次读分钟 K 线、日线 rollup（新→旧拼接）。"""
+        today = datetime.now(BEIJING_TZ).date()
+        segments = self.retention.split_range(
+            datetime.strptime(start_date, "%Y-%m-%d").date(), datetime.strptime(end_date, "%Y-%m-%d").date(), today)
+        if len(segments) <= 1 and (not segments or segments[0][0] == TIER_RAW):
+            return self.reader.query_data(start_date, end_date, data_type, limit)
+        readers = {TIER_RAW: self.reader.query_data, TIER_MINUTE: self.reader.query_minute_bars,
+                   TIER_DAILY: self.reader.query_daily_rollup}
+        rows: List[Dict] = []
+        for tier, start, end in segments:
+            remaining = None if limit is None else limit - len(rows)
+            if remaining is not None and remaining <= 0:
+                break
+            rows.extend(readers[tier](start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), data_type, remaining))
+        return rows
 
     def get_latest_data_by_type(self):
+        rows = self.ticks.latest_by_type()
+        if rows is not None:
+            return rows
         return self.reader.get_latest_data_by_type()
 
     def get_latest_data(self, data_type: Optional[str] = None) -> Optional[Dict]:
+        if not data_type:
+            return self.get_latest_data_by_type()
+        row = self.ticks.latest(data_type)
+        if row is not None:
+            return row
         return self.reader.get_latest_data(data_type)
 
     def get_price_history(self, data_type: str, limit: int = 20) -> List[Dict]:
+        rows = self.ticks.history(data_type, limit)
+        if rows is not None:
+            return rows
         return self.reader.get_price_history(data_type, limit)
 
     def get_latest_market_price(self, data_type: str) -> Optional[float]:
+        row = self.ticks.latest(data_type)
+        if row is not None:
+            return row["real_time_price"] or row["recycle_price"]
         return self.reader.get_latest_market_price(data_type)
 
     def get_daily_history(self, date: str, data_type: Optional[str] = None) -> List[Dict]:
+        """某日全部点位；原始 tick 已超出保留期的日期改读分钟 K 线（再早为日线收盘），为空时回退原始 tick。"""
+        tier = self.retention.tier(datetime.strptime(date, "%Y-%m-%d").date(), datetime.now(BEIJING_TZ).date())
+        if tier != TIER_RAW:
+            query = self.reader.query_minute_bars if tier == TIER_MINUTE else self.reader.query_daily_rollup
+            rows = list(reversed(query(date, date, data_type)))
+            if rows:
+                return rows
         return self.reader.get_daily_history(date, data_type)
 
     def get_price_overview_data(self, today_str: str, yesterday_str: str) -> List[Dict]:
+        """概览：本进程的增量日统计（无 SQL）→ daily_stats 表 → 原始 tick 窗口查询。"""
+        today = datetime.strptime(today_str, "%Y-%m-%d").date()
+        rows = self.daily_stats.view(today)
+        if rows:
+            return rows
+        stored = self.reader.get_daily_stats()
+        rows = [r for r in (daily_stats.view(e, today) for e in stored) if r is not None]
+        if rows:
+            return rows
         return self.reader.get_price_overview_data(today_str, yesterday_str)
 
     def get_price_overview_data_fallback(self) -> List[Dict]:
@@ -77,7 +287,28 @@ class DatabaseManager:
         return self.reader.get_price_history_by_time_range(data_type, start_time, end_time)
 
     def get_price_history_last_hour(self, data_type: str) -> List[Dict]:
-        return self.reader.get_price_history_last_hour(data_type)
+        """
+        近 1 小时，每分钟一个点：内存 tick 压成分钟收盘，否则读 minute_ohlc，表为空时回退原始 tick。
+        开启入库死区时对缺失的分钟前向填充。
+        """
+        now = datetime.now(BEIJING_TZ).replace(tzinfo=None)
+        start = now - timedelta(hours=1)
+        lookback = fill_lookback_seconds()
+        rows = self.ticks.since(data_type, start - timedelta(seconds=lookback))
+        if rows is None:
+            rows = self.reader.get_minute_bars_since(data_type, start - timedelta(seconds=lookback))
+        else:
+            rows = last_per_minute(rows)
+        if rows:
+            return forward_fill(rows, start, now) if lookback else [r for r in rows if r["created_at"] >= start]
+        rows = self.reader.get_price_history_last_hour(data_type, lookback)
+        if not lookback or not rows:
+            return rows
+        # 库内点的 created_at 为数据库时钟，窗口同样取数据库时钟
+        window_start = rows[0]["window_start"]
+        for r in rows:
+            r.pop("window_start", None)
+        return forward_fill(rows, window_start, window_start + timedelta(hours=1))
 
     def get_latest_updates_by_group(self) -> List[Dict]:
         return self.reader.get_latest_updates_by_group()
@@ -93,7 +324,21 @@ class DatabaseManager:
         return self.trend.get_ohlc_trend(data_type, start_date, end_date)
 
     def get_intraday_trend(self, data_type: str, date_str: str) -> List[Dict]:
-        return self.trend.get_intraday_trend(data_type, date_str)
+        """日内分钟走势（每分钟至多一个点）；开启入库死区时对缺失的分钟前向填充（至当前时刻或当日结束）。"""
+        rows = self.ticks.day(data_type, date_str)
+        if rows is not None:
+            rows = last_per_minute([
+                {"time": r["trade_time"], "recycle_price": r["recycle_price"],
+                 "real_time_price": r["real_time_price"], "created_at": r["created_at"]}
+                for r in rows
+            ])
+        else:
+            rows = self.trend.get_intraday_trend(data_type, date_str)
+        if not rows or not fill_lookback_seconds():
+            return rows
+        day_end = datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1) - timedelta(seconds=1)
+        end = min(day_end, datetime.now(BEIJING_TZ).replace(tzinfo=None))
+        return forward_fill(rows, rows[0]["created_at"], end)
 
     def get_gold_silver_ratio(self, start_date: str, end_date: str) -> List[Dict]:
         return self.trend.get_gold_silver_ratio(start_date, end_date)
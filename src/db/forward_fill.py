@@ -0,0 +1,97 @@
+"""
+读取侧前向填充：入库死区过滤（ingest.deadband）只保存价格变化点与心跳行，
+这里把稀疏序列还原为按分钟连续的点，接口返回的形状与未过滤时一致。
+
+- 每个分钟格内没有真实点时，用上一个点的价格补一行（created_at / 时间列为格起点）；
+- 距上一个真实点超过 max_gap 秒不再填充（数据确实缺失时不掩盖采集中断）。
+
+last_per_minute 把内存 tick 缓冲的原始点压成每分钟一个点（与 minute_ohlc 的 close 一致），
+近 1 小时 / 日内序列的行数因此与采集频率无关（每日至多 1440 行）。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ingest.deadband import heartbeat_seconds
+
+STEP_SECONDS = 60
+
+
+def fill_lookback_seconds() -> int:
+    """需要向窗口前多取的秒数（取到窗口起点之前最后一个点）；死区关闭时为 0。"""
+    heartbeat = heartbeat_seconds()
+    return int(heartbeat) + STEP_SECONDS if heartbeat > 0 else 0
+
+
+def last_per_minute(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """rows 按 created_at 升序；每个分钟格保留最后一个点，created_at 与时间列取分钟起点。"""
+    out: List[Dict[str, Any]] = []
+    cell = None
+    for row in rows:
+        at = row["created_at"].replace(second=0, microsecond=0)
+        if at == cell:
+            out[-1] = _filled(row, at)
+        else:
+            out.append(_filled(row, at))
+            cell = at
+    return out
+
+
+def _filled(prev: Dict[str, Any], at: datetime) -> Dict[str, Any]:
+    row = dict(prev)
+    tod = timedelta(hours=at.hour, minutes=at.minute, seconds=at.second)
+    row["created_at"] = at
+    if "trade_time" in row:
+        row["trade_time"] = tod
+        row["trade_date"] = at.date()
+    if "time" in row:
+        row["time"] = tod
+    return row
+
+
+def forward_fill(
+    rows: List[Dict[str, Any]],
+    start: datetime,
+    end: datetime,
+    max_gap: Optional[float] = None,
+    step: int = STEP_SECONDS,
+) -> List[Dict[str, Any]]:
+    """
+    rows 按 created_at 升序，可包含 start 之前的点（作为填充起点，不输出）；
+    返回 [start, end] 内的真实点与填充点。
+    """
+    if max_gap is None:
+        max_gap = fill_lookback_seconds() + step
+    prev = None
+    i = 0
+    while i < len(rows) and rows[i]["created_at"] < start:
+        prev = rows[i]
+        i += 1
+    last_real = prev["created_at"] if prev is not None else None
+
+    out: List[Dict[str, Any]] = []
+    cell = start.replace(second=0, microsecond=0)
+    if cell < start:
+        cell += timedelta(seconds=step)
+    while i < len(rows) and rows[i]["created_at"] < cell:
+        prev = rows[i]
+        last_real = prev["created_at"]
+        out.append(prev)
+        i += 1
+
+    while cell <= end:
+        nxt = cell + timedelta(seconds=step)
+        had = False
+        while i < len(rows) and rows[i]["created_at"] < nxt:
+            prev = rows[i]
+            last_real = prev["created_at"]
+            out.append(prev)
+            had = True
+            i += 1
+        if not had and prev is not None and (cell - last_real).total_seconds() <= max_gap:
+            out.append(_filled(prev, cell))
+        cell = nxt
+    out.extend(rows[i:])
+    return out
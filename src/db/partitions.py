@@ -0,0 +1,142 @@
+"""
+price_data 按月 RANGE COLUMNS(trade_date) 分区管理。
+
+- 分区名 pYYYYMM 存放该月数据，另有兜底分区 pmax（VALUES LESS THAN MAXVALUE）；
+- partition_table：一次性把未分区的表按已有数据的月份范围分区（需先执行迁移 007 改造主键）；
+- ensure_future：从 pmax 拆出未来若干个月的空分区（REORGANIZE 只搬动 pmax 内的行，通常为空）；
+- drop_before：整月早于截止日期的分区直接 DROP PARTITION，可选先 EXCHANGE 到独立归档表，均为元数据操作。
+
+带 trade_date 条件的查询（日 K、日内、概览窗口等）由此获得分区裁剪。
+"""
+
+import logging
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from db.base import BaseDB
+
+TABLE = "price_data"
+MAXVALUE_PARTITION = "pmax"
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def add_months(d: date, months: int) -> date:
+    """d 所在月的第一天向后（或向前）移动 months 个月。"""
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def monthly_bounds(first: date, last: date) -> List[Tuple[str, date]]:
+    """first 与 last 所在月（含）之间每月一个分区：[(名称, 上界)]，上界为次月 1 日（不含）。"""
+    out = []
+    month = month_start(first)
+    while month <= last:
+        upper = add_months(month, 1)
+        out.append((partition_name(month), upper))
+        month = upper
+    return out
+
+
+def partition_definitions(bounds: List[Tuple[str, date]], with_max: bool = True) -> str:
+    parts = [f"PARTITION {name} VALUES LESS THAN ('{upper:%Y-%m-%d}')" for name, upper in bounds]
+    if with_max:
+        parts.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return ",\n  ".join(parts)
+
+
+class PartitionManager(BaseDB):
+    """price_data 分区维护；DDL 失败时抛出异常，由运维命令 / 定时任务记录。"""
+
+    def list_partitions(self) -> List[Dict]:
+        """现有分区（按位置排序）：name、upper（上界字符串，pmax 为 MAXVALUE）、table_rows（估算）。"""
+        return self._exec(
+            "SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS upper, TABLE_ROWS AS table_rows "
+            "FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION", (TABLE,))
+
+    def is_partitioned(self) -> bool:
+        return bool(self.list_partitions())
+
+    def partition_table(self, today: date, months_ahead: int = 3) -> int:
+        """把未分区的 price_data 按月分区（重建整表），覆盖最早数据所在月至 today 之后 months_ahead 个月；返回分区数。"""
+        if self.is_partitioned():
+            logging.info("price_data 已分区，跳过初始分区")
+            return 0
+        first = self._exec_value(f"SELECT MIN(trade_date) FROM {TABLE}") or today
+        bounds = monthly_bounds(first, add_months(today, months_ahead))
+        with self.get_cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {TABLE} PARTITION BY RANGE COLUMNS(trade_date) (\n  "
+                f"{partition_definitions(bounds)}\n)")
+        logging.info(f"price_data 已按月分区：{bounds[0][0]} ~ {bounds[-1][0]}，共 {len(bounds)} 个")
+        return len(bounds)
+
+    def ensure_future(self, today: date, months_ahead: int = 3) -> List[str]:
+        """保证 today 之后 months_ahead 个月都有独立分区，返回新建的分区名；未分区时不做任何事。"""
+        existing = self.list_partitions()
+        if not existing:
+            return []
+        names = {p["name"] for p in existing}
+        if MAXVALUE_PARTITION not in names:
+            logging.warning("price_data 缺少 pmax 分区，无法预建未来分区")
+            return []
+        last_upper = self._last_upper(existing)
+        start = last_upper or month_start(today)
+        bounds = [(n, u) for n, u in monthly_bounds(start, add_months(today, months_ahead)) if n not in names]
+        if not bounds:
+            return []
+        with self.get_cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {TABLE} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO (\n  "
+                f"{partition_definitions(bounds)}\n)")
+        created = [n for n, _ in bounds]
+        logging.info(f"price_data 预建分区: {created}")
+        return created
+
+    def drop_before(self, cutoff: date, archive: bool = False) -> List[str]:
+        """
+        删除上界不晚于 cutoff 所在月第一天的分区（即整月早于 cutoff 的数据），返回被删除的分区名。
+        archive=True 时先把分区 EXCHANGE 到 price_data_archive_pYYYYMM（同结构未分区表）再删除空分区。
+        """
+        limit = month_start(cutoff)
+        dropped = []
+        for p in self.list_partitions():
+            upper = _parse_upper(p["upper"])
+            if upper is None or upper > limit:
+                continue
+            with self.get_cursor() as cursor:
+                if archive:
+                    archive_table = f"{TABLE}_archive_{p['name']}"
+                    # 归档表已存在时报错停止，不覆盖既有归档
+                    cursor.execute(f"CREATE TABLE {archive_table} LIKE {TABLE}")
+                    cursor.execute(f"ALTER TABLE {archive_table} REMOVE PARTITIONING")
+                    cursor.execute(f"ALTER TABLE {TABLE} EXCHANGE PARTITION {p['name']} WITH TABLE {archive_table}")
+                cursor.execute(f"ALTER TABLE {TABLE} DROP PARTITION {p['name']}")
+            dropped.append(p["name"])
+        if dropped:
+            logging.info(f"price_data {'归档并' if archive else ''}删除分区: {dropped}")
+        return dropped
+
+    @staticmethod
+    def _last_upper(partitions: List[Dict]) -> Optional[date]:
+        uppers = [u for u in (_parse_upper(p["upper"]) for p in partitions) if u is not None]
+        return max(uppers) if uppers else None
+
+
+def _parse_upper(raw) -> Optional[date]:
+    """PARTITION_DESCRIPTION 形如 '2026-11-01'（含引号）或 MAXVALUE。"""
+    text = str(raw or "").strip("'\" ")
+    if not text or text.upper() == "MAXVALUE":
+        return None
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
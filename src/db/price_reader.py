@@ -1,5 +1,6 @@
 """价格数据读取操作。"""
 
+from datetime import datetime
 from typing import List, Dict, Optional
 
 from db.base import BaseDB
@@ -28,8 +29,54 @@ class PriceReader(BaseDB):
             params.append(int(limit))
         return self._exec(query, params)
 
+    # 分层保留：原始 tick 已压缩的日期由 DatabaseManager 改读下面两层，列与 query_data 一致
+    def query_minute_bars(self, start_date: str, end_date: str, data_type: Optional[str] = None,
+                          limit: Optional[int] = None) -> List[Dict]:
+        """分钟 K 线层：每分钟一行，recycle_price 为分钟收盘，trade_time / created_at 为分钟起点。"""
+        query = ("SELECT trade_date, minute_time AS trade_time, data_type, real_time_price, "
+                 "close_price AS recycle_price, source, currency, TIMESTAMP(trade_date, minute_time) AS created_at "
+                 "FROM minute_ohlc WHERE trade_date BETWEEN %s AND %s ")
+        params = [start_date, end_date]
+        if data_type:
+            query += " AND data_type = %s"
+            params.append(data_type)
+        query += " ORDER BY trade_date DESC, minute_time DESC"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(int(limit))
+        return self._exec(query, params)
+
+    def query_daily_rollup(self, start_date: str, end_date: str, data_type: Optional[str] = None,
+                           limit: Optional[int] = None) -> List[Dict]:
+        """日线层：每天每品种一行收盘（rollup 不区分来源 / 币种）。"""
+        query = ("SELECT trade_date, close_time AS trade_time, data_type, 0 AS real_time_price, "
+                 "close_price AS recycle_price, '' AS source, '' AS currency, "
+                 "TIMESTAMP(trade_date, close_time) AS created_at "
+                 "FROM price_daily_rollup WHERE trade_date BETWEEN %s AND %s ")
+        params = [start_date, end_date]
+        if data_type:
+            query += " AND data_type = %s"
+            params.append(data_type)
+        query += " ORDER BY trade_date DESC, close_time DESC"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(int(limit))
+        return self._exec(query, params)
+
+    # latest 类查询优先读 latest_price（每个品种 / 来源 / 币种一行，主键点查）；
+    # 表尚未建立 / 回填时结果为空，回退到 price_data 上的排序查询。
+
     def get_latest_data_by_type(self):
-        """获取最新价格数据，每个data_type返回一条"""
+        """获取最新价格数据，每个data_type返回一条（一次读取全部品种）"""
+        rows = self._exec("""
+            SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at
+            FROM (
+                SELECT *, ROW_NUMBER() OVER(PARTITION BY data_type ORDER BY created_at DESC) as rn
+                FROM latest_price WHERE trade_date >= CURDATE() - INTERVAL 1 DAY
+            ) sub WHERE rn = 1
+        """)
+        if rows:
+            return rows
         return self._exec("""
             SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at
             FROM (
@@ -42,6 +89,11 @@ class PriceReader(BaseDB):
         """获取指定data_type的最新一条数据"""
         if not data_type:
             return self.get_latest_data_by_type()
+        row = self._exec_one(
+            ("SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at "
+             "FROM latest_price WHERE data_type = %s ORDER BY created_at DESC LIMIT 1"), (data_type,))
+        if row:
+            return row
         return self._exec_one(
             ("SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at "
              "FROM price_data WHERE data_type = %s AND recycle_price > 0 "
@@ -60,6 +112,13 @@ class PriceReader(BaseDB):
         最新「可比价」：与页面主推的回收口径一致；优先大盘实时价，
         缺失或为 0 时回退 recycle_price，避免仅有回收价时 SSE/历史对比失败。
         """
+        price = self._exec_value(
+            "SELECT COALESCE(NULLIF(real_time_price, 0), recycle_price) "
+            "FROM latest_price WHERE data_type = %s ORDER BY created_at DESC LIMIT 1",
+            (data_type,),
+        )
+        if price is not None:
+            return price
         return self._exec_value(
             (
                 "SELECT COALESCE(NULLIF(real_time_price, 0), recycle_price) "
@@ -84,9 +143,10 @@ class PriceReader(BaseDB):
         """单条SQL获取价格概览：当前价、昨日收盘、今日高低"""
         return self._exec("""
             SELECT cur.data_type, cur.recycle_price, cur.real_time_price, cur.source, cur.created_at AS updated_at,
-                   yest.recycle_price AS yesterday_close, hl.today_high, hl.today_low
+                   yest.recycle_price AS yesterday_close, hl.today_high, hl.today_low,
+                   cur.trade_date, cur.trade_time
             FROM (
-                SELECT data_type, recycle_price, real_time_price, source, created_at,
+                SELECT data_type, recycle_price, real_time_price, source, created_at, trade_date, trade_time,
                        ROW_NUMBER() OVER(PARTITION BY data_type ORDER BY created_at DESC) AS rn
                 FROM price_data WHERE recycle_price > 0 AND trade_date >= %s
             ) cur
@@ -102,7 +162,25 @@ class PriceReader(BaseDB):
             WHERE cur.rn = 1
         """, (yesterday_str, yesterday_str, today_str))
 
+    def get_daily_stats(self) -> List[Dict]:
+        """daily_stats 全表（每个 data_type 一行）；未建表时为空。"""
+        return self._exec(
+            "SELECT data_type, trade_date, tick_at, recycle_price, real_time_price, source, updated_at, "
+            "yesterday_close, today_high, today_low FROM daily_stats")
+
     def get_price_overview_data_fallback(self) -> List[Dict]:
+        rows = self._exec("""
+            SELECT cur.data_type, cur.recycle_price, cur.real_time_price, cur.source, cur.created_at AS updated_at,
+                   NULL AS yesterday_close, NULL AS today_high, NULL AS today_low
+            FROM (
+                SELECT data_type, recycle_price, real_time_price, source, created_at,
+                       ROW_NUMBER() OVER(PARTITION BY data_type ORDER BY created_at DESC) AS rn
+                FROM latest_price
+            ) cur
+            WHERE cur.rn = 1
+        """)
+        if rows:
+            return rows
         return self._exec("""
             SELECT cur.data_type, cur.recycle_price, cur.real_time_price, cur.source, cur.created_at AS updated_at,
                    NULL AS yesterday_close, NULL AS today_high, NULL AS today_low
@@ -119,16 +197,49 @@ class PriceReader(BaseDB):
         return self._exec(
             ("SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at "
              "FROM price_data WHERE data_type = %s AND recycle_price > 0 "
+             "AND trade_date BETWEEN DATE(%s) - INTERVAL 1 DAY AND DATE(%s) + INTERVAL 1 DAY "
              "AND created_at >= %s AND created_at <= %s ORDER BY created_at ASC"),
-            (data_type, start_time, end_time))
+            (data_type, start_time, end_time, start_time, end_time))
 
-    def get_price_history_last_hour(self, data_type: str) -> List[Dict]:
-        """近 1 小时数据：用数据库会话时区计算窗口，避免应用层 UTC/本地字符串比较偏差。"""
+    def get_price_history_last_hour(self, data_type: str, lookback_seconds: int = 0) -> List[Dict]:
+        """
+        近 1 小时数据：用数据库会话时区计算窗口，避免应用层 UTC/本地字符串比较偏差。
+        附加的 trade_date 下界（放宽一天，容忍会话时区与北京时间之差）用于 price_data 分区裁剪。
+        lookback_seconds > 0 时多取窗口前的点供前向填充，并附带 window_start 列（数据库时钟）。
+        """
+        if lookback_seconds <= 0:
+            return self._exec(
+                ("SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at "
+                 "FROM price_data WHERE data_type = %s AND recycle_price > 0 "
+                 "AND trade_date >= CURDATE() - INTERVAL 1 DAY "
+                 "AND created_at >= (NOW() - INTERVAL 1 HOUR) ORDER BY created_at ASC"),
+                (data_type,))
         return self._exec(
-            ("SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at "
+            ("SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, created_at, "
+             "NOW() - INTERVAL 1 HOUR AS window_start "
              "FROM price_data WHERE data_type = %s AND recycle_price > 0 "
-             "AND created_at >= (NOW() - INTERVAL 1 HOUR) ORDER BY created_at ASC"),
-            (data_type,))
+             "AND trade_date >= DATE(NOW() - INTERVAL %s SECOND) - INTERVAL 1 DAY "
+             "AND created_at >= (NOW() - INTERVAL %s SECOND) ORDER BY created_at ASC"),
+            (data_type, 3600 + int(lookback_seconds), 3600 + int(lookback_seconds)))
+
+    def get_minute_bars_since(self, data_type: str, start: datetime) -> List[Dict]:
+        """start（北京时间）之后的分钟 K 线，列与 get_price_history_last_hour 一致，created_at 为分钟起点。"""
+        return self._exec(
+            ("SELECT trade_date, minute_time AS trade_time, data_type, real_time_price, "
+             "close_price AS recycle_price, TIMESTAMP(trade_date, minute_time) AS created_at "
+             "FROM minute_ohlc WHERE data_type = %s AND trade_date >= %s "
+             "AND TIMESTAMP(trade_date, minute_time) >= %s ORDER BY trade_date ASC, minute_time ASC"),
+            (data_type, start.strftime("%Y-%m-%d"), start.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def get_ticks_since(self, start_date: str) -> List[Dict]:
+        """窗口内全部点位（供内存 tick 缓冲预热）；失败时抛出异常，避免把空结果误当作已覆盖。"""
+        with self.get_cursor() as cursor:
+            cursor.execute(
+                "SELECT trade_date, trade_time, data_type, real_time_price, recycle_price, "
+                "source, currency, created_at "
+                "FROM price_data WHERE trade_date >= %s ORDER BY trade_date ASC, trade_time ASC",
+                (start_date,))
+            return cursor.fetchall()
 
     def get_latest_updates_by_group(self) -> List[Dict]:
         return self._exec(
@@ -139,6 +250,7 @@ class PriceReader(BaseDB):
     def get_counts_last_hour_by_group(self) -> List[Dict]:
         return self._exec(
             "SELECT data_type, source, COUNT(*) AS cnt_last_hour "
-            "FROM price_data WHERE recycle_price > 0 AND created_at >= (NOW() - INTERVAL 1 HOUR) "
+            "FROM price_data WHERE recycle_price > 0 AND trade_date >= CURDATE() - INTERVAL 1 DAY "
+            "AND created_at >= (NOW() - INTERVAL 1 HOUR) "
             "GROUP BY data_type, source"
         )
@@ -1,16 +1,161 @@
 """价格数据写入操作。"""
 
 import logging
-from typing import List, Dict
+from datetime import timedelta
+from typing import Any, List, Dict, Tuple
 
+from cache.daily_stats import FIELDS as DAILY_STATS_FIELDS
 from db.base import BaseDB
 
+_ROLLUP_COLUMNS = "(trade_date, data_type, open_price, high_price, low_price, close_price, open_time, close_time)"
+
+# open/close 以 trade_time 决定先后；MySQL 按书写顺序求值，先比较再改 open_time/close_time
+_ROLLUP_ON_DUPLICATE = """
+    ON DUPLICATE KEY UPDATE
+        open_price  = IF(VALUES(open_time) < open_time, VALUES(open_price), open_price),
+        open_time   = LEAST(open_time, VALUES(open_time)),
+        close_price = IF(VALUES(close_time) >= close_time, VALUES(close_price), close_price),
+        close_time  = GREATEST(close_time, VALUES(close_time)),
+        high_price  = GREATEST(high_price, VALUES(high_price)),
+        low_price   = LEAST(low_price, VALUES(low_price))
+"""
+
+_MINUTE_COLUMNS = ("(trade_date, minute_time, data_type, source, currency, open_price, high_price, "
+                   "low_price, close_price, real_time_price, first_time, last_time)")
+
+# 与 rollup 相同的合并语义：迟到 / 重放的分钟按 first_time / last_time 决定 open / close
+_MINUTE_ON_DUPLICATE = """
+    ON DUPLICATE KEY UPDATE
+        open_price      = IF(VALUES(first_time) < first_time, VALUES(open_price), open_price),
+        first_time      = LEAST(first_time, VALUES(first_time)),
+        close_price     = IF(VALUES(last_time) >= last_time, VALUES(close_price), close_price),
+        real_time_price = IF(VALUES(last_time) >= last_time, VALUES(real_time_price), real_time_price),
+        last_time       = GREATEST(last_time, VALUES(last_time)),
+        high_price      = GREATEST(high_price, VALUES(high_price)),
+        low_price       = LEAST(low_price, VALUES(low_price))
+"""
+
+# 由某一交易日的 price_data 原始点计算 rollup / 分钟 K 线（列顺序同 _ROLLUP_COLUMNS / _MINUTE_COLUMNS）
+_ROLLUP_FROM_RAW = """
+    SELECT trade_date, data_type, open_price, high_price, low_price, close_price,
+           open_time, close_time
+    FROM (
+        SELECT trade_date, data_type,
+               FIRST_VALUE(recycle_price) OVER w_asc  AS open_price,
+               MAX(recycle_price) OVER w_all          AS high_price,
+               MIN(recycle_price) OVER w_all          AS low_price,
+               FIRST_VALUE(recycle_price) OVER w_desc AS close_price,
+               FIRST_VALUE(trade_time) OVER w_asc     AS open_time,
+               FIRST_VALUE(trade_time) OVER w_desc    AS close_time,
+               ROW_NUMBER() OVER w_asc                AS rn
+        FROM price_data
+        WHERE trade_date = %s AND recycle_price > 0
+        WINDOW w_all  AS (PARTITION BY data_type),
+               w_asc  AS (PARTITION BY data_type ORDER BY trade_time ASC, created_at ASC),
+               w_desc AS (PARTITION BY data_type ORDER BY trade_time DESC, created_at DESC)
+    ) sub WHERE rn = 1
+"""
+
+_MINUTE_FROM_RAW = """
+    SELECT trade_date, minute_time, data_type, source, currency, open_price, high_price,
+           low_price, close_price, real_time_price, first_time, last_time
+    FROM (
+        SELECT trade_date, data_type, source, currency,
+               SEC_TO_TIME(TIME_TO_SEC(trade_time) DIV 60 * 60) AS minute_time,
+               FIRST_VALUE(recycle_price) OVER w_asc    AS open_price,
+               MAX(recycle_price) OVER w_all            AS high_price,
+               MIN(recycle_price) OVER w_all            AS low_price,
+               FIRST_VALUE(recycle_price) OVER w_desc   AS close_price,
+               FIRST_VALUE(real_time_price) OVER w_desc AS real_time_price,
+               FIRST_VALUE(trade_time) OVER w_asc       AS first_time,
+               FIRST_VALUE(trade_time) OVER w_desc      AS last_time,
+               ROW_NUMBER() OVER w_asc                  AS rn
+        FROM price_data
+        WHERE trade_date = %s AND recycle_price > 0
+        WINDOW w_all  AS (PARTITION BY data_type, source, TIME_TO_SEC(trade_time) DIV 60),
+               w_asc  AS (PARTITION BY data_type, source, TIME_TO_SEC(trade_time) DIV 60
+                          ORDER BY trade_time ASC, created_at ASC),
+               w_desc AS (PARTITION BY data_type, source, TIME_TO_SEC(trade_time) DIV 60
+                          ORDER BY trade_time DESC, created_at DESC)
+    ) sub WHERE rn = 1
+"""
+
+_LATEST_COLUMNS = ("(data_type, source, currency, trade_date, trade_time, tick_at, "
+                   "real_time_price, recycle_price, high_price, low_price)")
+
+# 只有不早于库内的点才覆盖（迟到 / spool 重放的旧点不回退最新价）；tick_at 最后更新，前面的列按旧值比较
+_LATEST_NEWER = "VALUES(tick_at) >= tick_at"
+_LATEST_ON_DUPLICATE = f"""
+    ON DUPLICATE KEY UPDATE
+        real_time_price = IF({_LATEST_NEWER}, VALUES(real_time_price), real_time_price),
+        recycle_price   = IF({_LATEST_NEWER}, VALUES(recycle_price), recycle_price),
+        high_price      = IF({_LATEST_NEWER}, VALUES(high_price), high_price),
+        low_price       = IF({_LATEST_NEWER}, VALUES(low_price), low_price),
+        trade_date      = IF({_LATEST_NEWER}, VALUES(trade_date), trade_date),
+        trade_time      = IF({_LATEST_NEWER}, VALUES(trade_time), trade_time),
+        created_at      = IF({_LATEST_NEWER}, CURRENT_TIMESTAMP, created_at),
+        tick_at         = GREATEST(tick_at, VALUES(tick_at))
+"""
+
+
+def _time_seconds(v: Any) -> float:
+    if isinstance(v, timedelta):
+        return v.total_seconds()
+    h, m, sec = str(v).split(":")
+    return int(h) * 3600 + int(m) * 60 + float(sec)
+
+
+def aggregate_daily_rollup(data_list: List[Dict]) -> List[Tuple]:
+    """把一批 tick 按 (trade_date, data_type) 预聚合为 OHLC 行（仅 recycle_price > 0）。"""
+    groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for item in data_list:
+        price = float(item.get('recycle_price') or 0)
+        if price <= 0:
+            continue
+        key = (str(item['trade_date']), item['data_type'])
+        t = _time_seconds(item['trade_time'])
+        g = groups.get(key)
+        if g is None:
+            groups[key] = {'open': price, 'high': price, 'low': price, 'close': price,
+                           'open_t': t, 'close_t': t,
+                           'open_time': item['trade_time'], 'close_time': item['trade_time']}
+            continue
+        if t < g['open_t']:
+            g['open'], g['open_t'], g['open_time'] = price, t, item['trade_time']
+        if t >= g['close_t']:
+            g['close'], g['close_t'], g['close_time'] = price, t, item['trade_time']
+        g['high'] = max(g['high'], price)
+        g['low'] = min(g['low'], price)
+    return [
+        (d, dt, g['open'], g['high'], g['low'], g['close'], str(g['open_time']), str(g['close_time']))
+        for (d, dt), g in groups.items()
+    ]
+
+
+def aggregate_latest(data_list: List[Dict]) -> List[Tuple]:
+    """每个 (data_type, source, currency) 取本批 trade_date + trade_time 最晚的一条（仅 recycle_price > 0）。"""
+    latest: Dict[Tuple[str, str, str], Tuple[Tuple[str, float], Dict]] = {}
+    for item in data_list:
+        if float(item.get('recycle_price') or 0) <= 0:
+            continue
+        key = (item['data_type'], item.get('source', 'playwright'), item.get('currency', 'CNY'))
+        order = (str(item['trade_date']), _time_seconds(item['trade_time']))
+        if key not in latest or order >= latest[key][0]:
+            latest[key] = (order, item)
+    return [
+        (dt, src, cur, item['trade_date'], str(item['trade_time']),
+         f"{item['trade_date']} {item['trade_time']}",
+         item.get('real_time_price') or 0, item['recycle_price'],
+         item.get('high_price') or 0, item.get('low_price') or 0)
+        for (dt, src, cur), (_, item) in latest.items()
+    ]
+
 
 class PriceWriter(BaseDB):
-    """采集器写入：price_data / exchange_rate / daily_ohlc"""
+    """采集器写入：price_data / price_daily_rollup / latest_price / minute_ohlc / exchange_rate / daily_ohlc"""
 
     def batch_insert_data(self, data_list: List[Dict]):
-        """批量插入价格数据"""
+        """批量插入价格数据；失败时抛出异常，由入库流水线保留在 spool 中重试。"""
         if not data_list:
             return
 
@@ -29,12 +174,103 @@ class PriceWriter(BaseDB):
             for item in data_list
         ]
 
+        rollup = aggregate_daily_rollup(data_list)
+        latest = aggregate_latest(data_list)
+
         try:
             with self.get_cursor() as cursor:
                 cursor.executemany(query, values)
+                if rollup:
+                    self._upsert_daily_rollup(cursor, rollup)
+                if latest:
+                    self._upsert_latest(cursor, latest)
             logging.info(f"成功插入 {len(data_list)} 条数据")
         except Exception as e:
             logging.error(f"批量插入失败: {e}")
+            raise
+
+    @staticmethod
+    def _upsert_daily_rollup(cursor, rows: List[Tuple]):
+        """与 tick 插入同一事务：一条多值 INSERT 增量合并当日 OHLC。"""
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+        params = [v for row in rows for v in row]
+        cursor.execute(
+            f"INSERT INTO price_daily_rollup {_ROLLUP_COLUMNS} VALUES {placeholders}"
+            + _ROLLUP_ON_DUPLICATE,
+            params)
+
+    @staticmethod
+    def _upsert_latest(cursor, rows: List[Tuple]):
+        """与 tick 插入同一事务：每个品种 / 来源 / 币种一行的最新价。"""
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+        params = [v for row in rows for v in row]
+        cursor.execute(
+            f"INSERT INTO latest_price {_LATEST_COLUMNS} VALUES {placeholders}" + _LATEST_ON_DUPLICATE,
+            params)
+
+    def upsert_daily_stats(self, entries: List[Dict]):
+        """整体写回内存日统计（cache.daily_stats.DailyStatsStore.rows()）；失败时抛出异常。"""
+        if not entries:
+            return
+        placeholders = ", ".join(["(" + ", ".join(["%s"] * len(DAILY_STATS_FIELDS)) + ")"] * len(entries))
+        params = [e.get(f) for e in entries for f in DAILY_STATS_FIELDS]
+        updates = ", ".join(f"{f} = VALUES({f})" for f in DAILY_STATS_FIELDS[1:])
+        with self.get_cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO daily_stats ({', '.join(DAILY_STATS_FIELDS)}) VALUES {placeholders} "
+                f"ON DUPLICATE KEY UPDATE {updates}",
+                params)
+
+    def rebuild_daily_rollup(self, trade_date: str) -> int:
+        """按 price_data 原始点重算某一交易日的全部 rollup 行（修复 / 回填），返回写入行数。"""
+        with self.get_cursor() as cursor:
+            cursor.execute("DELETE FROM price_daily_rollup WHERE trade_date = %s", (trade_date,))
+            cursor.execute(f"INSERT INTO price_daily_rollup {_ROLLUP_COLUMNS}" + _ROLLUP_FROM_RAW, (trade_date,))
+            return cursor.rowcount
+
+    def upsert_minute_bars(self, bars: List[Dict]):
+        """写入已关闭的分钟 K 线（ingest.bars）；一条多值 INSERT，失败时抛出异常由流水线重试。"""
+        if not bars:
+            return
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(bars))
+        params = [
+            v for b in bars for v in (
+                b['trade_date'], b['minute_time'], b['data_type'], b['source'], b['currency'],
+                b['open_price'], b['high_price'], b['low_price'], b['close_price'],
+                b['real_time_price'], b['first_time'], b['last_time'])
+        ]
+        with self.get_cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO minute_ohlc {_MINUTE_COLUMNS} VALUES {placeholders}" + _MINUTE_ON_DUPLICATE,
+                params)
+
+    def rebuild_minute_bars(self, trade_date: str) -> int:
+        """按 price_data 原始点重算某一交易日的全部分钟 K 线（修复 / 回填），返回写入行数。"""
+        with self.get_cursor() as cursor:
+            cursor.execute("DELETE FROM minute_ohlc WHERE trade_date = %s", (trade_date,))
+            cursor.execute(f"INSERT INTO minute_ohlc {_MINUTE_COLUMNS}" + _MINUTE_FROM_RAW, (trade_date,))
+            return cursor.rowcount
+
+    def merge_day_from_raw(self, trade_date: str, chunk_rows: int = 1000) -> int:
+        """
+        按原始点补齐某一交易日的分钟 K 线与 rollup（分层保留在删除原始 tick 前调用），返回合并行数。
+        与 rebuild_* 不同，这里按入库时的合并语义 upsert 而不先删除：原始点已被部分删除时重复执行也不会缩小已有的 K 线。
+        """
+        merged = 0
+        with self.get_cursor(dictionary=False) as cursor:
+            for select, table, columns, on_duplicate in (
+                (_MINUTE_FROM_RAW, "minute_ohlc", _MINUTE_COLUMNS, _MINUTE_ON_DUPLICATE),
+                (_ROLLUP_FROM_RAW, "price_daily_rollup", _ROLLUP_COLUMNS, _ROLLUP_ON_DUPLICATE),
+            ):
+                cursor.execute(select, (trade_date,))
+                rows = cursor.fetchall()
+                for i in range(0, len(rows), chunk_rows):
+                    chunk = rows[i:i + chunk_rows]
+                    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(chunk[0])) + ")"] * len(chunk))
+                    cursor.execute(f"INSERT INTO {table} {columns} VALUES {placeholders}" + on_duplicate,
+                                   [v for row in chunk for v in row])
+                merged += len(rows)
+        return merged
 
     def upsert_exchange_rate(self, base: str, target: str, rate: float, source: str):
         """插入或更新汇率记录"""
@@ -0,0 +1,144 @@
+"""
+分层保留：原始 tick（price_data）保留 RETENTION_RAW_DAYS 天，分钟 K 线（minute_ohlc）保留
+RETENTION_MINUTE_MONTHS 个月，日线 rollup（price_daily_rollup）永久保留；0 表示该层不清理。
+
+- RetentionPolicy：按日期判断应读哪一层（tier / split_range），读取路径据此自动选层；
+- Compactor：后台分批压缩。删除某天的原始 tick 前先把当天原始数据合并进分钟 K 线与日线 rollup，
+  保证下采样层完整；price_data 已分区时整月直接 DROP PARTITION，其余按小批 DELETE ... LIMIT，
+  每批独立短事务并在批间暂停，不长时间持锁，不阻塞入库写线程。
+"""
+
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from db.base import BaseDB
+from db.partitions import PartitionManager, add_months, month_start
+from db.price_writer import PriceWriter
+
+TIER_RAW = "raw"
+TIER_MINUTE = "minute"
+TIER_DAILY = "daily"
+
+
+class RetentionPolicy:
+    def __init__(self, raw_days: int = 0, minute_months: int = 0) -> None:
+        self.raw_days = max(0, raw_days)
+        self.minute_months = max(0, minute_months)
+        if self.raw_days and self.minute_months and self.minute_months * 28 < self.raw_days:
+            # 分钟层至少覆盖原始层之外的日期，否则压缩后会出现没有分钟数据的空档
+            logging.warning(f"RETENTION_MINUTE_MONTHS={minute_months} 短于原始 tick 保留期，按原始保留期计")
+            self.minute_months = (self.raw_days + 27) // 28
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.raw_days or self.minute_months)
+
+    def raw_cutoff(self, today: date) -> Optional[date]:
+        """原始 tick 保留的最早交易日（含）；不清理时为 None。"""
+        return today - timedelta(days=self.raw_days - 1) if self.raw_days else None
+
+    def minute_cutoff(self, today: date) -> Optional[date]:
+        """分钟 K 线保留的最早交易日（含，取月初）；不清理时为 None。"""
+        return add_months(today, -self.minute_months) if self.minute_months else None
+
+    def tier(self, day: date, today: date) -> str:
+        raw_cutoff = self.raw_cutoff(today)
+        if raw_cutoff is None or day >= raw_cutoff:
+            return TIER_RAW
+        minute_cutoff = self.minute_cutoff(today)
+        if minute_cutoff is None or day >= minute_cutoff:
+            return TIER_MINUTE
+        return TIER_DAILY
+
+    def split_range(self, start: date, end: date, today: date) -> List[Tuple[str, date, date]]:
+        """[start, end] 按层切分，新→旧：[(tier, 段起, 段止)]。"""
+        out = []
+        for tier, lower in ((TIER_RAW, self.raw_cutoff(today)), (TIER_MINUTE, self.minute_cutoff(today))):
+            if end < start:
+                return out
+            if lower is None or lower <= start:
+                out.append((tier, start, end))
+                return out
+            if lower <= end:
+                out.append((tier, lower, end))
+                end = lower - timedelta(days=1)
+        if start <= end:
+            out.append((TIER_DAILY, start, end))
+        return out
+
+
+def retention_from_env() -> RetentionPolicy:
+    return RetentionPolicy(
+        raw_days=int(os.environ.get("RETENTION_RAW_DAYS", "0")),
+        minute_months=int(os.environ.get("RETENTION_MINUTE_MONTHS", "0")),
+    )
+
+
+class Compactor(BaseDB):
+    """分批压缩；每次 run 至多处理 max_days 个原始交易日，剩余的留给下一轮。"""
+
+    def __init__(self, pool, writer: PriceWriter, partitions: PartitionManager,
+                 batch_rows: int = 5000, pause_seconds: float = 0.2, max_days: int = 31) -> None:
+        super().__init__(pool)
+        self.writer = writer
+        self.partitions = partitions
+        self.batch_rows = batch_rows
+        self.pause_seconds = pause_seconds
+        self.max_days = max_days
+
+    def run(self, policy: RetentionPolicy, today: date) -> Dict[str, int]:
+        stats = {"days_compacted": 0, "partitions_dropped": 0, "raw_deleted": 0, "minute_deleted": 0}
+        raw_cutoff = policy.raw_cutoff(today)
+        if raw_cutoff is not None:
+            self._compact_raw(raw_cutoff, stats)
+        minute_cutoff = policy.minute_cutoff(today)
+        if minute_cutoff is not None:
+            stats["minute_deleted"] = self._delete_batches(
+                "DELETE FROM minute_ohlc WHERE trade_date < %s LIMIT %s", minute_cutoff)
+        return stats
+
+    def _compact_raw(self, cutoff: date, stats: Dict[str, int]) -> None:
+        days = [r["trade_date"] for r in self._exec(
+            "SELECT DISTINCT trade_date FROM price_data WHERE trade_date < %s ORDER BY trade_date LIMIT %s",
+            (cutoff, self.max_days))]
+        if not days:
+            return
+        partitioned = self.partitions.is_partitioned()
+        # 可整分区 DROP 的月份：早于截止日所在月，且本轮已合并完（本轮未处理完时截至最后一天所在月之前）；
+        # 其余日期（包括处理预算内无法整月完成的月份）逐日 DELETE，保证每轮都有进展
+        done_before = cutoff if len(days) < self.max_days else month_start(days[-1] + timedelta(days=1))
+        droppable_before = month_start(min(done_before, cutoff)) if partitioned else None
+        for day in days:
+            day_str = day.strftime("%Y-%m-%d")
+            # 先把原始点合并进下采样层（幂等，中断后重跑安全），再删除原始 tick
+            self.writer.merge_day_from_raw(day_str)
+            stats["days_compacted"] += 1
+            if droppable_before is not None and day < droppable_before:
+                continue  # 整月分区在下面直接 DROP
+            stats["raw_deleted"] += self._delete_batches(
+                "DELETE FROM price_data WHERE trade_date = %s LIMIT %s", day)
+        if droppable_before is not None and days[0] < droppable_before:
+            stats["partitions_dropped"] = len(self.partitions.drop_before(droppable_before))
+
+    def _delete_batches(self, sql: str, bound: date) -> int:
+        total = 0
+        while True:
+            with self.get_cursor() as cursor:
+                cursor.execute(sql, (bound, self.batch_rows))
+                deleted = cursor.rowcount
+            total += deleted
+            if deleted < self.batch_rows:
+                return total
+            time.sleep(self.pause_seconds)
+
+
+def compactor_from_env(pool, writer: PriceWriter, partitions: PartitionManager) -> Compactor:
+    return Compactor(
+        pool, writer, partitions,
+        batch_rows=int(os.environ.get("RETENTION_BATCH_ROWS", "5000")),
+        pause_seconds=int(os.environ.get("RETENTION_BATCH_PAUSE_MS", "200")) / 1000,
+        max_days=int(os.environ.get("RETENTION_MAX_DAYS_PER_RUN", "31")),
+    )
@@ -1,16 +1,47 @@
 """趋势与K线数据读取操作。"""
 
-from typing import List, Dict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
 
 from db.base import BaseDB
+from db.forward_fill import last_per_minute
+
+
+def _as_date(v) -> date:
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return datetime.strptime(str(v), "%Y-%m-%d").date()
 
 
 class TrendReader(BaseDB):
     """趋势查询：ohlc / intraday / gold_silver_ratio / last_n_days"""
 
+    # 日线类查询优先读 price_daily_rollup（每天每品种一行，O(天数)）；
+    # rollup 尚未建表/回填时结果为空，回退到原始 tick 窗口函数查询；只回填了近期时，
+    # rollup 首行之前的日期补读原始 tick（见 _rollup_then_raw）。
+
+    def _rollup_then_raw(self, rollup_sql: str, raw_sql: str, params: Callable[[str, str], Tuple],
+                         start_date: str, end_date: str) -> List[Dict]:
+        """rollup 视为覆盖 [首行日期, end_date]（建表后由入库连续维护）；之前的日期按原始 tick 计算后拼在前面。"""
+        rows = self._exec(rollup_sql, params(start_date, end_date))
+        if not rows:
+            return self._exec(raw_sql, params(start_date, end_date))
+        first = _as_date(rows[0]["date"])
+        if first <= _as_date(start_date):
+            return rows
+        prefix_end = (first - timedelta(days=1)).strftime("%Y-%m-%d")
+        return self._exec(raw_sql, params(start_date, prefix_end)) + rows
+
     def get_last_n_days_daily_price(self, data_type: str, start_date: str, end_date: str) -> List[Dict]:
         """获取日期范围内每天最后一条回收价格"""
-        return self._exec("""
+        return self._rollup_then_raw("""
+            SELECT trade_date AS date, close_price AS recycle_price
+            FROM price_daily_rollup
+            WHERE data_type = %s AND trade_date BETWEEN %s AND %s
+            ORDER BY trade_date ASC
+        """, """
             SELECT trade_date AS date, recycle_price
             FROM (
                 SELECT trade_date, recycle_price,
@@ -19,29 +50,55 @@ class TrendReader(BaseDB):
                 WHERE data_type = %s AND recycle_price > 0
                   AND trade_date >= %s AND trade_date <= %s
             ) sub WHERE rn = 1 ORDER BY date ASC
-        """, (data_type, start_date, end_date))
+        """, lambda start, end: (data_type, start, end), start_date, end_date)
 
     def get_ohlc_trend(self, data_type: str, start_date: str, end_date: str) -> List[Dict]:
-        """获取日K线数据（开盘/最高/最低/收盘），窗口函数实现"""
-        return self._exec("""
+        """获取日K线数据（开盘/最高/最低/收盘）"""
+        return self._rollup_then_raw("""
+            SELECT trade_date AS date, open_price, high_price, low_price, close_price
+            FROM price_daily_rollup
+            WHERE data_type = %s AND trade_date BETWEEN %s AND %s
+            ORDER BY trade_date ASC
+        """, """
             SELECT trade_date AS date, open_price, high_price, low_price, close_price
             FROM (
                 SELECT trade_date,
                        FIRST_VALUE(recycle_price) OVER w_asc  AS open_price,
-                       MAX(recycle_price) OVER w_asc           AS high_price,
-                       MIN(recycle_price) OVER w_asc           AS low_price,
+                       MAX(recycle_price) OVER w_all           AS high_price,
+                       MIN(recycle_price) OVER w_all           AS low_price,
                        FIRST_VALUE(recycle_price) OVER w_desc  AS close_price,
                        ROW_NUMBER() OVER w_asc                 AS rn
                 FROM price_data
                 WHERE data_type = %s AND recycle_price > 0
                   AND trade_date BETWEEN %s AND %s
-                WINDOW w_asc  AS (PARTITION BY trade_date ORDER BY created_at ASC),
+                WINDOW w_all  AS (PARTITION BY trade_date),
+                       w_asc  AS (PARTITION BY trade_date ORDER BY created_at ASC),
                        w_desc AS (PARTITION BY trade_date ORDER BY created_at DESC)
             ) sub WHERE rn = 1 ORDER BY date ASC
-        """, (data_type, start_date, end_date))
+        """, lambda start, end: (data_type, start, end), start_date, end_date)
 
     def get_intraday_trend(self, data_type: str, date_str: str) -> List[Dict]:
-        """获取指定日期的分钟级别走势数据"""
+        """
+        获取指定日期的分钟级别走势数据：优先读 minute_ohlc（每分钟一行），未建表 / 未回填时回退原始 tick；
+        当天首根分钟 K 线之前的原始 tick（分钟表上线 / 回填之前）压成每分钟一点后拼在前面。
+        """
+        rows = self._exec("""
+            SELECT minute_time AS time, close_price AS recycle_price, real_time_price,
+                   TIMESTAMP(trade_date, minute_time) AS created_at
+            FROM minute_ohlc
+            WHERE data_type = %s AND trade_date = %s
+            ORDER BY minute_time ASC
+        """, (data_type, date_str))
+        if rows:
+            # created_at 取 trade_date + trade_time，与分钟 K 线同一时钟
+            prefix = self._exec("""
+                SELECT trade_time AS time, recycle_price, real_time_price,
+                       TIMESTAMP(trade_date, trade_time) AS created_at
+                FROM price_data
+                WHERE data_type = %s AND recycle_price > 0 AND trade_date = %s AND trade_time < %s
+                ORDER BY trade_time ASC
+            """, (data_type, date_str, rows[0]["time"]))
+            return last_per_minute(prefix) + rows
         return self._exec("""
             SELECT trade_time AS time, recycle_price, real_time_price, created_at
             FROM price_data
@@ -50,8 +107,25 @@ class TrendReader(BaseDB):
         """, (data_type, date_str))
 
     def get_gold_silver_ratio(self, start_date: str, end_date: str) -> List[Dict]:
-        """获取金银比走势数据，兼容'黄 金'/'XAU'和'白 银'/'XAG'"""
-        return self._exec("""
+        """获取金银比走势数据，兼容'黄 金'/'XAU'和'白 银'/'XAG'（同日取收盘时间最晚的一个）"""
+        return self._rollup_then_raw("""
+            SELECT g.date, g.close_price AS gold_close, s.close_price AS silver_close,
+                   ROUND(g.close_price / s.close_price, 2) AS ratio
+            FROM (
+                SELECT trade_date AS date, close_price,
+                       ROW_NUMBER() OVER (PARTITION BY trade_date ORDER BY close_time DESC) AS rn
+                FROM price_daily_rollup
+                WHERE data_type IN ('黄 金', 'XAU') AND trade_date BETWEEN %s AND %s
+            ) g
+            JOIN (
+                SELECT trade_date AS date, close_price,
+                       ROW_NUMBER() OVER (PARTITION BY trade_date ORDER BY close_time DESC) AS rn
+                FROM price_daily_rollup
+                WHERE data_type IN ('白 银', 'XAG') AND trade_date BETWEEN %s AND %s
+            ) s ON g.date = s.date
+            WHERE g.rn = 1 AND s.rn = 1
+            ORDER BY g.date ASC
+        """, """
             SELECT g.date, g.close_price AS gold_close, s.close_price AS silver_close,
                    ROUND(g.close_price / s.close_price, 2) AS ratio
             FROM (
@@ -74,7 +148,7 @@ class TrendReader(BaseDB):
             ) s ON g.date = s.date
             WHERE g.rn = 1 AND s.rn = 1
             ORDER BY g.date ASC
-        """, (start_date, end_date, start_date, end_date))
+        """, lambda start, end: (start, end, start, end), start_date, end_date)
 
     def get_daily_ohlc(self, data_type: str, source: str,
                        start_date: str, end_date: str, currency: str = None) -> List[Dict]:
@@ -0,0 +1,8 @@
+"""采集数据入库：写后批量流水线、分钟 K 线、死区过滤与磁盘预写日志。"""
+
+from ingest.bars import MinuteBarBuilder
+from ingest.deadband import Deadband, deadband_from_env
+from ingest.pipeline import IngestPipeline, active_stats
+from ingest.spool import Spool, spool_from_env
+
+__all__ = ["Deadband", "IngestPipeline", "MinuteBarBuilder", "Spool", "active_stats", "deadband_from_env", "spool_from_env"]
@@ -0,0 +1,96 @@
+"""
+分钟 K 线构建：在入库写线程内按 (data_type, source) 把 tick 聚合为 1 分钟 OHLC（recycle_price），
+某分钟关闭后交给 minute_ohlc 写入（PriceWriter.upsert_minute_bars）。
+
+- 同一 key 出现更晚分钟的 tick 时，之前的分钟关闭；
+- 某个 key 停止上报时，落后全局最新 tick 超过 grace 秒的分钟也关闭；
+- 迟到的 tick 重新打开其分钟，关闭后按 first_time / last_time 与库内行合并，写入是幂等的。
+
+构建器看到的是死区过滤之前的全部 tick，分钟的高低点不受死区影响。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+BarKey = Tuple[str, str]  # (data_type, source)
+
+
+def _tick_at(item: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(f"{item['trade_date']} {item['trade_time']}", "%Y-%m-%d %H:%M:%S")
+    except (KeyError, ValueError):
+        return None
+
+
+class MinuteBarBuilder:
+    """非线程安全：只在入库写线程内调用。"""
+
+    def __init__(self, grace_seconds: float = 60.0) -> None:
+        self.grace_seconds = grace_seconds
+        self._open: Dict[BarKey, Dict[datetime, Dict[str, Any]]] = {}
+        self._newest: Dict[BarKey, datetime] = {}
+        self._newest_overall: Optional[datetime] = None
+        self.closed = 0
+
+    def update(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """并入一批 tick，返回本次关闭的分钟 K 线。"""
+        for item in rows:
+            price = float(item.get("recycle_price") or 0)
+            at = _tick_at(item)
+            if price <= 0 or at is None:
+                continue
+            key = (item["data_type"], item.get("source", "playwright"))
+            minute = at.replace(second=0)
+            bar = self._open.setdefault(key, {}).get(minute)
+            if bar is None:
+                self._open[key][minute] = {
+                    "trade_date": minute.strftime("%Y-%m-%d"),
+                    "minute_time": minute.strftime("%H:%M:%S"),
+                    "data_type": key[0],
+                    "source": key[1],
+                    "currency": item.get("currency", "CNY"),
+                    "open_price": price, "high_price": price, "low_price": price, "close_price": price,
+                    "real_time_price": float(item.get("real_time_price") or 0),
+                    "first_time": at, "last_time": at,
+                }
+            else:
+                if at < bar["first_time"]:
+                    bar["open_price"], bar["first_time"] = price, at
+                if at >= bar["last_time"]:
+                    bar["close_price"], bar["last_time"] = price, at
+                    bar["real_time_price"] = float(item.get("real_time_price") or 0)
+                bar["high_price"] = max(bar["high_price"], price)
+                bar["low_price"] = min(bar["low_price"], price)
+            if key not in self._newest or at > self._newest[key]:
+                self._newest[key] = at
+            if self._newest_overall is None or at > self._newest_overall:
+                self._newest_overall = at
+        return self._collect(lambda key, minute: (
+            minute < self._newest[key].replace(second=0)
+            or (self._newest_overall - minute).total_seconds() >= 60 + self.grace_seconds
+        ))
+
+    def flush_all(self) -> List[Dict[str, Any]]:
+        """关闭全部未完成分钟（停止时调用）。"""
+        return self._collect(lambda key, minute: True)
+
+    def _collect(self, done) -> List[Dict[str, Any]]:
+        out = []
+        for key, bars in list(self._open.items()):
+            for minute in sorted(m for m in bars if done(key, m)):
+                out.append(_finish(bars.pop(minute)))
+            if not bars:
+                del self._open[key]
+        self.closed += len(out)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {"open_bars": sum(len(b) for b in self._open.values()), "closed": self.closed}
+
+
+def _finish(bar: Dict[str, Any]) -> Dict[str, Any]:
+    bar["first_time"] = bar["first_time"].strftime("%H:%M:%S")
+    bar["last_time"] = bar["last_time"].strftime("%H:%M:%S")
+    return bar
@@ -0,0 +1,96 @@
+"""
+入库死区（deadband）过滤：同一 (data_type, source, currency) 的价格没有变化时不重复入库。
+
+一条 tick 满足以下任一条件才保留：
+- 该 key 首次出现，或交易日变化（保证每日首点，供日线 / 昨收使用）；
+- 任一价格字段相对上次保留值的变化超过 epsilon（相对比例，0 表示任何变化）；
+- 距上次保留已达 heartbeat 秒（心跳行，读取侧据此确认价格仍然有效）。
+
+被抑制的点由读取侧前向填充（db.forward_fill）还原为连续序列。默认关闭（INGEST_DEADBAND_HEARTBEAT=0）：
+只有 /api/last-1-hour 与 1 日走势做前向填充，/api/recent-history 等按条数取最近 tick 的读取方在开启后
+看到的是变化点与心跳行而非逐秒序列，需确认可接受后再开启。
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+_PRICE_FIELDS = ("real_time_price", "recycle_price", "high_price", "low_price")
+
+Key = Tuple[str, str, str]
+
+
+def _tick_at(item: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(f"{item['trade_date']} {item['trade_time']}", "%Y-%m-%d %H:%M:%S")
+    except (KeyError, ValueError):
+        return None
+
+
+def _moved(old: float, new: float, epsilon: float) -> bool:
+    if epsilon <= 0:
+        return new != old
+    return abs(new - old) > epsilon * abs(old)
+
+
+class Deadband:
+    """非线程安全：只在入库写线程内调用。"""
+
+    def __init__(self, epsilon: float = 0.0, heartbeat_seconds: float = 300.0) -> None:
+        self.epsilon = epsilon
+        self.heartbeat_seconds = heartbeat_seconds
+        self._last: Dict[Key, Tuple[datetime, Tuple[float, ...]]] = {}
+        self.passed = 0
+        self.suppressed = 0
+
+    def filter(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        kept = []
+        for item in rows:
+            if self._keep(item):
+                kept.append(item)
+        self.passed += len(kept)
+        self.suppressed += len(rows) - len(kept)
+        return kept
+
+    def _keep(self, item: Dict[str, Any]) -> bool:
+        at = _tick_at(item)
+        if at is None:
+            return True
+        key = (item.get("data_type"), item.get("source", "playwright"), item.get("currency", "CNY"))
+        prices = tuple(float(item.get(f) or 0) for f in _PRICE_FIELDS)
+        last = self._last.get(key)
+        if (
+            last is None
+            or at.date() != last[0].date()
+            or (at - last[0]).total_seconds() >= self.heartbeat_seconds
+            or any(_moved(o, n, self.epsilon) for o, n in zip(last[1], prices))
+        ):
+            self._last[key] = (at, prices)
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "epsilon": self.epsilon,
+            "heartbeat_seconds": self.heartbeat_seconds,
+            "passed": self.passed,
+            "suppressed": self.suppressed,
+            "keys": len(self._last),
+        }
+
+
+def heartbeat_seconds() -> float:
+    """INGEST_DEADBAND_HEARTBEAT；0（默认）表示关闭死区过滤。"""
+    return float(os.environ.get("INGEST_DEADBAND_HEARTBEAT", "0"))
+
+
+def deadband_from_env() -> Optional[Deadband]:
+    heartbeat = heartbeat_seconds()
+    if heartbeat <= 0:
+        return None
+    return Deadband(
+        epsilon=float(os.environ.get("INGEST_DEADBAND_EPSILON", "0")),
+        heartbeat_seconds=heartbeat,
+    )
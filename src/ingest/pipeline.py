@@ -0,0 +1,313 @@
+"""
+写后（write-behind）入库流水线：所有采集器把标准化 tick 推入有界队列，由单个写线程
+按 flush_rows 行或 flush_interval 毫秒（先到为准）合并为一次 batch_insert_data。
+
+- 提交次数与连接池借出次数按批次而非按采集器 / 按品种计；
+- 批内按 price_data 唯一键 (trade_date, trade_time, data_type, source, currency) 去重；
+- 队列满时提交方最多阻塞 put_timeout 秒（背压），仍满则丢弃并计数；
+- stats() 报告队列深度、阻塞 / 丢弃次数、批大小与刷写耗时。
+
+配置了 spool（ingest.spool.Spool）时，每批先追加到磁盘并 fsync 一次，再从 spool 读游标起
+重放写库，成功后推进游标；写库失败（MySQL 不可用）时数据留在磁盘，每 retry_interval 秒重试，
+内存只保留有界队列。进程崩溃最多丢失尚未刷到 spool 的一个刷写间隔。
+同一位置连续失败 poison_after 次后按二分拆批重试：能写入的部分照常入库，单独一行仍失败的
+（超长品种名、超出 DECIMAL 范围的价格等）移入 spool 的 dead-letter.log 并推进游标，避免一条坏数据
+卡住其后的全部写入；拆分过程中一次都没有写成功时视为数据库不可用，保持游标等待下次重试。
+
+配置了 deadband（ingest.deadband.Deadband）时，价格未变化的 tick 在写线程内先被过滤，
+只保留变化点与心跳行。
+
+配置了 bars（ingest.bars.MinuteBarBuilder）时，死区过滤之前的 tick 先并入分钟 K 线，关闭的分钟
+经 bar_sink 写入 minute_ohlc；写入失败的分钟留在内存（至多 max_pending_bars 条）随下次刷写重试。
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ingest.bars import MinuteBarBuilder
+from ingest.deadband import Deadband
+from ingest.spool import Spool
+
+logger = logging.getLogger(__name__)
+
+Sink = Callable[[List[Dict]], Any]
+
+_STOP = object()
+
+
+def _tick_key(item: Dict) -> Tuple:
+    return (
+        str(item.get("trade_date")), str(item.get("trade_time")), item.get("data_type"),
+        item.get("source", "playwright"), item.get("currency", "CNY"),
+    )
+
+
+def dedup(rows: List[Dict]) -> List[Dict]:
+    """按唯一键去重，保留首次出现的行（与 INSERT IGNORE 语义一致）。"""
+    seen = set()
+    out = []
+    for item in rows:
+        key = _tick_key(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(item)
+    return out
+
+
+class IngestPipeline:
+    def __init__(
+        self,
+        sink: Sink,
+        max_queue: int = 10000,
+        flush_rows: int = 500,
+        flush_interval_ms: int = 500,
+        put_timeout: float = 1.0,
+        spool: Optional[Spool] = None,
+        retry_interval: float = 5.0,
+        deadband: Optional[Deadband] = None,
+        bars: Optional[MinuteBarBuilder] = None,
+        bar_sink: Optional[Sink] = None,
+        max_pending_bars: int = 10000,
+        poison_after: int = 3,
+    ) -> None:
+        self.sink = sink
+        self.spool = spool
+        self.deadband = deadband
+        self.bars = bars
+        self.bar_sink = bar_sink
+        self.max_pending_bars = max_pending_bars
+        self._pending_bars: List[Dict] = []
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+        self.poison_after = poison_after
+        self._replay_failures = 0
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "blocked": 0,
+            "dropped": 0,
+            "duplicates": 0,
+            "flushes": 0,
+            "flushed_rows": 0,
+            "flush_errors": 0,
+            "max_depth": 0,
+            "last_batch": 0,
+            "last_flush_ms": None,
+            "bars_written": 0,
+            "bar_errors": 0,
+            "bars_dropped": 0,
+            "dead_lettered": 0,
+        }
+
+    # ── 提交端 ────────────────────────────────────────────
+    def submit(self, rows: List[Dict]) -> int:
+        """推入一批 tick，返回接受的行数；队列满时阻塞至多 put_timeout 秒。"""
+        accepted = 0
+        blocked = dropped = 0
+        for item in rows:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                blocked += 1
+                try:
+                    self._queue.put(item, timeout=self.put_timeout)
+                except queue.Full:
+                    dropped += 1
+                    continue
+            accepted += 1
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["enqueued"] += accepted
+            self._stats["blocked"] += blocked
+            self._stats["dropped"] += dropped
+            self._stats["max_depth"] = max(self._stats["max_depth"], depth)
+        if dropped:
+            logger.warning(f"[ingest] 队列已满，丢弃 {dropped} 条")
+        return accepted
+
+    # ── 写线程 ────────────────────────────────────────────
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """停止写线程；队列中已有的 tick 先全部刷写（有 spool 时至少落盘）。"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self.spool is not None:
+            self.spool.close()
+
+    def _idle_timeout(self) -> Optional[float]:
+        """队列空闲时的等待上限：spool 有积压时按重试时刻醒来重放，否则一直等待。"""
+        if self.spool is None or not self.spool.has_backlog():
+            return None
+        return max(0.0, self._retry_at - time.monotonic()) or self.flush_interval
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self._idle_timeout())
+            except queue.Empty:
+                first = None
+            if first is _STOP:
+                break
+            batch = [] if first is None else [first]
+            deadline = time.monotonic() + self.flush_interval
+            while batch and len(batch) < self.flush_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+        if self.bars is not None:
+            self._pending_bars.extend(self.bars.flush_all())
+            self._write_bars()
+
+    def _flush(self, batch: List[Dict]) -> None:
+        if self.bars is not None and batch:
+            self._pending_bars.extend(self.bars.update(batch))
+        if self.deadband is not None and batch:
+            batch = self.deadband.filter(batch)
+        if self.spool is None:
+            if batch:
+                self._write(batch)
+        else:
+            if batch:
+                self.spool.append(batch)
+                self.spool.sync()
+            if time.monotonic() >= self._retry_at:
+                self._replay()
+        if self._pending_bars and time.monotonic() >= self._retry_at:
+            self._write_bars()
+
+    def _write_bars(self) -> None:
+        overflow = len(self._pending_bars) - self.max_pending_bars
+        if overflow > 0:
+            # 丢弃最旧的分钟，可用 maintenance rebuild-minute-bars 按原始 tick 补齐
+            del self._pending_bars[:overflow]
+            with self._lock:
+                self._stats["bars_dropped"] += overflow
+        if not self._pending_bars or self.bar_sink is None:
+            self._pending_bars = []
+            return
+        bars = self._pending_bars
+        try:
+            self.bar_sink(bars)
+        except Exception as e:
+            logger.error(f"[ingest] 写入 {len(bars)} 条分钟 K 线失败: {e}")
+            with self._lock:
+                self._stats["bar_errors"] += 1
+            self._retry_at = max(self._retry_at, time.monotonic() + self.retry_interval)
+            return
+        self._pending_bars = []
+        with self._lock:
+            self._stats["bars_written"] += len(bars)
+
+    def _replay(self) -> None:
+        """从 spool 读游标起按批写库，直到追平或写库失败。"""
+        while self.spool.has_backlog():
+            rows, position = self.spool.read(self.flush_rows)
+            if rows and not self._write(rows):
+                self._replay_failures += 1
+                dead = self._isolate(rows) if self._replay_failures % self.poison_after == 0 else None
+                if dead is None:
+                    self._retry_at = time.monotonic() + self.retry_interval
+                    return
+                logger.error(f"[ingest] {len(dead)} 条无法入库，已移入 dead-letter: {dead[:3]}")
+                self.spool.dead_letter(dead)
+                with self._lock:
+                    self._stats["dead_lettered"] += len(dead)
+            self._replay_failures = 0
+            self.spool.commit(position, len(rows))
+            if not rows:
+                return
+        self._retry_at = 0.0
+
+    def _isolate(self, rows: List[Dict]) -> Optional[List[Dict]]:
+        """
+        整批失败后二分重写：先写两半，仍失败的一半继续拆分，返回单独写仍失败的行。
+        在拆到单行之前一次都没有写成功时返回 None（数据库不可用），调用方保持游标不动。
+        """
+        dead: List[Dict] = []
+        progressed = False
+
+        def split(chunk: List[Dict]) -> bool:
+            nonlocal progressed
+            if len(chunk) == 1:
+                if not progressed:
+                    return False
+                dead.append(chunk[0])
+                return True
+            mid = len(chunk) // 2
+            failed = [half for half in (chunk[:mid], chunk[mid:]) if not self._write(half)]
+            progressed = progressed or len(failed) < 2
+            return all(split(half) for half in failed)
+
+        return dead if split(rows) else None
+
+    def _write(self, batch: List[Dict]) -> bool:
+        rows = dedup(batch)
+        started = time.monotonic()
+        try:
+            self.sink(rows)
+            error = False
+        except Exception as e:
+            logger.error(f"[ingest] 写入 {len(rows)} 条失败: {e}")
+            error = True
+        elapsed_ms = (time.monotonic() - started) * 1000.0
+        with self._lock:
+            self._stats["duplicates"] += len(batch) - len(rows)
+            self._stats["flushes"] += 1
+            self._stats["last_batch"] = len(rows)
+            self._stats["last_flush_ms"] = round(elapsed_ms, 2)
+            if error:
+                self._stats["flush_errors"] += 1
+            else:
+                self._stats["flushed_rows"] += len(rows)
+        return not error
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+        out["depth"] = self._queue.qsize()
+        out["capacity"] = self._queue.maxsize
+        out["spool"] = self.spool.stats() if self.spool is not None else None
+        out["deadband"] = self.deadband.stats() if self.deadband is not None else None
+        out["bars"] = self.bars.stats() if self.bars is not None else None
+        out["pending_bars"] = len(self._pending_bars)
+        return out
+
+
+_active: Optional[IngestPipeline] = None
+
+
+def set_active(pipeline: Optional[IngestPipeline]) -> None:
+    """登记进程内正在运行的流水线，供 /api/metrics/ingest 读取。"""
+    global _active
+    _active = pipeline
+
+
+def active_stats() -> Optional[Dict[str, Any]]:
+    return _active.stats() if _active is not None else None
@@ -0,0 +1,210 @@
+"""
+入库预写日志（spool）：追加写的分段文件，保证 MySQL 不可用期间 tick 不丢、内存不涨。
+
+- 每条 tick 一行 JSON，写入 seg-<序号>.log；当前段超过 segment_bytes 时滚动到下一段；
+- sync() 一次 fsync 覆盖自上次以来的全部追加（由写线程每批调用一次，即批量 fsync）；
+- 读游标 (段号, 偏移) 保存在 cursor 文件，commit() 后删除已完全消费的段；
+- 总大小超过 max_bytes 时淘汰最旧的段并告警计数，保证磁盘占用有界；
+- 进程重启后追加总是开新段，崩溃残留的半行在读取时跳过；
+- 单独写库仍失败的行（毒数据）由 dead_letter() 追加到 dead-letter.log，便于人工排查后补录。
+
+重放依赖 price_data 的 INSERT IGNORE 与 rollup 的 LEAST/GREATEST 合并，重复投递是幂等的。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_RE = re.compile(r"^seg-(\d{12})\.log$")
+_CURSOR = "cursor"
+_DEAD_LETTER = "dead-letter.log"
+
+Position = Tuple[int, int]
+
+
+class Spool:
+    def __init__(self, directory: str, segment_bytes: int = 4 << 20, max_bytes: int = 256 << 20) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sizes: Dict[int, int] = {}
+        for name in os.listdir(directory):
+            m = _SEGMENT_RE.match(name)
+            if m:
+                seq = int(m.group(1))
+                self._sizes[seq] = os.path.getsize(self._path(seq))
+        self._read_pos = self._load_cursor()
+        self._stats = {"appended": 0, "replayed": 0, "fsyncs": 0, "corrupt": 0,
+                       "evicted_segments": 0, "evicted_bytes": 0, "dead_lettered": 0}
+        self._dirty = False
+        self._open_segment(max(self._sizes, default=0) + 1)
+
+    # ── 文件 ──────────────────────────────────────────────
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"seg-{seq:012d}.log")
+
+    def _open_segment(self, seq: int) -> None:
+        self._write_seq = seq
+        self._file = open(self._path(seq), "ab")
+        self._sizes[seq] = self._file.tell()
+        if self._read_pos[0] not in self._sizes or self._read_pos[0] > seq:
+            self._read_pos = (min(self._sizes), 0)
+
+    def _load_cursor(self) -> Position:
+        try:
+            with open(os.path.join(self.directory, _CURSOR)) as f:
+                seq, offset = f.read().split()
+                return int(seq), int(offset)
+        except (OSError, ValueError):
+            return (min(self._sizes, default=1), 0)
+
+    def _save_cursor(self) -> None:
+        path = os.path.join(self.directory, _CURSOR)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(f"{self._read_pos[0]} {self._read_pos[1]}")
+        os.replace(tmp, path)
+
+    def _remove_segment(self, seq: int) -> int:
+        size = self._sizes.pop(seq, 0)
+        try:
+            os.remove(self._path(seq))
+        except OSError:
+            pass
+        return size
+
+    # ── 写入 ──────────────────────────────────────────────
+    def append(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        data = b"".join(
+            json.dumps(row, default=str, ensure_ascii=False).encode("utf-8") + b"\n" for row in rows)
+        with self._lock:
+            self._file.write(data)
+            self._sizes[self._write_seq] += len(data)
+            self._stats["appended"] += len(rows)
+            self._dirty = True
+            if self._sizes[self._write_seq] >= self.segment_bytes:
+                self._sync_locked()
+                self._file.close()
+                self._open_segment(self._write_seq + 1)
+            self._enforce_bound_locked()
+
+    def sync(self) -> None:
+        """把自上次 sync 以来的追加落盘（一次 fsync）。"""
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        if not self._dirty:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._dirty = False
+        self._stats["fsyncs"] += 1
+
+    def _enforce_bound_locked(self) -> None:
+        while sum(self._sizes.values()) > self.max_bytes and len(self._sizes) > 1:
+            oldest = min(self._sizes)
+            size = self._remove_segment(oldest)
+            self._stats["evicted_segments"] += 1
+            self._stats["evicted_bytes"] += size
+            logger.error(f"[spool] 超过 {self.max_bytes} 字节上限，淘汰最旧分段 {oldest}（{size} 字节）")
+            if self._read_pos[0] <= oldest:
+                self._read_pos = (min(self._sizes), 0)
+
+    # ── 读取 / 确认 ───────────────────────────────────────
+    def read(self, max_rows: int) -> Tuple[List[Dict[str, Any]], Position]:
+        """从读游标起读取至多 max_rows 行，返回 (行, 读完后的位置)；不移动游标。"""
+        rows: List[Dict[str, Any]] = []
+        with self._lock:
+            self._file.flush()
+            seq, offset = self._read_pos
+            for s in sorted(x for x in self._sizes if x >= seq):
+                if s != seq:
+                    offset = 0
+                with open(self._path(s), "rb") as f:
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            if s != self._write_seq:
+                                self._stats["corrupt"] += 1  # 崩溃残留的半行
+                            break
+                        offset += len(line)
+                        try:
+                            rows.append(json.loads(line))
+                        except ValueError:
+                            self._stats["corrupt"] += 1
+                        if len(rows) >= max_rows:
+                            return rows, (s, offset)
+                if s == self._write_seq:
+                    return rows, (s, offset)
+            return rows, self._read_pos
+
+    def commit(self, position: Position, rows: int = 0) -> None:
+        """确认 position 之前的数据已入库：推进游标并删除已消费的分段。"""
+        with self._lock:
+            self._read_pos = position
+            self._stats["replayed"] += rows
+            for seq in [s for s in self._sizes if s < position[0]]:
+                self._remove_segment(seq)
+            self._save_cursor()
+
+    def dead_letter(self, rows: List[Dict[str, Any]]) -> None:
+        """把无法入库的行追加到 dead-letter.log（每行一条 JSON）并 fsync。"""
+        if not rows:
+            return
+        data = b"".join(
+            json.dumps(row, default=str, ensure_ascii=False).encode("utf-8") + b"\n" for row in rows)
+        with self._lock:
+            with open(os.path.join(self.directory, _DEAD_LETTER), "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._stats["dead_lettered"] += len(rows)
+
+    def pending_bytes(self) -> int:
+        with self._lock:
+            seq, offset = self._read_pos
+            return sum(size for s, size in self._sizes.items() if s >= seq) - offset
+
+    def has_backlog(self) -> bool:
+        return self.pending_bytes() > 0
+
+    def stats(self) -> Dict[str, Any]:
+        out = {"pending_bytes": self.pending_bytes()}
+        with self._lock:
+            out.update(self._stats)
+            out["segments"] = len(self._sizes)
+            out["bytes"] = sum(self._sizes.values())
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync_locked()
+            self._file.close()
+
+
+def spool_from_env() -> Optional[Spool]:
+    """按 INGEST_SPOOL_DIR 创建（默认工作目录下 spool/）；设为空字符串时不启用。"""
+    directory = os.environ.get("INGEST_SPOOL_DIR", "spool").strip()
+    if not directory:
+        return None
+    try:
+        return Spool(
+            directory,
+            segment_bytes=int(os.environ.get("INGEST_SPOOL_SEGMENT_BYTES", str(4 << 20))),
+            max_bytes=int(os.environ.get("INGEST_SPOOL_MAX_BYTES", str(256 << 20))),
+        )
+    except OSError as e:
+        logger.error(f"[spool] 无法使用目录 {directory}，入库仅经内存队列: {e}")
+        return None
@@ -0,0 +1,138 @@
+"""
+运维命令行（需与应用相同的 MYSQL_* 环境变量）。
+
+用法：
+  python src/maintenance.py rebuild-daily-rollup --start 2026-01-01 [--end 2026-01-31]
+  python src/maintenance.py rebuild-minute-bars --start 2026-10-01 [--end 2026-10-31]
+  python src/maintenance.py reconcile-daily-stats [--fix]
+  python src/maintenance.py partition-price-data [--ahead 3]
+  python src/maintenance.py maintain-partitions [--ahead 3] [--drop-before 2024-01-01 [--archive]]
+  python src/maintenance.py compact-history [--until-done]
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta
+
+from app import load_config, setup_logging
+from db import BEIJING_TZ, DatabaseManager
+
+
+def _parse_date(s: str):
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def _rebuild_start(mysql_manager: DatabaseManager, start):
+    """重建只能覆盖原始 tick 保留期内的日期；更早的日期原始数据已被压缩删除，跳过以免清空永久保留的历史。"""
+    cutoff = mysql_manager.raw_cutoff()
+    if cutoff is not None and start < cutoff:
+        logging.warning(f"{start} ~ {cutoff - timedelta(days=1)} 早于原始 tick 保留期，已跳过，从 {cutoff} 开始重建")
+        return cutoff
+    return start
+
+
+def cmd_rebuild_daily_rollup(mysql_manager: DatabaseManager, args) -> int:
+    """逐日重算 price_daily_rollup：每天一个事务，避免长时间锁住大范围数据。"""
+    day = _rebuild_start(mysql_manager, _parse_date(args.start))
+    end = _parse_date(args.end) if args.end else datetime.now(BEIJING_TZ).date()
+    total = 0
+    while day <= end:
+        total += mysql_manager.rebuild_daily_rollup(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    logging.info(f"rollup 重建完成：{args.start} ~ {end}，写入 {total} 行")
+    return 0
+
+
+def cmd_rebuild_minute_bars(mysql_manager: DatabaseManager, args) -> int:
+    """逐日重算 minute_ohlc（回填 / 修复写入失败被丢弃的分钟）。"""
+    day = _rebuild_start(mysql_manager, _parse_date(args.start))
+    end = _parse_date(args.end) if args.end else datetime.now(BEIJING_TZ).date()
+    total = 0
+    while day <= end:
+        total += mysql_manager.rebuild_minute_bars(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    logging.info(f"分钟 K 线重建完成：{args.start} ~ {end}，写入 {total} 行")
+    return 0
+
+
+def cmd_reconcile_daily_stats(mysql_manager: DatabaseManager, args) -> int:
+    """核对 daily_stats 与原始 tick 窗口查询；有不一致时返回 1（--fix 时修复后返回 0）。"""
+    mismatches = mysql_manager.reconcile_daily_stats(fix=args.fix)
+    for m in mismatches:
+        logging.info(f"{m['data_type']}.{m['field']}: daily_stats={m['store']} raw={m['raw']}")
+    logging.info(f"日统计对账完成：{len(mismatches)} 项不一致" + ("，已修复" if args.fix and mismatches else ""))
+    return 0 if args.fix or not mismatches else 1
+
+
+def cmd_partition_price_data(mysql_manager: DatabaseManager, args) -> int:
+    """一次性把 price_data 按月分区（需先执行迁移 007；重建整表）。"""
+    count = mysql_manager.partition_price_data(args.ahead)
+    logging.info(f"price_data 分区完成：新建 {count} 个月分区")
+    return 0
+
+
+def cmd_maintain_partitions(mysql_manager: DatabaseManager, args) -> int:
+    """预建未来分区；--drop-before 删除（--archive 时先归档）整月早于该日期的分区。"""
+    drop_before = _parse_date(args.drop_before) if args.drop_before else None
+    result = mysql_manager.maintain_partitions(args.ahead, drop_before=drop_before, archive=args.archive)
+    logging.info(f"分区维护完成：新建 {result['created']}，删除 {result['dropped']}")
+    return 0
+
+
+def cmd_compact_history(mysql_manager: DatabaseManager, args) -> int:
+    """按 RETENTION_* 执行分层保留压缩；--until-done 时反复执行直到没有可压缩的交易日。"""
+    if not mysql_manager.retention.enabled:
+        logging.info("未配置 RETENTION_RAW_DAYS / RETENTION_MINUTE_MONTHS，无需压缩")
+        return 0
+    while True:
+        stats = mysql_manager.compact_history()
+        logging.info(f"压缩一轮: {stats}")
+        if not args.until_done or stats["days_compacted"] < mysql_manager.compactor.max_days:
+            return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="au_mesage 运维命令")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-daily-rollup", help="按原始 tick 重算日线 rollup（修复 / 回填）")
+    p.add_argument("--start", required=True, help="起始交易日 YYYY-MM-DD")
+    p.add_argument("--end", help="结束交易日 YYYY-MM-DD（默认今日）")
+    p.set_defaults(func=cmd_rebuild_daily_rollup)
+
+    p = sub.add_parser("rebuild-minute-bars", help="按原始 tick 重算分钟 K 线（修复 / 回填）")
+    p.add_argument("--start", required=True, help="起始交易日 YYYY-MM-DD")
+    p.add_argument("--end", help="结束交易日 YYYY-MM-DD（默认今日）")
+    p.set_defaults(func=cmd_rebuild_minute_bars)
+
+    p = sub.add_parser("reconcile-daily-stats", help="按原始 tick 核对价格概览日统计")
+    p.add_argument("--fix", action="store_true", help="用原始数据覆盖不一致的条目")
+    p.set_defaults(func=cmd_reconcile_daily_stats)
+
+    p = sub.add_parser("partition-price-data", help="把 price_data 按 trade_date 月分区（一次性）")
+    p.add_argument("--ahead", type=int, default=3, help="预建今日之后的月数（默认 3）")
+    p.set_defaults(func=cmd_partition_price_data)
+
+    p = sub.add_parser("maintain-partitions", help="预建未来分区 / 删除或归档旧分区")
+    p.add_argument("--ahead", type=int, default=3, help="预建今日之后的月数（默认 3）")
+    p.add_argument("--drop-before", help="删除整月早于该日期的分区 YYYY-MM-DD")
+    p.add_argument("--archive", action="store_true", help="删除前把分区交换到 price_data_archive_pYYYYMM 表")
+    p.set_defaults(func=cmd_maintain_partitions)
+
+    p = sub.add_parser("compact-history", help="按分层保留策略压缩旧数据（原始 tick → 分钟 K 线 → 日线）")
+    p.add_argument("--until-done", action="store_true", help="连续执行直到积压的交易日全部压缩")
+    p.set_defaults(func=cmd_compact_history)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    mysql_manager = DatabaseManager(load_config()["mysql"])
+    return args.func(mysql_manager, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""出站网络：采集器与推送共用的 HTTP 客户端。"""
+
+from net.http_client import HttpClient, HttpError, HttpResponse, Validators, http_client
+
+__all__ = ["HttpClient", "HttpError", "HttpResponse", "Validators", "http_client"]
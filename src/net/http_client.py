@@ -0,0 +1,452 @@
+"""
+出站 HTTP 客户端：采集器与推送共用，标准库 http.client 实现，不引入第三方依赖。
+
+- 按 (scheme, host, port) 维护连接池，复用 keep-alive 连接；响应体读完后归还。
+  复用的空闲连接可能已被服务端关闭，此时透明重试一次新连接。
+- DNS 解析结果按 dns_ttl 缓存；新连接全部地址都连不上时作废该主机的缓存。
+- 同一客户端共享一个 SSLContext，并按主机保存最近的 TLS 会话，新连接优先恢复会话。
+- 每主机并发上限（max_per_host），超出的请求排队，等待计入请求超时。
+- 每次请求记录分阶段耗时（dns / connect / tls / first_byte / body），按主机汇总于 stats()。
+- 遵循 HTTP(S)_PROXY / NO_PROXY 环境变量（与 urllib 一致），HTTPS 经 CONNECT 隧道。
+- 与 urlopen 一致地跟随重定向（至多 max_redirects 次）：GET / HEAD 跟随 301/302/303/307/308，
+  其余方法的 301/302/303 改为不带请求体的 GET，307/308 原样返回给调用方。
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+_USER_AGENT = "au-mesage/1.0"
+
+HostKey = Tuple[str, str, int]
+
+PHASES = ("dns_ms", "connect_ms", "tls_ms", "first_byte_ms", "body_ms")
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_BODY_HEADERS = ("content-type", "content-length")
+
+
+class HttpError(Exception):
+    """网络错误或非预期的 HTTP 状态。"""
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    url: str = ""
+    reused: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+    def header(self, name: str) -> Optional[str]:
+        return self.headers.get(name.lower())
+
+
+class Validators:
+    """
+    按 URL 记住响应的 ETag / Last-Modified，下次请求带上 If-None-Match / If-Modified-Since。
+    调用方在成功处理响应（如写库）之后再 remember()，处理失败时下一轮仍会完整下载。
+    """
+
+    def __init__(self) -> None:
+        self._by_url: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def headers(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            saved = self._by_url.get(url, {})
+        out = {}
+        if "etag" in saved:
+            out["If-None-Match"] = saved["etag"]
+        if "last-modified" in saved:
+            out["If-Modified-Since"] = saved["last-modified"]
+        return out
+
+    def remember(self, url: str, response: HttpResponse) -> None:
+        saved = {k: response.headers[k] for k in ("etag", "last-modified") if k in response.headers}
+        with self._lock:
+            if saved:
+                self._by_url[url] = saved
+            else:
+                self._by_url.pop(url, None)
+
+
+class _Resolver:
+    """getaddrinfo 结果缓存；线程安全。"""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> Tuple[List[tuple], bool]:
+        """返回 (地址列表, 是否命中缓存)。"""
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get((host, port))
+            if hit is not None and hit[0] > now:
+                return hit[1], True
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        if self.ttl > 0:
+            with self._lock:
+                self._cache[(host, port)] = (now + self.ttl, infos)
+        return infos, False
+
+    def invalidate(self, host: str, port: int) -> None:
+        with self._lock:
+            self._cache.pop((host, port), None)
+
+
+class _HTTPConnection(http.client.HTTPConnection):
+    """connect() 使用缓存的 DNS 结果，并记录 dns / connect 耗时。"""
+
+    def __init__(self, host: str, port: int, timeout: float, resolver: _Resolver) -> None:
+        super().__init__(host, port, timeout=timeout)
+        self._resolver = resolver
+        self.phases: Dict[str, float] = {}
+
+    def _open_socket(self) -> None:
+        started = time.perf_counter()
+        infos, _ = self._resolver.resolve(self.host, self.port)
+        resolved = time.perf_counter()
+        last_error: Optional[OSError] = None
+        for family, socktype, proto, _, addr in infos:
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(addr)
+            except OSError as e:
+                sock.close()
+                last_error = e
+                continue
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = sock
+            self.phases["dns_ms"] = (resolved - started) * 1000.0
+            self.phases["connect_ms"] = (time.perf_counter() - resolved) * 1000.0
+            return
+        self._resolver.invalidate(self.host, self.port)
+        raise last_error or OSError(f"无法解析 {self.host}")
+
+    def connect(self) -> None:
+        self._open_socket()
+        if self._tunnel_host:
+            self._tunnel()
+
+
+class _HTTPSConnection(_HTTPConnection):
+    """在 _HTTPConnection 之上握手 TLS，优先恢复 pool 保存的会话。"""
+
+    default_port = http.client.HTTPS_PORT
+
+    def __init__(self, host: str, port: int, timeout: float, resolver: _Resolver,
+                 context: ssl.SSLContext, session: Optional[ssl.SSLSession]) -> None:
+        super().__init__(host, port, timeout, resolver)
+        self._context = context
+        self._session = session
+
+    def connect(self) -> None:
+        super().connect()
+        started = time.perf_counter()
+        server_hostname = self._tunnel_host or self.host
+        try:
+            self.sock = self._context.wrap_socket(
+                self.sock, server_hostname=server_hostname, session=self._session)
+        except ValueError:
+            # 会话与上下文 / 主机不匹配：完整握手
+            self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname)
+        self.phases["tls_ms"] = (time.perf_counter() - started) * 1000.0
+
+
+@dataclass
+class _HostPool:
+    limit: threading.BoundedSemaphore
+    proxy: Optional[Tuple[str, str, int]] = None
+    idle: List[http.client.HTTPConnection] = field(default_factory=list)
+    tls_session: Optional[ssl.SSLSession] = None
+    requests: int = 0
+    errors: int = 0
+    reused: int = 0
+    connections: int = 0
+    tls_resumed: int = 0
+    waiting: int = 0
+    totals: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    samples: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(PHASES, 0))
+    maxima: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+
+
+def _proxy_for(scheme: str, host: str) -> Optional[Tuple[str, str, int]]:
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(host):
+        return None
+    parts = urlsplit(proxy if "://" in proxy else "http://" + proxy)
+    if parts.scheme != "http" or not parts.hostname:
+        return None
+    return parts.scheme, parts.hostname, parts.port or 80
+
+
+class HttpClient:
+    """线程安全；每个主机最多 max_per_host 个并发请求、保留 max_idle_per_host 个空闲连接。"""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_idle_per_host: int = 4,
+        max_per_host: int = 8,
+        dns_ttl: float = 300.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_redirects: int = 5,
+    ) -> None:
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.max_idle_per_host = max_idle_per_host
+        self.max_per_host = max_per_host
+        self._resolver = _Resolver(dns_ttl)
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._pools: Dict[HostKey, _HostPool] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> Tuple[HostKey, str]:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        if scheme not in ("http", "https"):
+            raise HttpError(f"不支持的协议: {scheme}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        return (scheme, parts.hostname or "", port), path
+
+    def _pool(self, key: HostKey) -> _HostPool:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(
+                    limit=threading.BoundedSemaphore(self.max_per_host),
+                    proxy=_proxy_for(key[0], key[1]),
+                )
+                self._pools[key] = pool
+            return pool
+
+    def _acquire(self, key: HostKey, pool: _HostPool,
+                 timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            conn = pool.idle.pop() if pool.idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        return self._new_connection(key, pool, timeout), False
+
+    def _new_connection(self, key: HostKey, pool: _HostPool,
+                        timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        target_host, target_port = (pool.proxy[1], pool.proxy[2]) if pool.proxy else (host, port)
+        if scheme == "https":
+            conn: http.client.HTTPConnection = _HTTPSConnection(
+                target_host, target_port, timeout, self._resolver, self._ssl_context, pool.tls_session)
+            if pool.proxy:
+                conn.set_tunnel(host, port)
+        else:
+            conn = _HTTPConnection(target_host, target_port, timeout, self._resolver)
+        conn.connect()
+        with self._lock:
+            pool.connections += 1
+            if isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session_reused:
+                pool.tls_resumed += 1
+        return conn
+
+    def _release(self, pool: _HostPool, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session is not None:
+                # TLS 1.3 的会话票据在握手后才到达，读完响应再保存
+                pool.tls_session = conn.sock.session
+            if len(pool.idle) < self.max_idle_per_host:
+                pool.idle.append(conn)
+                return
+        conn.close()
+
+    def _record(self, pool: _HostPool, timings: Optional[Dict[str, float]], reused: bool) -> None:
+        with self._lock:
+            pool.requests += 1
+            if timings is None:
+                pool.errors += 1
+                return
+            if reused:
+                pool.reused += 1
+            for phase, ms in timings.items():
+                if phase in pool.totals:
+                    pool.totals[phase] += ms
+                    pool.samples[phase] += 1
+                    pool.maxima[phase] = max(pool.maxima[phase], ms)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HttpResponse:
+        for _ in range(self.max_redirects + 1):
+            response = self._request_once(method, url, body, headers, timeout)
+            location = response.header("location")
+            if response.status not in _REDIRECT_STATUSES or not location:
+                return response
+            if method not in ("GET", "HEAD"):
+                if response.status in (307, 308):
+                    return response  # 与 urllib 一致：不自动重放请求体
+                method, body = "GET", None
+                headers = {k: v for k, v in (headers or {}).items() if k.lower() not in _BODY_HEADERS}
+            url = urljoin(url, location)
+        raise HttpError(f"{method} {url} 重定向超过 {self.max_redirects} 次")
+
+    def _request_once(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]],
+        timeout: Optional[float],
+    ) -> HttpResponse:
+        key, path = self._host_key(url)
+        pool = self._pool(key)
+        if pool.proxy and key[0] == "http":
+            path = url  # 明文代理使用绝对 URI
+        hdrs = {"User-Agent": _USER_AGENT, "Connection": "keep-alive"}
+        hdrs.update(headers or {})
+        timeout = self.timeout if timeout is None else timeout
+
+        with self._lock:
+            pool.waiting += 1
+        acquired = pool.limit.acquire(timeout=timeout)
+        with self._lock:
+            pool.waiting -= 1
+        if not acquired:
+            self._record(pool, None, False)
+            raise HttpError(f"{method} {url} 等待 {key[1]} 并发名额超时")
+        try:
+            response = self._request(key, pool, method, url, path, body, hdrs, timeout)
+        except HttpError:
+            self._record(pool, None, False)
+            raise
+        finally:
+            pool.limit.release()
+        self._record(pool, response.timings, response.reused)
+        return response
+
+    def _request(self, key, pool, method, url, path, body, headers, timeout) -> HttpResponse:
+        try:
+            conn, reused = self._acquire(key, pool, timeout)
+        except (OSError, http.client.HTTPException) as e:
+            raise HttpError(f"{method} {url} 连接失败: {e}") from e
+        try:
+            return self._send(pool, conn, reused, method, url, path, body, headers)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            conn.close()
+            if not reused:
+                raise HttpError(f"{method} {url} 连接被断开")
+            # 空闲连接已被服务端关闭：换新连接重试一次
+            try:
+                conn = self._new_connection(key, pool, timeout)
+                return self._send(pool, conn, False, method, url, path, body, headers)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise HttpError(f"{method} {url} 失败: {e}") from e
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise HttpError(f"{method} {url} 失败: {e}") from e
+
+    def _send(self, pool, conn, reused, method, url, path, body, headers) -> HttpResponse:
+        timings = {} if reused else dict(getattr(conn, "phases", {}))
+        started = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        first_byte = time.perf_counter()
+        data = resp.read()
+        done = time.perf_counter()
+        timings["first_byte_ms"] = (first_byte - started) * 1000.0
+        timings["body_ms"] = (done - first_byte) * 1000.0
+        timings["total_ms"] = sum(timings.values())
+        result = HttpResponse(
+            status=resp.status,
+            headers={k.lower(): v for k, v in resp.getheaders()},
+            body=data,
+            url=url,
+            reused=reused,
+            timings=timings,
+        )
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(pool, conn)
+        return result
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> HttpResponse:
+        return self.request("GET", url, headers=headers, timeout=timeout)
+
+    def get_json(self, url: str, timeout: Optional[float] = None) -> Any:
+        """GET 并解析 JSON；非 2xx 抛 HttpError。"""
+        resp = self.get(url, timeout=timeout)
+        if not 200 <= resp.status < 300:
+            raise HttpError(f"GET {url} 返回 HTTP {resp.status}")
+        return resp.json()
+
+    def post_json(self, url: str, payload: Any, timeout: Optional[float] = None) -> HttpResponse:
+        body = json.dumps(payload).encode("utf-8")
+        return self.request("POST", url, body=body,
+                            headers={"Content-Type": "application/json"}, timeout=timeout)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """按主机汇总：请求 / 错误 / 复用 / 新建连接 / TLS 恢复次数，各阶段平均与最大耗时（毫秒）。"""
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (scheme, host, port), pool in self._pools.items():
+                out[f"{scheme}://{host}:{port}"] = {
+                    "requests": pool.requests,
+                    "errors": pool.errors,
+                    "reused": pool.reused,
+                    "connections": pool.connections,
+                    "tls_resumed": pool.tls_resumed,
+                    "idle": len(pool.idle),
+                    "waiting": pool.waiting,
+                    "phases": {
+                        phase: {
+                            "avg": round(pool.totals[phase] / pool.samples[phase], 2)
+                            if pool.samples[phase] else None,
+                            "max": round(pool.maxima[phase], 2),
+                        }
+                        for phase in PHASES
+                    },
+                }
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for conn in pool.idle:
+                conn.close()
+
+
+# 进程级共享实例
+http_client = HttpClient(
+    max_per_host=int(os.environ.get("HTTP_MAX_PER_HOST", "8")),
+    dns_ttl=float(os.environ.get("HTTP_DNS_TTL", "300")),
+)
@@ -0,0 +1,5 @@
+"""实时推送：价格提醒 SSE 的共享广播。"""
+
+from realtime.alert_hub import AlertHub, AsyncSubscription, Subscription
+
+__all__ = ["AlertHub", "AsyncSubscription", "Subscription"]
@@ -0,0 +1,244 @@
+"""
+价格提醒 SSE 的扇出中心。
+
+每个 data_type 只有一个广播线程按固定间隔取一次最新价，再推送到各订阅者自己的队列；
+gte / lte 目标价按价格排序保存，一次二分即可找出本轮被触发的全部订阅者。
+连接数因此只消耗内存，不再放大数据库查询或常驻轮询线程。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import itertools
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FetchPrice = Callable[[str], Optional[float]]
+Event = Tuple[str, Any]
+
+_ids = itertools.count(1)
+
+# 连接关闭哨兵（仅 AsyncSubscription 使用）
+CLOSED: Event = ("closed", None)
+
+# 一次性 / 终止事件：订阅者触发后已从待判定列表移除，丢了就不会再发，队列满时也不能丢弃
+_KEEP = frozenset({"alert", "closed"})
+
+
+def _evictable(events: Any) -> Optional[int]:
+    """队列满时可丢弃的最旧事件下标（price / error 可由后续推送替代）；没有时返回 None。"""
+    for i, (kind, _) in enumerate(events):
+        if kind not in _KEEP:
+            return i
+    return None
+
+
+class Subscription:
+    """
+    单个订阅者：有界事件队列 + 提醒条件。队列满时丢弃最旧的价格 / 错误事件，慢客户端不会拖住广播线程；
+    alert 与 closed 事件始终保留。
+    """
+
+    __slots__ = ("id", "data_type", "target", "op", "_queue")
+
+    def __init__(self, data_type: str, target: float, op: str, maxsize: int = 16) -> None:
+        self.id = next(_ids)
+        self.data_type = data_type
+        self.target = float(target)
+        self.op = op
+        self._queue = self._new_queue(maxsize)
+
+    def _new_queue(self, maxsize: int) -> Any:
+        return queue.Queue(maxsize=maxsize)
+
+    def deliver(self, event: Event) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                q = self._queue
+                with q.mutex:
+                    index = _evictable(q.queue)
+                    if index is None:
+                        return  # 队列里全是必须保留的事件（实际不会发生），放弃新事件
+                    del q.queue[index]
+                    q.not_full.notify()
+
+    def next_event(self, timeout: float) -> Optional[Event]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """
+    协程侧订阅者：广播线程经 call_soon_threadsafe 把事件投递到事件循环内的 asyncio.Queue。
+    不持有线程或线程锁，单个空闲连接只占一个协程帧与一个小队列。
+    """
+
+    __slots__ = ("_loop",)
+
+    def __init__(self, data_type: str, target: float, op: str,
+                 loop: asyncio.AbstractEventLoop, maxsize: int = 16) -> None:
+        self._loop = loop
+        super().__init__(data_type, target, op, maxsize)
+
+    def _new_queue(self, maxsize: int) -> Any:
+        return asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event: Event) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # 事件循环已关闭（进程退出中），丢弃即可
+            pass
+
+    def _put(self, event: Event) -> None:
+        if self._queue.full():
+            # 在事件循环线程内执行，取出再放回不会与消费方交错
+            pending = [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+            index = _evictable(pending)
+            if index is not None:
+                del pending[index]
+            for queued in pending:
+                self._queue.put_nowait(queued)
+            if index is None:
+                return  # 同步版：全是必须保留的事件时放弃新事件
+        self._queue.put_nowait(event)
+
+    def close(self) -> None:
+        """在事件循环内调用：客户端断开时唤醒等待中的 next_event。"""
+        self._put(CLOSED)
+
+    async def next_event(self, timeout: float) -> Optional[Event]:  # type: ignore[override]
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _Broadcaster:
+    """单个 data_type 的广播线程；最后一个订阅者离开后退出。"""
+
+    def __init__(self, hub: "AlertHub", data_type: str) -> None:
+        self.hub = hub
+        self.data_type = data_type
+        self.last_price: Optional[float] = None
+        self._subs: Dict[int, Subscription] = {}
+        # 尚未触发的目标价：(target, sub_id) 升序
+        self._pending_gte: List[Tuple[float, int]] = []
+        self._pending_lte: List[Tuple[float, int]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=f"alert-hub-{self.data_type}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def add(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs[sub.id] = sub
+            if sub.op == "gte":
+                bisect.insort(self._pending_gte, (sub.target, sub.id))
+            elif sub.op == "lte":
+                bisect.insort(self._pending_lte, (sub.target, sub.id))
+            price = self.last_price
+            if price is not None:
+                sub.deliver(("price", price))
+                for hit in self._pop_triggered_locked(price):
+                    hit.deliver(("alert", price))
+
+    def remove(self, sub: Subscription) -> bool:
+        """移除订阅者，返回是否已无订阅者。"""
+        with self._lock:
+            self._subs.pop(sub.id, None)
+            self._pending_gte = [p for p in self._pending_gte if p[1] != sub.id]
+            self._pending_lte = [p for p in self._pending_lte if p[1] != sub.id]
+            return not self._subs
+
+    def _pop_triggered_locked(self, price: float) -> List[Subscription]:
+        # gte：target <= price 的前缀；lte：target >= price 的后缀
+        cut = bisect.bisect_right(self._pending_gte, (price, float("inf")))
+        hits = self._pending_gte[:cut]
+        del self._pending_gte[:cut]
+        cut = bisect.bisect_left(self._pending_lte, (price, -1))
+        hits += self._pending_lte[cut:]
+        del self._pending_lte[cut:]
+        return [self._subs[sid] for _, sid in hits if sid in self._subs]
+
+    def poll_once(self) -> None:
+        try:
+            price = self.hub.fetch_price(self.data_type)
+        except Exception as e:
+            logger.error(f"[alert-hub] 获取 {self.data_type} 最新价失败: {e}")
+            price = None
+
+        # deliver 为非阻塞入队，持锁完成可保证与 add() 之间不漏推
+        with self._lock:
+            if price is None:
+                if self.last_price is None:
+                    for sub in self._subs.values():
+                        sub.deliver(("error", "无法获取最新市场价格"))
+                return
+            price = float(price)
+            if price != self.last_price:
+                self.last_price = price
+                for sub in self._subs.values():
+                    sub.deliver(("price", price))
+            for sub in self._pop_triggered_locked(price):
+                sub.deliver(("alert", price))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.poll_once()
+            if self._stop.wait(self.hub.interval):
+                break
+
+
+class AlertHub:
+    """按 data_type 懒启动广播线程；订阅 / 退订线程安全。"""
+
+    def __init__(self, fetch_price: FetchPrice, interval: float = 5.0) -> None:
+        self.fetch_price = fetch_price
+        self.interval = interval
+        self._broadcasters: Dict[str, _Broadcaster] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, data_type: str, target: float, op: str) -> Subscription:
+        return self.add(Subscription(data_type, target, op))
+
+    def add(self, sub: Subscription) -> Subscription:
+        """挂载已构造的订阅者（如 ASGI 模式下的 AsyncSubscription）。"""
+        with self._lock:
+            caster = self._broadcasters.get(sub.data_type)
+            started = caster is None
+            if started:
+                caster = _Broadcaster(self, sub.data_type)
+                self._broadcasters[sub.data_type] = caster
+            caster.add(sub)
+        if started:
+            caster.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            caster = self._broadcasters.get(sub.data_type)
+            if caster is not None and caster.remove(sub):
+                caster.stop()
+                del self._broadcasters[sub.data_type]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {dt: len(c._subs) for dt, c in self._broadcasters.items()}
@@ -0,0 +1,70 @@
+"""价格提醒 SSE 的参数解析与事件编码：Flask（线程）与 ASGI（协程）两种服务模式共用。"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from api_errors import ApiError
+from realtime.alert_hub import Event
+
+SUBSCRIPTION_TIMEOUT_SECONDS = 30 * 60
+# 无事件时的保活间隔；价格变化由广播线程推送
+PING_INTERVAL_SECONDS = 15
+
+
+@dataclass(frozen=True)
+class SubscribeParams:
+    data_type: str
+    target: float
+    op: str
+    auto_close: bool
+
+
+def parse_subscribe_params(get: Callable[[str, Optional[str]], Optional[str]]) -> SubscribeParams:
+    """get(name, default) 读取查询参数；校验失败抛 ApiError（与原路由文案一致）。"""
+    data_type = get("data_type", None)
+    target_raw = get("target", None)
+    op = get("op", "gte")
+    auto_close = (get("auto_close", "true") or "").lower() == "true"
+    if not data_type or target_raw is None:
+        raise ApiError.invalid_argument("缺少参数: data_type 或 target")
+    try:
+        target = float(target_raw)
+    except Exception:
+        raise ApiError.invalid_argument("参数格式错误")
+    return SubscribeParams(data_type, target, op, auto_close)
+
+
+def encode_event(name: str, data: str) -> str:
+    return f"event: {name}\ndata: {data}\n\n"
+
+
+PING = encode_event("ping", "keepalive")
+TIMEOUT = encode_event("timeout", "订阅超时，请重新订阅")
+
+
+def render_event(event: Event, params: SubscribeParams) -> Tuple[str, bool]:
+    """把 hub 事件编码为 SSE 文本，返回 (chunk, 是否结束流)。"""
+    kind, value = event
+    if kind == "error":
+        return encode_event("error", value), True
+    if kind == "price":
+        return encode_event("price", json.dumps({"price": value})), False
+    payload = json.dumps({"price": value, "target": params.target, "op": params.op})
+    return encode_event("alert", payload), params.auto_close
+
+
+def notify_alert(params: SubscribeParams, price: float) -> None:
+    """触发提醒后向已配置渠道推送（阻塞网络 IO，异步模式下需放到线程池执行）。"""
+    try:
+        from webhook_notifier import notify_all
+
+        op_text = "达到或超过" if params.op == "gte" else "达到或低于"
+        notify_all(
+            f"{params.data_type}价格提醒",
+            f"当前价格 {price} 元/克，已{op_text}目标价 {params.target} 元/克",
+        )
+    except Exception:
+        pass
@@ -8,6 +8,7 @@ from CustomJSONEncoder import CustomJSONProvider
 from api_errors import ApiError, build_error_payload
 from db import DatabaseManager
 from audit.service import bind_audit_writer
+from realtime.alert_hub import AlertHub
 from routes.api import create_api_blueprint
 from routes.pages_bp import create_pages_blueprint
 
@@ -22,8 +23,12 @@ def create_app(mysql_manager: DatabaseManager) -> Flask:
     app.json = CustomJSONProvider(app)
     bind_audit_writer(mysql_manager)
 
+    # 同一个扇出中心供 Flask 路由与 ASGI 长连接处理器（asgi.py）共用
+    alert_hub = AlertHub(mysql_manager.get_latest_market_price)
+    app.extensions["alert_hub"] = alert_hub
+
     app.register_blueprint(create_pages_blueprint())
-    app.register_blueprint(create_api_blueprint(mysql_manager))
+    app.register_blueprint(create_api_blueprint(mysql_manager, alert_hub))
 
     @app.errorhandler(ApiError)
     def _handle_api_error(err: ApiError):
@@ -5,6 +5,7 @@ from __future__ import annotations
 from flask import Blueprint
 
 from db import DatabaseManager
+from realtime.alert_hub import AlertHub
 
 from .admin_routes import register_admin_routes
 from .auth_routes import register_auth_routes
@@ -13,10 +14,10 @@ from .misc_routes import register_misc_routes
 from .price_routes import register_price_routes
 
 
-def create_api_blueprint(mysql_manager: DatabaseManager) -> Blueprint:
+def create_api_blueprint(mysql_manager: DatabaseManager, alert_hub: AlertHub | None = None) -> Blueprint:
     bp = Blueprint("api", __name__)
     register_price_routes(bp, mysql_manager)
-    register_alert_routes(bp, mysql_manager)
+    register_alert_routes(bp, mysql_manager, alert_hub)
     register_misc_routes(bp, mysql_manager)
     register_admin_routes(bp, mysql_manager)
     register_auth_routes(bp)
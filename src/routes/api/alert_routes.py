@@ -2,18 +2,34 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import time
+from typing import Optional
 
 from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from api_errors import ApiError
 from db import DatabaseManager
-from routes.api.cache import api_ttl_cache
+from realtime.alert_hub import AlertHub
+from realtime.sse import (
+    PING,
+    PING_INTERVAL_SECONDS,
+    SUBSCRIPTION_TIMEOUT_SECONDS,
+    TIMEOUT,
+    notify_alert,
+    parse_subscribe_params,
+    render_event,
+)
+
+
+def register_alert_routes(
+    bp: Blueprint,
+    mysql_manager: DatabaseManager,
+    alert_hub: Optional[AlertHub] = None,
+) -> None:
+    if alert_hub is None:
+        alert_hub = AlertHub(mysql_manager.get_latest_market_price)
 
-
-def register_alert_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None:
     @bp.route("/api/alert-channels", methods=["GET"])
     def alert_channels():
         """返回已配置的推送渠道"""
@@ -80,63 +96,31 @@ def register_alert_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None
 
     @bp.route("/api/price-alert/subscribe", methods=["GET"])
     def price_alert_subscribe():
-        data_type = request.args.get("data_type")
-        target_raw = request.args.get("target")
-        op = request.args.get("op", "gte")
-        auto_close = request.args.get("auto_close", "true").lower() == "true"
-        if not data_type or target_raw is None:
-            raise ApiError.invalid_argument("缺少参数: data_type 或 target")
-        try:
-            target = float(target_raw)
-        except Exception:
-            raise ApiError.invalid_argument("参数格式错误")
+        params = parse_subscribe_params(request.args.get)
 
         def sse_stream():
-            alerted = False
-            start_time = time.time()
-            timeout_seconds = 30 * 60  # 30分钟超时
-            while True:
-                # 超时检查
-                if time.time() - start_time > timeout_seconds:
-                    yield "event: timeout\n"
-                    yield "data: 订阅超时，请重新订阅\n\n"
-                    break
-
-                cache_key = f"latest_price_{data_type}"
-                price = api_ttl_cache.get(cache_key, ttl=10)
-                if price is None:
-                    price = mysql_manager.get_latest_market_price(data_type)
-                    if price is not None:
-                        api_ttl_cache.set(cache_key, price)
-
-                if price is None:
-                    yield "event: error\n"
-                    yield "data: 无法获取最新市场价格\n\n"
-                    break
-                payload_price = json.dumps({"price": float(price)})
-                yield "event: price\n"
-                yield f"data: {payload_price}\n\n"
-                cond = (op == "gte" and float(price) >= target) or (op == "lte" and float(price) <= target)
-                if cond and not alerted:
-                    payload_alert = json.dumps({"price": float(price), "target": target, "op": op})
-                    yield "event: alert\n"
-                    yield f"data: {payload_alert}\n\n"
-                    alerted = True
-                    try:
-                        from webhook_notifier import notify_all
-
-                        op_text = "达到或超过" if op == "gte" else "达到或低于"
-                        notify_all(
-                            f"{data_type}价格提醒",
-                            f"当前价格 {float(price)} 元/克，已{op_text}目标价 {target} 元/克",
-                        )
-                    except Exception:
-                        pass
-                    if auto_close:
+            sub = alert_hub.subscribe(params.data_type, params.target, params.op)
+            deadline = time.monotonic() + SUBSCRIPTION_TIMEOUT_SECONDS
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        yield TIMEOUT
+                        break
+
+                    event = sub.next_event(timeout=min(PING_INTERVAL_SECONDS, remaining))
+                    if event is None:
+                        yield PING
+                        continue
+
+                    chunk, done = render_event(event, params)
+                    yield chunk
+                    if event[0] == "alert":
+                        notify_alert(params, event[1])
+                    if done:
                         break
-                yield "event: ping\n"
-                yield "data: keepalive\n\n"
-                time.sleep(5)
+            finally:
+                alert_hub.unsubscribe(sub)
 
         headers = {"Cache-Control": "no-cache", "Connection": "keep-alive"}
         return Response(stream_with_context(sse_stream()), mimetype="text/event-stream", headers=headers)
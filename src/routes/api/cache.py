@@ -1,7 +1,216 @@
-"""API 层共享：时区与进程内 TTL 缓存。"""
+"""
+API 层共享：时区、两级响应缓存、未命中合并与按路由声明的 HTTP 缓存策略。
+
+L1 为进程内 TtlCache；配置 CACHE_L2_URL 后，带编解码器（codec）的条目同时写入共享的
+Redis 协议后端，多 worker 之间共享命中。L2 故障时自动降级为仅 L1。
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import pytz
-from cache import TtlCache
+from flask import Response, current_app, request
+
+from cache import SingleFlight, TtlCache
+from cache.redis_backend import BackendError, log_backend_error, shared_backend
 
 BEIJING_TZ = pytz.timezone("Asia/Shanghai")
-api_ttl_cache = TtlCache()
+# 键含用户输入（data_type、range、客户端 IP），必须有上限
+api_ttl_cache = TtlCache(
+    max_entries=int(os.environ.get("API_CACHE_MAX_ENTRIES", "4096")),
+    max_bytes=int(os.environ.get("API_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    sweep_interval=30,
+)
+api_single_flight = SingleFlight()
+
+# (encode: value -> bytes, decode: bytes -> value)
+Codec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+
+_L2_PREFIX = "au:resp:"
+_l2_stats: Dict[str, int] = {"hits": 0, "misses": 0, "errors": 0}
+_l2_stats_lock = threading.Lock()
+
+
+def _count_l2(name: str) -> None:
+    with _l2_stats_lock:
+        _l2_stats[name] += 1
+
+
+def cached_response(
+    key: str,
+    ttl: float,
+    loader: Callable[[], Any],
+    stale_ttl: float = 0,
+    codec: Optional[Codec] = None,
+    is_current: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """
+    读缓存；未命中时同一 key 只有一个请求执行 loader，并发请求等待并共享其结果。
+    loader 抛出的异常会传给所有等待者，且不写入缓存。
+
+    stale_ttl > 0 时启用 stale-while-revalidate：条目超过 ttl（软过期）后的 stale_ttl 秒内
+    直接返回旧值，并只发起一次后台刷新；超过 ttl + stale_ttl（硬过期）才由请求同步加载。
+
+    is_current 对缓存值返回 False（如数据版本已变化）时按软过期处理：返回旧值并后台刷新一次。
+
+    提供 codec 时 L1 未命中会查 L2，加载结果也写入 L2。
+    """
+    found = api_ttl_cache.get_stale(key)
+    if found is None and codec is not None:
+        found = _l2_get(key, stale_ttl, codec)
+    if found is not None:
+        value, fresh = found
+        if fresh and is_current is not None and not is_current(value):
+            fresh = False
+        if not fresh:
+            api_single_flight.do_background(
+                key, lambda: _load_and_store(key, ttl, loader, stale_ttl, codec))
+        return value
+
+    def fill() -> Any:
+        # 排队成为 leader 之前上一轮可能刚写入
+        value = api_ttl_cache.get(key)
+        if value is None:
+            value = _load_and_store(key, ttl, loader, stale_ttl, codec)
+        return value
+
+    return api_single_flight.do(key, fill)
+
+
+def _load_and_store(
+    key: str, ttl: float, loader: Callable[[], Any], stale_ttl: float, codec: Optional[Codec]
+) -> Any:
+    value = loader()
+    api_ttl_cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+    if codec is not None:
+        _l2_set(key, value, ttl, stale_ttl, codec)
+    return value
+
+
+def _l2_get(key: str, stale_ttl: float, codec: Codec) -> Optional[Tuple[Any, bool]]:
+    """L2 记录为 b"<软过期毫秒时间戳>\n" + 编码值；命中后回填 L1。"""
+    backend = shared_backend()
+    if backend is None:
+        return None
+    try:
+        raw = backend.get(_L2_PREFIX + key)
+    except BackendError as e:
+        _count_l2("errors")
+        log_backend_error(e)
+        return None
+    if raw is None:
+        _count_l2("misses")
+        return None
+    header, _, payload = raw.partition(b"\n")
+    try:
+        remaining = int(header) / 1000.0 - time.time()
+        value = codec[1](payload)
+    except (ValueError, TypeError):
+        # 损坏或旧格式的记录（不同版本 / 外部写入）按未命中处理，由 loader 重新加载并覆盖
+        _count_l2("misses")
+        return None
+    if remaining > 0:
+        api_ttl_cache.set(key, value, ttl=remaining, stale_ttl=stale_ttl)
+    else:
+        api_ttl_cache.set(key, value, ttl=0, stale_ttl=max(0.0, stale_ttl + remaining))
+    _count_l2("hits")
+    return value, remaining > 0
+
+
+def _l2_set(key: str, value: Any, ttl: float, stale_ttl: float, codec: Codec) -> None:
+    backend = shared_backend()
+    if backend is None:
+        return
+    fresh_until_ms = int((time.time() + ttl) * 1000)
+    try:
+        backend.set(_L2_PREFIX + key, b"%d\n" % fresh_until_ms + codec[0](value), ttl + stale_ttl)
+    except BackendError as e:
+        _count_l2("errors")
+        log_backend_error(e)
+
+
+def cache_stats() -> dict:
+    backend = shared_backend()
+    with _l2_stats_lock:
+        l2 = dict(_l2_stats, enabled=backend is not None)
+    if backend is not None:
+        l2.update(circuit_open=backend.open, short_circuited=backend.short_circuited)
+    return {"cache": api_ttl_cache.stats(), "single_flight": api_single_flight.stats(), "l2": l2}
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    单个路由的缓存策略。ttl / stale_ttl 同 cached_response；etag 为 False 时不下发 ETag、不做 304；
+    cache_control 缺省为 "public, max-age=<ttl>[, stale-while-revalidate=<stale_ttl>]"。
+    """
+
+    ttl: float
+    stale_ttl: float = 0
+    etag: bool = True
+    cache_control: Optional[str] = None
+
+    def cache_control_header(self) -> str:
+        if self.cache_control is not None:
+            return self.cache_control
+        value = f"public, max-age={int(self.ttl)}"
+        if self.stale_ttl:
+            value += f", stale-while-revalidate={int(self.stale_ttl)}"
+        return value
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """已序列化的 JSON 响应体、其强 ETag（内容哈希）与加载时的数据版本。"""
+
+    body: bytes
+    etag: str
+    version: str = ""
+
+    @classmethod
+    def encode(cls, payload: Any, dumps: Callable[[Any], str], version: str = "") -> "CachedBody":
+        body = dumps(payload).encode("utf-8")
+        return cls(body, hashlib.blake2b(body, digest_size=16).hexdigest(), version)
+
+    def to_bytes(self) -> bytes:
+        return f"{self.etag} {self.version}".encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CachedBody":
+        header, _, body = raw.partition(b"\n")
+        etag, _, version = header.decode("utf-8").partition(" ")
+        return cls(body, etag, version)
+
+
+_BODY_CODEC: Codec = (CachedBody.to_bytes, CachedBody.from_bytes)
+
+
+def cached_json(key: str, policy: CachePolicy, loader: Callable[[], Any],
+                version: Optional[str] = None) -> Response:
+    """
+    按策略返回 loader 载荷的 JSON 响应：缓存中保存编码后的字节，命中时不再序列化；
+    请求携带匹配的 If-None-Match 时返回 304。loader 可能在后台线程执行，不得访问 request。
+
+    version 为当前数据版本（不放进缓存键）：与缓存体记录的版本不同时返回旧响应体并后台刷新一次，
+    入库频繁时请求也不会每次同步等待重新加载。
+    """
+    # 在请求上下文内取出 JSON 编码器，后台刷新时沿用
+    dumps = current_app.json.dumps
+    version = "" if version is None else str(version)
+    entry: CachedBody = cached_response(
+        key, policy.ttl, lambda: CachedBody.encode(loader(), dumps, version),
+        stale_ttl=policy.stale_ttl, codec=_BODY_CODEC,
+        is_current=lambda cached: cached.version == version)
+
+    if policy.etag and entry.etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = Response(entry.body, mimetype="application/json")
+    if policy.etag:
+        resp.set_etag(entry.etag)
+    resp.headers["Cache-Control"] = policy.cache_control_header()
+    return resp
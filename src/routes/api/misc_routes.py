@@ -26,8 +26,11 @@ from application.exchange import (
 from application.health import build_health_payload
 from application.metrics import build_quality_metrics_payload
 from db import DatabaseManager
+from ingest import active_stats as ingest_stats
+from ingest.deadband import heartbeat_seconds
+from net.http_client import http_client
 
-from .cache import BEIJING_TZ
+from .cache import BEIJING_TZ, cache_stats
 from .rate_limit import enforce_rate_limit
 
 
@@ -44,7 +47,23 @@ def register_misc_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None:
         now = datetime.now(BEIJING_TZ)
         latest = mysql_manager.get_latest_updates_by_group()
         counts = mysql_manager.get_counts_last_hour_by_group()
-        return jsonify(build_quality_metrics_payload(latest, counts, now))
+        return jsonify(build_quality_metrics_payload(
+            latest, counts, now, heartbeat_seconds=max(0, int(heartbeat_seconds()))))
+
+    @bp.route("/api/metrics/cache", methods=["GET"])
+    def metrics_cache():
+        """进程内响应缓存命中率与单飞合并次数（single_flight.shared 即省下的数据库查询数）"""
+        return jsonify({"success": True, **cache_stats()})
+
+    @bp.route("/api/metrics/http", methods=["GET"])
+    def metrics_http():
+        """出站 HTTP：按主机的连接复用、TLS 会话恢复与分阶段耗时"""
+        return jsonify({"success": True, "hosts": http_client.stats()})
+
+    @bp.route("/api/metrics/ingest", methods=["GET"])
+    def metrics_ingest():
+        """入库流水线背压：队列深度、阻塞 / 丢弃次数、批大小与刷写耗时（采集器未运行时为 null）"""
+        return jsonify({"success": True, "ingest": ingest_stats()})
 
     @bp.route("/api/export/history", methods=["GET"])
     @require_role("admin", "ops")
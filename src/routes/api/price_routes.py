@@ -26,27 +26,33 @@ from application.trend_range import (
 )
 from db import DatabaseManager
 
-from .cache import BEIJING_TZ, api_ttl_cache
+from .cache import BEIJING_TZ, CachePolicy, cached_json
+
+# 缓存体记录加载时的 mysql_manager.data_version()（不放进缓存键）：新数据提交后返回旧响应体并后台刷新一次，
+# 请求不必同步等待重新加载；TTL 只是兜底（其他进程写库、日期切换前后）。
+# 浏览器侧统一 no-cache，每次轮询用 If-None-Match 复核，未变化时只交换 304 头。
+# 概览含按生成时刻计算的 freshness_seconds / data_status，TTL 保持较短。
+_OVERVIEW_POLICY = CachePolicy(ttl=60, stale_ttl=240, cache_control="no-cache")
+_DAILY_POLICY = CachePolicy(ttl=3600, cache_control="no-cache")
+_INTRADAY_POLICY = CachePolicy(ttl=600, cache_control="no-cache")
 
 
 def register_price_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None:
     @bp.route("/api/price-overview", methods=["GET"])
     def price_overview():
-        """返回金/银的综合概览：当前价、涨跌、今日高低（单条SQL + 10s缓存）"""
-        cached = api_ttl_cache.get("price_overview", ttl=10)
-        if cached is not None:
-            return jsonify(cached)
+        """返回金/银的综合概览：当前价、涨跌、今日高低（单条SQL + 按数据版本缓存）"""
         today = datetime.now(BEIJING_TZ).date()
-        yesterday = today - timedelta(days=1)
         today_str = today.strftime("%Y-%m-%d")
-        yesterday_str = yesterday.strftime("%Y-%m-%d")
+        yesterday_str = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+
+        def load():
+            rows = mysql_manager.get_price_overview_data(today_str, yesterday_str)
+            if not rows:
+                rows = mysql_manager.get_price_overview_data_fallback()
+            return build_price_overview_payload(rows, now=datetime.now(BEIJING_TZ))
 
-        rows = mysql_manager.get_price_overview_data(today_str, yesterday_str)
-        if not rows:
-            rows = mysql_manager.get_price_overview_data_fallback()
-        resp = build_price_overview_payload(rows, now=datetime.now(BEIJING_TZ))
-        api_ttl_cache.set("price_overview", resp)
-        return jsonify(resp)
+        cache_key = f"price_overview@{today_str}"
+        return cached_json(cache_key, _OVERVIEW_POLICY, load, version=mysql_manager.data_version())
 
     @bp.route("/api/latest-price", methods=["GET"])
     def get_latest_price():
@@ -112,24 +118,21 @@ def register_price_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None
 
     @bp.route("/api/last-7-days", methods=["GET"])
     def api_last_7_days():
-        """返回指定 data_type 的近 7 天每日回收价格（单条SQL + 60s缓存）"""
+        """返回指定 data_type 的近 7 天每日回收价格（单条SQL + 按数据版本缓存）"""
         data_type = request.args.get("data_type")
         if not data_type:
             raise ApiError.invalid_argument("缺少 data_type 参数")
 
-        cache_key = f"last7_{data_type}"
-        cached = api_ttl_cache.get(cache_key, ttl=60)
-        if cached is not None:
-            return jsonify(cached)
-
         today = datetime.now(BEIJING_TZ).date()
         start_date = (today - timedelta(days=6)).strftime("%Y-%m-%d")
         end_date = today.strftime("%Y-%m-%d")
 
-        rows = mysql_manager.get_last_n_days_daily_price(data_type, start_date, end_date)
-        resp = build_last_7_days_payload(rows, today)
-        api_ttl_cache.set(cache_key, resp)
-        return jsonify(resp)
+        def load():
+            rows = mysql_manager.get_last_n_days_daily_price(data_type, start_date, end_date)
+            return build_last_7_days_payload(rows, today)
+
+        cache_key = f"last7_{data_type}@{end_date}"
+        return cached_json(cache_key, _DAILY_POLICY, load, version=mysql_manager.data_version(data_type))
 
     @bp.route("/api/price-trend", methods=["GET"])
     def api_price_trend():
@@ -144,34 +147,28 @@ def register_price_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None
             raise ApiError.invalid_argument("缺少 data_type 参数")
 
         today = datetime.now(BEIJING_TZ).date()
+        end_date = today.strftime("%Y-%m-%d")
+        version = mysql_manager.data_version(data_type)
 
         if range_str == "1d":
-            cache_key = f"trend_1d_{data_type}"
-            cached = api_ttl_cache.get(cache_key, ttl=30)
-            if cached is not None:
-                return jsonify(cached)
-            rows = mysql_manager.get_intraday_trend(data_type, today.strftime("%Y-%m-%d"))
-            data = intraday_rows_to_line_series(rows)
-            resp = build_price_trend_line_response(data)
-            api_ttl_cache.set(cache_key, resp)
-            return jsonify(resp)
+            def load_intraday():
+                rows = mysql_manager.get_intraday_trend(data_type, end_date)
+                return build_price_trend_line_response(intraday_rows_to_line_series(rows))
+
+            cache_key = f"trend_1d_{data_type}@{end_date}"
+            return cached_json(cache_key, _INTRADAY_POLICY, load_intraday, version=version)
 
         start_date, err = parse_range_for_price_trend_ohlc(range_str, today)
         if err:
             raise ApiError.invalid_argument(err)
 
-        cache_key = f"trend_{range_str}_{data_type}"
-        ttl = 60 if range_str in ("7d", "30d") else 300
-        cached = api_ttl_cache.get(cache_key, ttl=ttl)
-        if cached is not None:
-            return jsonify(cached)
+        def load_ohlc():
+            rows = mysql_manager.get_ohlc_trend(data_type, start_date, end_date)
+            data = ohlc_rows_to_candlestick_series(rows)
+            return build_price_trend_candlestick_response(range_str, data)
 
-        end_date = today.strftime("%Y-%m-%d")
-        rows = mysql_manager.get_ohlc_trend(data_type, start_date, end_date)
-        data = ohlc_rows_to_candlestick_series(rows)
-        resp = build_price_trend_candlestick_response(range_str, data)
-        api_ttl_cache.set(cache_key, resp)
-        return jsonify(resp)
+        cache_key = f"trend_{range_str}_{data_type}@{end_date}"
+        return cached_json(cache_key, _DAILY_POLICY, load_ohlc, version=version)
 
     @bp.route("/api/gold-silver-ratio", methods=["GET"])
     def api_gold_silver_ratio():
@@ -183,14 +180,12 @@ def register_price_routes(bp: Blueprint, mysql_manager: DatabaseManager) -> None
         if err:
             raise ApiError.invalid_argument(err)
 
-        cache_key = f"gs_ratio_{range_str}"
-        ttl = 60 if range_str in ("7d", "30d") else 300
-        cached = api_ttl_cache.get(cache_key, ttl=ttl)
-        if cached is not None:
-            return jsonify(cached)
-
         end_date = today.strftime("%Y-%m-%d")
-        rows = mysql_manager.get_gold_silver_ratio(start_date, end_date)
-        resp = build_gold_silver_ratio_payload(range_str, rows)
-        api_ttl_cache.set(cache_key, resp)
-        return jsonify(resp)
+
+        def load():
+            rows = mysql_manager.get_gold_silver_ratio(start_date, end_date)
+            return build_gold_silver_ratio_payload(range_str, rows)
+
+        # 金银比同时依赖黄金与白银，使用全局版本
+        cache_key = f"gs_ratio_{range_str}@{end_date}"
+        return cached_json(cache_key, _DAILY_POLICY, load, version=mysql_manager.data_version())
@@ -3,6 +3,7 @@ from __future__ import annotations
 import time
 
 from api_errors import ApiError
+from cache.redis_backend import BackendError, log_backend_error, shared_backend
 
 from .cache import api_ttl_cache
 
@@ -10,18 +11,31 @@ from .cache import api_ttl_cache
 def enforce_rate_limit(*, key: str, limit: int, window_seconds: int) -> None:
     now = time.time()
     cache_key = f"rl:{key}"
-    bucket = api_ttl_cache.get(cache_key, ttl=window_seconds)
+
+    # 配置了 L2 时计数放在共享存储，多 worker 合计受同一上限约束
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            count = backend.incr_window(f"au:{cache_key}", window_seconds)
+        except BackendError as e:
+            log_backend_error(e)
+        else:
+            if count > limit:
+                raise ApiError.rate_limited("请求过于频繁，请稍后再试")
+            return
+    bucket = api_ttl_cache.get(cache_key)
     if bucket is None:
-        api_ttl_cache.set(cache_key, {"count": 1, "start": now})
+        api_ttl_cache.set(cache_key, {"count": 1, "start": now}, ttl=window_seconds)
         return
 
     start = float(bucket.get("start") or now)
     if now - start > window_seconds:
-        api_ttl_cache.set(cache_key, {"count": 1, "start": now})
+        api_ttl_cache.set(cache_key, {"count": 1, "start": now}, ttl=window_seconds)
         return
 
     count = int(bucket.get("count") or 0) + 1
     if count > limit:
         raise ApiError.rate_limited("请求过于频繁，请稍后再试")
     bucket["count"] = count
-    api_ttl_cache.set(cache_key, bucket)
+    # 保持窗口起点对应的过期时刻，计数更新不延长窗口
+    api_ttl_cache.set(cache_key, bucket, ttl=start + window_seconds - now)
@@ -15,24 +15,21 @@
 
 import logging
 import os
-import json
 import smtplib
 from email.mime.text import MIMEText
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
-from urllib.error import URLError
+
+from net.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
 
 def _post_json(url, payload, timeout=10):
-    """发送 JSON POST 请求（使用标准库，不依赖 requests）"""
-    data = json.dumps(payload).encode('utf-8')
-    req = Request(url, data=data, headers={'Content-Type': 'application/json'})
+    """发送 JSON POST 请求（经共享 HTTP 客户端复用连接）"""
     try:
-        resp = urlopen(req, timeout=timeout)
+        resp = http_client.post_json(url, payload, timeout=timeout)
         return resp.status == 200
-    except (URLError, Exception) as e:
+    except Exception as e:
         safe = _safe_url_for_log(url)
         logger.error(f"POST 请求失败 ({safe}): {e}")
         return False
@@ -0,0 +1,116 @@
+"""测试用的本地 Redis 协议桩：只实现 L2 缓存用到的命令，支持 TCP 与 Unix socket。"""
+
+from __future__ import annotations
+
+import socket
+import socketserver
+import threading
+import time
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _Store:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+        self.commands = []
+
+    def _alive(self, key):
+        exp = self.expires.get(key)
+        if exp is not None and time.monotonic() >= exp:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def execute(self, args):
+        cmd = args[0].upper().decode()
+        self.commands.append(cmd)
+        with self.lock:
+            if cmd == "PING":
+                return b"+PONG\r\n"
+            if cmd in ("AUTH", "SELECT"):
+                return b"+OK\r\n"
+            if cmd == "GET":
+                return _bulk(self.data.get(args[1]) if self._alive(args[1]) else None)
+            if cmd == "MGET":
+                return b"*%d\r\n" % (len(args) - 1) + b"".join(
+                    _bulk(self.data.get(k) if self._alive(k) else None) for k in args[1:])
+            if cmd == "SET":
+                key, value, opts = args[1], args[2], [a.upper() for a in args[3:]]
+                if b"NX" in opts and self._alive(key):
+                    return b"$-1\r\n"
+                self.data[key] = value
+                self.expires.pop(key, None)
+                if b"PX" in opts:
+                    self.expires[key] = time.monotonic() + int(args[3 + opts.index(b"PX") + 1]) / 1000
+                return b"+OK\r\n"
+            if cmd == "INCR":
+                current = int(self.data[args[1]]) if self._alive(args[1]) else 0
+                self.data[args[1]] = str(current + 1).encode()
+                return b":%d\r\n" % (current + 1)
+            if cmd == "DEL":
+                n = sum(1 for k in args[1:] if self._alive(k) and self.data.pop(k, None) is not None)
+                return b":%d\r\n" % n
+            if cmd == "FLUSHDB":
+                self.data.clear()
+                self.expires.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % cmd.encode()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            n = int(line[1:-2])
+            args = []
+            for _ in range(n):
+                size = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(size + 2)[:-2])
+            self.wfile.write(self.server.store.execute(args))
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class FakeRedisServer:
+    """with FakeRedisServer() as srv: srv.url -> redis://127.0.0.1:<port>/0"""
+
+    def __init__(self, unix_path=None):
+        self.store = _Store()
+        if unix_path:
+            self._server = _UnixServer(unix_path, _Handler)
+            self.url = f"unix://{unix_path}?db=0"
+        else:
+            self._server = _TCPServer(("127.0.0.1", 0), _Handler)
+            self.url = f"redis://127.0.0.1:{self._server.server_address[1]}/0"
+        self._server.store = self.store
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,98 @@
+"""AlertHub：单次取价扇出与一次性目标判定。"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+from realtime.alert_hub import AlertHub, AsyncSubscription, Subscription, _Broadcaster
+
+
+def _drain(sub):
+    events = []
+    while True:
+        ev = sub.next_event(timeout=0)
+        if ev is None:
+            return events
+        events.append(ev)
+
+
+def test_one_fetch_serves_all_subscribers():
+    fetch = MagicMock(return_value=100.0)
+    hub = AlertHub(fetch, interval=3600)
+    subs = [hub.subscribe("XAU", 1000, "gte") for _ in range(50)]
+    caster = hub._broadcasters["XAU"]
+    for _ in range(200):  # 等待广播线程完成首轮取价
+        if caster.last_price is not None:
+            break
+        time.sleep(0.005)
+    caster.poll_once()
+
+    assert fetch.call_count == 2
+    for sub in subs:
+        assert _drain(sub) == [("price", 100.0)]
+    for sub in subs:
+        hub.unsubscribe(sub)
+    assert hub.stats() == {}
+
+
+def test_targets_trigger_once_in_single_pass():
+    prices = iter([100.0, 105.0, 95.0, 95.0])
+    hub = AlertHub(lambda _dt: next(prices), interval=3600)
+    caster = _Broadcaster(hub, "XAU")
+    up = Subscription("XAU", 104, "gte")
+    down = Subscription("XAU", 96, "lte")
+    never = Subscription("XAU", 200, "gte")
+    for sub in (up, down, never):
+        caster.add(sub)
+
+    caster.poll_once()
+    assert _drain(up) == [("price", 100.0)]
+    caster.poll_once()
+    assert _drain(up) == [("price", 105.0), ("alert", 105.0)]
+    caster.poll_once()
+    assert _drain(down)[-1] == ("alert", 95.0)
+    caster.poll_once()  # 价格未变：不重复推送也不重复提醒
+    assert _drain(up) == [("price", 95.0)]
+    assert _drain(down) == []
+    assert all(kind == "price" for kind, _ in _drain(never))
+
+
+def test_late_subscriber_gets_last_price_immediately():
+    hub = AlertHub(lambda _dt: 100.0, interval=3600)
+    caster = _Broadcaster(hub, "XAG")
+    caster.poll_once()
+    sub = Subscription("XAG", 100, "lte")
+    caster.add(sub)
+    assert _drain(sub) == [("price", 100.0), ("alert", 100.0)]
+
+
+def test_slow_subscriber_queue_is_bounded():
+    sub = Subscription("XAU", 1, "gte", maxsize=2)
+    for i in range(5):
+        sub.deliver(("price", float(i)))
+    assert _drain(sub) == [("price", 3.0), ("price", 4.0)]
+
+
+def test_full_queue_never_drops_alert():
+    sub = Subscription("XAU", 1, "gte", maxsize=3)
+    sub.deliver(("price", 0.0))
+    sub.deliver(("alert", 1.0))
+    for i in range(2, 6):
+        sub.deliver(("price", float(i)))
+    assert _drain(sub) == [("alert", 1.0), ("price", 4.0), ("price", 5.0)]
+
+
+def test_async_full_queue_never_drops_alert():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        sub = AsyncSubscription("XAU", 1, "gte", loop, maxsize=3)
+        sub._put(("alert", 1.0))
+        for i in range(2, 6):
+            sub._put(("price", float(i)))
+        sub.close()
+        events = [loop.run_until_complete(sub.next_event(0.1)) for _ in range(3)]
+        assert events == [("alert", 1.0), ("price", 5.0), ("closed", None)]
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
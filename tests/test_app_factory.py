@@ -125,3 +125,58 @@ def test_exchange_rate_prefers_cache_over_db(mock_get_usd):
     assert resp.status_code == 200
     assert resp.get_json()["rate"] == 7.25
     mm.get_latest_exchange_rate.assert_not_called()
+
+
+def test_metrics_cache_reports_single_flight():
+    app = create_app(MagicMock())
+    resp = app.test_client().get("/api/metrics/cache")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert {"hits", "misses", "entries"} <= set(body["cache"])
+    assert {"executed", "shared"} <= set(body["single_flight"])
+
+
+def test_cached_route_etag_and_304():
+    api_ttl_cache.clear()
+    try:
+        mm = MagicMock()
+        mm.get_price_overview_data.return_value = [_OVERVIEW_ROW]
+        client = create_app(mm).test_client()
+
+        first = client.get("/api/price-overview")
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and first.headers["Cache-Control"] == "no-cache"
+
+        second = client.get("/api/price-overview", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == etag
+
+        third = client.get("/api/price-overview", headers={"If-None-Match": '"other"'})
+        assert third.status_code == 200
+        assert third.data == first.data
+        mm.get_price_overview_data.assert_called_once()
+    finally:
+        api_ttl_cache.clear()
+
+
+def test_cached_route_reloads_after_ingest_version_bump():
+    from cache.data_versions import DataVersions
+
+    api_ttl_cache.clear()
+    try:
+        versions = DataVersions()
+        mm = MagicMock()
+        mm.data_version.side_effect = versions.token
+        mm.get_price_overview_data.return_value = [_OVERVIEW_ROW]
+        client = create_app(mm).test_client()
+
+        client.get("/api/price-overview")
+        client.get("/api/price-overview")
+        assert mm.get_price_overview_data.call_count == 1
+
+        versions.bump(["XAU"])
+        client.get("/api/price-overview")
+        assert mm.get_price_overview_data.call_count == 2
+    finally:
+        api_ttl_cache.clear()
@@ -0,0 +1,90 @@
+"""ASGI 入口：长连接 SSE 走协程，其余请求转交 Flask。"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from asgi import create_asgi_app
+from route import create_app
+
+
+def _scope(path, query=b""):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+
+
+def _call(app, scope, disconnect_after=None):
+    """驱动一次 ASGI 请求；disconnect_after 个 body 片段后模拟客户端断开。"""
+    sent = []
+
+    async def run():
+        disconnected = asyncio.Event()
+
+        async def receive():
+            if scope["path"] == "/api/price-alert/subscribe":
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+            chunks = [m for m in sent if m["type"] == "http.response.body"]
+            if disconnect_after is not None and len(chunks) >= disconnect_after:
+                disconnected.set()
+
+        await asyncio.wait_for(app(scope, receive, send), timeout=10)
+
+    asyncio.run(run())
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return start, body.decode()
+
+
+def _app(price):
+    mm = MagicMock()
+    mm.get_latest_market_price.return_value = price
+    flask_app = create_app(mm)
+    return flask_app, create_asgi_app(flask_app)
+
+
+def test_subscribe_streams_price_then_alert():
+    _, app = _app(100.0)
+    start, body = _call(app, _scope("/api/price-alert/subscribe", b"data_type=XAU&target=90&op=gte"))
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in start["headers"]
+    assert body.index("event: price") < body.index("event: alert")
+    assert '"target": 90.0' in body
+
+
+def test_subscribe_missing_params_returns_json_error():
+    _, app = _app(100.0)
+    start, body = _call(app, _scope("/api/price-alert/subscribe"))
+    assert start["status"] == 400
+    assert '"INVALID_ARGUMENT"' in body
+
+
+def test_client_disconnect_releases_subscription():
+    flask_app, app = _app(100.0)
+    hub = flask_app.extensions["alert_hub"]
+    query = b"data_type=XAU&target=999&op=gte&auto_close=false"
+    _, body = _call(app, _scope("/api/price-alert/subscribe", query), disconnect_after=1)
+    assert "event: price" in body
+    assert hub.stats() == {}
+
+
+def test_other_routes_served_by_flask():
+    _, app = _app(100.0)
+    start, body = _call(app, _scope("/api/health"))
+    assert start["status"] == 200
+    assert '"healthy"' in body
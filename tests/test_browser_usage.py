@@ -0,0 +1,33 @@
+"""浏览器进程树资源占用（/proc）与采集器健康度上报。"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from collectors import browser_usage
+from collectors import stats as collector_stats
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="依赖 /proc")
+def test_tree_usage_counts_descendants():
+    before = browser_usage.tree_usage()
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+    try:
+        usage = browser_usage.tree_usage()
+        assert child.pid in browser_usage.descendants(os.getpid())
+        assert usage["processes"] == before["processes"] + 1
+        assert usage["rss_bytes"] > before["rss_bytes"]
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_record_browser_shows_in_snapshot():
+    collector_stats.reset_for_tests()
+    collector_stats.record_browser("playwright", {"rss_mb": 300.0, "reloads": 2})
+    row = collector_stats.snapshot()[0]
+    assert row["source_id"] == "playwright"
+    assert row["browser"] == {"rss_mb": 300.0, "reloads": 2}
+    collector_stats.reset_for_tests()
@@ -0,0 +1,134 @@
+"""两级缓存：L2（Redis 协议）后端、跨 worker 共享命中 / 限流 / 数据版本，以及后端故障降级。"""
+
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from api_errors import ApiError
+from cache.data_versions import DataVersions
+from cache.redis_backend import BackendError, RedisBackend, ReplyError
+from fake_redis_server import FakeRedisServer, free_port
+from route import create_app
+from routes.api.cache import api_ttl_cache, cached_response
+from routes.api.rate_limit import enforce_rate_limit
+
+_OVERVIEW_ROW = {"data_type": "XAU", "recycle_price": 100.0, "yesterday_close": 99.0}
+
+
+@pytest.fixture
+def l2(monkeypatch):
+    with FakeRedisServer() as srv:
+        monkeypatch.setenv("CACHE_L2_URL", srv.url)
+        api_ttl_cache.clear()
+        yield srv
+        api_ttl_cache.clear()
+
+
+def test_backend_commands_over_tcp_and_unix(tmp_path):
+    with FakeRedisServer() as tcp, FakeRedisServer(unix_path=str(tmp_path / "r.sock")) as unix:
+        for srv in (tcp, unix):
+            b = RedisBackend(srv.url)
+            b.set("k", b"v\r\n1", ttl=60)
+            assert b.get("k") == b"v\r\n1"
+            assert b.mget("k", "missing") == [b"v\r\n1", None]
+            assert [b.incr_window("rl", 60) for _ in range(3)] == [1, 2, 3]
+            with pytest.raises(ReplyError):
+                b.execute("NOPE")
+            # 错误响应后连接仍可复用
+            assert b.execute("PING") == "PONG"
+            b.close()
+
+
+def test_unreachable_backend_raises_backend_error():
+    b = RedisBackend(f"redis://127.0.0.1:{free_port()}/0")
+    with pytest.raises(BackendError):
+        b.get("k")
+
+
+def test_circuit_breaker_skips_network_until_probe():
+    b = RedisBackend(f"redis://127.0.0.1:{free_port()}/0", cooldown=0.1, max_cooldown=1)
+    with pytest.raises(BackendError):
+        b.get("k")
+    assert b.open and b.errors == 1
+    b._connect = MagicMock(side_effect=AssertionError("冷却期内不应连接"))
+    with pytest.raises(BackendError):
+        b.get("k")
+    assert b.short_circuited == 1
+    time.sleep(0.15)
+    with FakeRedisServer() as srv:
+        # 冷却结束：放行一个探测请求，成功后熔断恢复
+        b._connect = RedisBackend(srv.url)._connect
+        assert b.get("k") is None
+        assert not b.open
+        b.close()
+
+
+def test_cached_route_shared_between_workers(l2):
+    worker_a, worker_b = MagicMock(), MagicMock()
+    for mm in (worker_a, worker_b):
+        mm.data_version.return_value = "0.1"
+        mm.get_price_overview_data.return_value = [_OVERVIEW_ROW]
+
+    first = create_app(worker_a).test_client().get("/api/price-overview")
+    # 模拟另一个进程：L1 为空，只能从 L2 命中
+    api_ttl_cache.clear()
+    second = create_app(worker_b).test_client().get("/api/price-overview")
+
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    worker_a.get_price_overview_data.assert_called_once()
+    worker_b.get_price_overview_data.assert_not_called()
+
+
+def test_malformed_l2_entry_is_a_miss(l2):
+    codec = (lambda v: json.dumps(v).encode(), lambda b: json.loads(b))
+    backend = RedisBackend(l2.url)
+    for raw in (b"not-a-timestamp\n{}", b"no-header", b"%d\n{broken" % int((time.time() + 60) * 1000)):
+        backend.set("au:resp:k-bad", raw, ttl=60)
+        api_ttl_cache.clear()
+        assert cached_response("k-bad", 60, lambda: {"ok": 1}, codec=codec) == {"ok": 1}
+    # 重新加载后覆盖为合法记录
+    api_ttl_cache.clear()
+    assert cached_response("k-bad", 60, lambda: {"ok": 2}, codec=codec) == {"ok": 1}
+
+
+def test_rate_limit_counts_across_workers(l2):
+    for _ in range(3):
+        enforce_rate_limit(key="export:1.2.3.4", limit=3, window_seconds=60)
+        api_ttl_cache.clear()  # 本地状态不参与计数
+    with pytest.raises(ApiError) as e:
+        enforce_rate_limit(key="export:1.2.3.4", limit=3, window_seconds=60)
+    assert e.value.code == "RATE_LIMITED"
+
+
+def test_data_versions_shared_through_store(l2):
+    a = DataVersions(store=RedisBackend(l2.url))
+    b = DataVersions(store=RedisBackend(l2.url))
+    before = b.token("XAU")
+    a.bump(["XAU"])
+    assert b.token("XAU") != before
+    assert b.token("XAU") == a.token("XAU")
+
+
+def test_backend_down_degrades_to_l1(monkeypatch):
+    monkeypatch.setenv("CACHE_L2_URL", f"redis://127.0.0.1:{free_port()}/0")
+    api_ttl_cache.clear()
+    try:
+        mm = MagicMock()
+        mm.data_version.return_value = "0.1"
+        mm.get_price_overview_data.return_value = [_OVERVIEW_ROW]
+        client = create_app(mm).test_client()
+        assert client.get("/api/price-overview").status_code == 200
+        assert client.get("/api/price-overview").status_code == 200
+        mm.get_price_overview_data.assert_called_once()
+
+        enforce_rate_limit(key="k-down", limit=1, window_seconds=60)
+        with pytest.raises(ApiError):
+            enforce_rate_limit(key="k-down", limit=1, window_seconds=60)
+
+        versions = DataVersions(store=RedisBackend(f"redis://127.0.0.1:{free_port()}/0"))
+        assert versions.token("XAU").startswith("l")
+    finally:
+        api_ttl_cache.clear()
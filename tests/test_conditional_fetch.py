@@ -0,0 +1,81 @@
+"""Fawazahmed0 / ExchangeRate 采集器：条件请求与未变化时跳过写库。"""
+
+import json
+from unittest.mock import MagicMock
+
+from collectors import exchange_rate
+from collectors.exchange_rate import ExchangeRateCollector
+from collectors.fawazahmed0 import Fawazahmed0Collector
+from net.http_client import HttpResponse, Validators
+
+
+def _resp(status, payload=None, etag=None):
+    headers = {"etag": etag} if etag else {}
+    body = json.dumps(payload).encode() if payload is not None else b""
+    return HttpResponse(status=status, headers=headers, body=body)
+
+
+def test_validators_sent_only_after_remember():
+    v = Validators()
+    url = "https://example.test/a.json"
+    assert v.headers(url) == {}
+    v.remember(url, HttpResponse(200, {"etag": '"abc"', "last-modified": "Mon, 01 Jun 2026 00:00:00 GMT"}, b""))
+    assert v.headers(url) == {"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 01 Jun 2026 00:00:00 GMT"}
+
+
+def test_fawazahmed0_skips_on_304_and_unchanged_date(monkeypatch):
+    payloads = {
+        "xau": {"date": "2026-10-17", "xau": {"cny": 19000.0, "usd": 2650.0}},
+        "xag": {"date": "2026-10-17", "xag": {"cny": 230.0, "usd": 31.0}},
+    }
+    get = MagicMock()
+    monkeypatch.setattr("collectors.fawazahmed0.http_client.get", get)
+    mm = MagicMock()
+    collector = Fawazahmed0Collector(mm)
+
+    get.side_effect = lambda url, headers, timeout: _resp(
+        200, payloads["xau" if "/xau." in url else "xag"], etag='"v1"')
+    collector.fetch()
+    assert mm.upsert_daily_ohlc.call_count == 4
+
+    # 第二轮：带上 If-None-Match，上游 304 → 不写库
+    get.side_effect = lambda url, headers, timeout: _resp(304)
+    collector.fetch()
+    assert all(call.kwargs["headers"] == {"If-None-Match": '"v1"'} for call in get.call_args_list[2:])
+    assert mm.upsert_daily_ohlc.call_count == 4
+
+    # 上游未返回 304 但 date 未变 → 同样跳过
+    get.side_effect = lambda url, headers, timeout: _resp(
+        200, payloads["xau" if "/xau." in url else "xag"], etag='"v2"')
+    collector.fetch()
+    assert mm.upsert_daily_ohlc.call_count == 4
+
+
+def test_fawazahmed0_retries_full_download_after_write_failure(monkeypatch):
+    get = MagicMock(return_value=_resp(200, {"date": "2026-10-17", "xau": {"cny": 1.0}, "xag": {}}, etag='"v1"'))
+    monkeypatch.setattr("collectors.fawazahmed0.http_client.get", get)
+    mm = MagicMock()
+    mm.upsert_daily_ohlc.side_effect = [Exception("db down"), None]
+    collector = Fawazahmed0Collector(mm)
+    collector.fetch()
+    collector.fetch()
+    # 写库失败后不记住校验器，下一轮仍完整下载并写入
+    assert get.call_args_list[2].kwargs["headers"] == {}
+    assert mm.upsert_daily_ohlc.call_count == 2
+
+
+def test_exchange_rate_skips_unchanged_update(monkeypatch):
+    body = {"result": "success", "time_last_update_unix": 1760659201, "rates": {"CNY": 7.12}}
+    get = MagicMock(return_value=_resp(200, body))
+    monkeypatch.setattr("collectors.exchange_rate.http_client.get", get)
+    mm = MagicMock()
+    collector = ExchangeRateCollector(mm)
+
+    collector.fetch()
+    collector.fetch()
+    mm.upsert_exchange_rate.assert_called_once_with("USD", "CNY", 7.12, "exchange_rate")
+    assert exchange_rate.get_usd_cny_rate() == 7.12
+
+    get.return_value = _resp(304)
+    collector.fetch()
+    mm.upsert_exchange_rate.assert_called_once()
@@ -0,0 +1,159 @@
+"""增量日统计（cache.daily_stats）与概览读取路径测试。"""
+
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+from cache.daily_stats import DailyStatsStore, diff, entries_from_overview, view
+from db.price_writer import PriceWriter
+
+TODAY = date(2026, 10, 18)
+
+
+def _tick(price, day="2026-10-18", at="10:00:00", data_type="XAU"):
+    return {"trade_date": day, "trade_time": at, "data_type": data_type,
+            "recycle_price": price, "real_time_price": price + 1, "source": "playwright"}
+
+
+def _store(*ticks):
+    store = DailyStatsStore()
+    store.load([])
+    store.apply(list(ticks))
+    return store
+
+
+def test_view_is_none_until_loaded():
+    store = DailyStatsStore()
+    store.apply([_tick(100)])
+    assert store.view(TODAY) is None
+    store.load(store.rows())
+    assert store.view(TODAY)[0]["recycle_price"] == 100
+
+
+def test_apply_tracks_current_high_low():
+    store = _store(_tick(100, at="09:00:00"), _tick(105, at="09:01:00"), _tick(98, at="09:02:00"),
+                   _tick(101, at="08:59:00"))
+    row = store.view(TODAY)[0]
+    assert row["recycle_price"] == 98  # 较早的迟到 tick 不改变当前价
+    assert (row["today_high"], row["today_low"]) == (105, 98)
+    assert row["yesterday_close"] is None
+
+
+def test_rollover_carries_yesterday_close():
+    store = _store(_tick(100, day="2026-10-17", at="23:59:00"), _tick(102, at="00:00:30"))
+    row = store.view(TODAY)[0]
+    assert row["yesterday_close"] == 100
+    assert (row["recycle_price"], row["today_high"], row["today_low"]) == (102, 102, 102)
+    # 迟到的昨日 tick 不影响今日统计
+    assert store.apply([_tick(999, day="2026-10-17", at="23:59:59")]) is False
+
+
+def test_view_rolls_over_lazily_without_new_ticks():
+    store = _store(_tick(100, day="2026-10-17", at="15:00:00"))
+    row = store.view(TODAY)[0]
+    assert row["yesterday_close"] == 100
+    assert row["today_high"] is None and row["today_low"] is None
+    assert store.view(date(2026, 10, 19)) == []
+
+
+def test_entries_from_overview_round_trip_and_diff():
+    raw = [{"data_type": "XAU", "trade_date": TODAY, "trade_time": "10:00:00", "recycle_price": 100,
+            "real_time_price": 101, "source": "playwright", "updated_at": None,
+            "yesterday_close": 99, "today_high": 104, "today_low": 97}]
+    entries = entries_from_overview(raw, TODAY)
+    assert entries[0]["tick_at"] == datetime(2026, 10, 18, 10, 0, 0)
+    raw_rows = [view(e, TODAY) for e in entries]
+
+    store = _store(_tick(100, at="09:59:00"))
+    mismatches = diff(store.view(TODAY), raw_rows)
+    assert {m["field"] for m in mismatches} == {"yesterday_close", "today_high", "today_low"}
+
+    assert store.replace(entries) == ["XAU"]
+    assert diff(store.view(TODAY), raw_rows) == []
+
+
+def test_replace_keeps_newer_memory_entry():
+    store = _store(_tick(100, at="10:05:00"))
+    entries = entries_from_overview([{"data_type": "XAU", "trade_date": TODAY, "trade_time": "10:00:00",
+                                      "recycle_price": 90}], TODAY)
+    assert store.replace(entries) == []
+    assert store.view(TODAY)[0]["recycle_price"] == 100
+
+
+def test_upsert_daily_stats_sql():
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    PriceWriter(pool).upsert_daily_stats(_store(_tick(100), _tick(101, data_type="XAG")).rows())
+    sql, params = cursor.execute.call_args.args
+    assert sql.startswith("INSERT INTO daily_stats (data_type, trade_date, tick_at")
+    assert "today_low = VALUES(today_low)" in sql and "data_type = VALUES" not in sql
+    assert len(params) == 20
+
+
+def _manager():
+    with patch("db.ConnectionPool"):
+        from db import DatabaseManager
+
+        mm = DatabaseManager({})
+    mm.reader = MagicMock()
+    mm.writer = MagicMock()
+    return mm
+
+
+def test_overview_served_from_memory_after_ingest():
+    mm = _manager()
+    mm.reader.get_daily_stats.return_value = [
+        {"data_type": "XAU", "trade_date": TODAY, "tick_at": datetime(2026, 10, 18, 9, 0), "recycle_price": 100,
+         "real_time_price": 101, "source": "playwright", "updated_at": None,
+         "yesterday_close": 99, "today_high": 100, "today_low": 100}]
+    assert mm.warm_daily_stats() is True
+    mm.reader.reset_mock()
+
+    mm.batch_insert_data([_tick(104, at="09:30:00")])
+    mm.writer.upsert_daily_stats.assert_called()
+    row = mm.get_price_overview_data("2026-10-18", "2026-10-17")[0]
+    assert (row["recycle_price"], row["yesterday_close"], row["today_high"]) == (104, 99, 104)
+    mm.reader.get_price_overview_data.assert_not_called()
+    mm.reader.get_daily_stats.assert_not_called()
+
+
+def test_overview_falls_back_to_table_then_raw():
+    mm = _manager()
+    mm.reader.get_daily_stats.return_value = []
+    mm.reader.get_price_overview_data.return_value = [{"data_type": "XAU"}]
+    assert mm.get_price_overview_data("2026-10-18", "2026-10-17") == [{"data_type": "XAU"}]
+
+    mm.reader.get_daily_stats.return_value = [
+        {"data_type": "XAU", "trade_date": date(2026, 10, 17), "recycle_price": 100}]
+    row = mm.get_price_overview_data("2026-10-18", "2026-10-17")[0]
+    assert row["yesterday_close"] == 100 and row["today_high"] is None
+
+
+def test_flush_writes_only_changed_entries_and_throttles(monkeypatch):
+    monkeypatch.setenv("DAILY_STATS_FLUSH_SECONDS", "60")
+    mm = _manager()
+    mm.reader.get_daily_stats.return_value = [
+        {"data_type": t, "trade_date": TODAY, "tick_at": datetime(2026, 10, 18, 9, 0), "recycle_price": 100,
+         "real_time_price": 101, "source": "playwright", "updated_at": None,
+         "yesterday_close": 99, "today_high": 100, "today_low": 100} for t in ("XAU", "XAG", "PT")]
+    mm.warm_daily_stats()
+    mm.writer.reset_mock()
+
+    mm.batch_insert_data([_tick(104, at="09:30:00")])
+    (written,), _ = mm.writer.upsert_daily_stats.call_args
+    assert [r["data_type"] for r in written] == ["XAU"]
+
+    # 节流窗口内不写回，停机时强制写回累积的变化
+    mm.batch_insert_data([_tick(105, at="09:31:00", data_type="XAG")])
+    assert mm.writer.upsert_daily_stats.call_count == 1
+    mm.flush_daily_stats(force=True)
+    (written,), _ = mm.writer.upsert_daily_stats.call_args
+    assert [r["data_type"] for r in written] == ["XAG"]
+
+    # 跨日立即写回；写回失败的条目留待下次
+    mm.writer.upsert_daily_stats.side_effect = RuntimeError("down")
+    mm.batch_insert_data([_tick(106, day="2026-10-19", at="00:00:10", data_type="PT")])
+    assert mm.writer.upsert_daily_stats.call_count == 3
+    mm.writer.upsert_daily_stats.side_effect = None
+    mm.flush_daily_stats(force=True)
+    (written,), _ = mm.writer.upsert_daily_stats.call_args
+    assert [(r["data_type"], r["yesterday_close"]) for r in written] == [("PT", 100)]
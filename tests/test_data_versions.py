@@ -0,0 +1,35 @@
+"""DataVersions：写入路径递增版本，缓存键据此失效。"""
+
+from unittest.mock import MagicMock, patch
+
+from cache.data_versions import DataVersions
+
+
+def test_bump_changes_type_and_global_tokens():
+    v = DataVersions()
+    xau, xag, all_types = v.token("XAU"), v.token("XAG"), v.token()
+    v.bump(["XAU", "XAU", None])
+    assert v.token("XAU") != xau
+    assert v.token("XAG") == xag
+    assert v.token() != all_types
+
+
+def test_bump_all_invalidates_every_token():
+    v = DataVersions()
+    before = v.token("XAG")
+    v.bump_all()
+    assert v.token("XAG") != before
+
+
+def test_batch_insert_bumps_versions():
+    with patch("db.ConnectionPool"):
+        from db import DatabaseManager
+
+        mm = DatabaseManager({})
+    mm.writer = MagicMock()
+    before = mm.data_version("XAU")
+    mm.batch_insert_data([{
+        "trade_date": "2026-05-13", "trade_time": "10:00:00", "data_type": "XAU",
+        "real_time_price": 1.0, "recycle_price": 1.0, "source": "gold_api",
+    }])
+    assert mm.data_version("XAU") != before
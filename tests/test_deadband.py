@@ -0,0 +1,99 @@
+"""入库死区过滤与读取侧前向填充。"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from db.forward_fill import forward_fill
+from ingest.deadband import Deadband, deadband_from_env
+from ingest.pipeline import IngestPipeline
+
+
+def _tick(t, price, data_type="XAU", trade_date="2026-10-16"):
+    return {"trade_date": trade_date, "trade_time": t, "data_type": data_type,
+            "real_time_price": price, "recycle_price": price, "high_price": 0, "low_price": 0,
+            "source": "gold_api", "currency": "USD"}
+
+
+def test_deadband_off_by_default(monkeypatch):
+    monkeypatch.delenv("INGEST_DEADBAND_HEARTBEAT", raising=False)
+    assert deadband_from_env() is None
+    monkeypatch.setenv("INGEST_DEADBAND_HEARTBEAT", "300")
+    assert deadband_from_env().heartbeat_seconds == 300
+
+
+def test_only_changes_and_heartbeats_pass():
+    db = Deadband(heartbeat_seconds=300)
+    rows = [_tick(f"10:{m:02d}:00", 2650.0) for m in range(10)] + [_tick("10:10:00", 2651.0)]
+    kept = db.filter(rows)
+    # 10:00 首点、10:05 心跳、10:10 价格变化
+    assert [r["trade_time"] for r in kept] == ["10:00:00", "10:05:00", "10:10:00"]
+    assert db.stats()["suppressed"] == 8
+
+
+def test_keys_are_independent_and_new_day_always_kept():
+    db = Deadband(heartbeat_seconds=3600)
+    kept = db.filter([
+        _tick("23:59:00", 1.0), _tick("23:59:00", 1.0, data_type="XAG"),
+        _tick("23:59:30", 1.0), _tick("00:00:10", 1.0, trade_date="2026-10-17"),
+    ])
+    assert [(r["data_type"], r["trade_time"]) for r in kept] == [
+        ("XAU", "23:59:00"), ("XAG", "23:59:00"), ("XAU", "00:00:10")]
+
+
+def test_relative_epsilon():
+    db = Deadband(epsilon=0.001, heartbeat_seconds=3600)
+    kept = db.filter([_tick("10:00:00", 1000.0), _tick("10:01:00", 1000.5), _tick("10:02:00", 1001.5)])
+    assert [r["recycle_price"] for r in kept] == [1000.0, 1001.5]
+
+
+def test_pipeline_applies_deadband_before_write():
+    sink = MagicMock()
+    pipe = IngestPipeline(sink, flush_interval_ms=10, deadband=Deadband(heartbeat_seconds=300))
+    pipe.start()
+    pipe.submit([_tick("10:00:00", 1.0), _tick("10:01:00", 1.0), _tick("10:02:00", 2.0)])
+    pipe.stop()
+    assert [r["trade_time"] for r in sink.call_args.args[0]] == ["10:00:00", "10:02:00"]
+    assert pipe.stats()["deadband"]["suppressed"] == 1
+
+
+def _row(at, price):
+    return {"time": timedelta(hours=at.hour, minutes=at.minute, seconds=at.second),
+            "recycle_price": price, "real_time_price": price, "created_at": at}
+
+
+def test_forward_fill_restores_minute_series():
+    base = datetime(2026, 10, 16, 10, 0)
+    rows = [_row(base - timedelta(minutes=3), 1.0), _row(base + timedelta(minutes=2, seconds=5), 2.0)]
+    out = forward_fill(rows, base, base + timedelta(minutes=4), max_gap=600)
+    assert [(r["created_at"].minute, r["recycle_price"]) for r in out] == [
+        (0, 1.0), (1, 1.0), (2, 2.0), (3, 2.0), (4, 2.0)]
+    assert out[1]["time"] == timedelta(hours=10, minutes=1)
+
+
+def test_forward_fill_stops_after_max_gap():
+    base = datetime(2026, 10, 16, 10, 0)
+    out = forward_fill([_row(base, 1.0)], base, base + timedelta(minutes=30), max_gap=360)
+    # 超过一个心跳周期仍无新点，视为采集中断，不再填充
+    assert len(out) == 7
+
+
+def test_last_hour_fills_database_rows_on_database_clock(monkeypatch):
+    monkeypatch.setenv("INGEST_DEADBAND_HEARTBEAT", "300")
+    with patch("db.ConnectionPool"):
+        from db import DatabaseManager
+
+        mm = DatabaseManager({})
+    window_start = datetime(2026, 10, 16, 2, 0)  # 数据库时钟（与应用时区无关）
+    mm.reader = MagicMock()
+    mm.reader.get_minute_bars_since.return_value = []  # minute_ohlc 未回填时回退原始 tick
+    mm.reader.get_price_history_last_hour.return_value = [
+        {"trade_date": window_start.date(), "trade_time": timedelta(hours=9, minutes=58), "data_type": "XAU",
+         "real_time_price": 1.0, "recycle_price": 1.0,
+         "created_at": window_start - timedelta(minutes=2), "window_start": window_start},
+    ]
+    rows = mm.get_price_history_last_hour("XAU")
+    assert mm.reader.get_price_history_last_hour.call_args.args[1] > 0
+    assert rows[0]["created_at"] == window_start
+    assert all("window_start" not in r for r in rows)
+    # 种子点之后填充至 max_gap（心跳 300s + 余量）
+    assert 3 <= len(rows) <= 6
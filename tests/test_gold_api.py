@@ -0,0 +1,46 @@
+"""GoldAPICollector：并发抓取、逐条写入、单轮截止时间。"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from collectors.gold_api import GoldAPICollector
+
+
+def test_symbols_fetched_concurrently_and_written_as_they_arrive(monkeypatch):
+    release = threading.Event()
+
+    def get_json(url, timeout=None):
+        symbol = url.rsplit("/", 1)[-1]
+        if symbol == "XAU":
+            return {"price": 2300.5}
+        if symbol == "XAG":
+            raise OSError("boom")
+        if symbol == "XPT":
+            release.wait(2)  # 超过本轮截止时间
+            return {"price": 950.0}
+        return {"price": 0}
+
+    monkeypatch.setattr("collectors.gold_api.http_client.get_json", get_json)
+    monkeypatch.setattr("collectors.gold_api.CYCLE_DEADLINE", 0.3)
+    mm = MagicMock()
+    collector = GoldAPICollector(mm)
+
+    started = time.monotonic()
+    assert collector.fetch() == []
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert elapsed < 1.0
+    written = [call.args[0] for call in mm.batch_insert_data.call_args_list]
+    assert written == [[{
+        "trade_date": written[0][0]["trade_date"],
+        "trade_time": written[0][0]["trade_time"],
+        "data_type": "XAU",
+        "real_time_price": 2300.5,
+        "recycle_price": 2300.5,
+        "high_price": 0,
+        "low_price": 0,
+        "source": "gold_api",
+        "currency": "USD",
+    }]]
@@ -0,0 +1,147 @@
+"""HttpClient：keep-alive 复用、DNS 缓存、TLS 会话恢复、每主机并发上限与分阶段耗时。"""
+
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from net.http_client import PHASES, HttpClient, HttpError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/redirect/"):
+            hops = int(self.path.rsplit("/", 1)[1])
+            self.send_response(302)
+            self.send_header("Location", f"/redirect/{hops - 1}" if hops > 1 else "/a")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = b'{"ok": true}' if self.path != "/missing" else b"{}"
+        self.send_response(200 if self.path != "/missing" else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(context=None):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    if context is not None:
+        srv.socket = context.wrap_socket(srv.socket, server_side=True)
+    threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True).start()
+    return srv
+
+
+@pytest.fixture
+def server():
+    srv = _serve()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_keep_alive_connection_reused(server):
+    client = HttpClient()
+    first = client.get(server + "/a")
+    second = client.get(server + "/b")
+    assert first.json() == {"ok": True}
+    assert not first.reused and second.reused
+    # 复用连接只有首字节与响应体阶段
+    assert {"dns_ms", "connect_ms", "first_byte_ms", "body_ms"} <= set(first.timings)
+    assert "connect_ms" not in second.timings
+    stats = client.stats()[server]
+    assert stats["requests"] == 2 and stats["reused"] == 1 and stats["connections"] == 1
+    assert set(stats["phases"]) == set(PHASES)
+    client.close()
+
+
+def test_get_json_raises_on_error_status(server):
+    client = HttpClient()
+    with pytest.raises(HttpError):
+        client.get_json(server + "/missing")
+    client.close()
+
+
+def test_follows_redirects_up_to_limit(server):
+    client = HttpClient(max_redirects=3)
+    resp = client.get(server + "/redirect/3")
+    assert resp.status == 200 and resp.json() == {"ok": True}
+    assert resp.url == server + "/a"
+    with pytest.raises(HttpError):
+        client.get(server + "/redirect/4")
+    client.close()
+
+
+def test_dns_resolved_once_per_ttl(server, monkeypatch):
+    import socket
+
+    calls = []
+    real = socket.getaddrinfo
+    monkeypatch.setattr(socket, "getaddrinfo", lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    client = HttpClient(max_idle_per_host=0)  # 每次请求都新建连接
+    for _ in range(3):
+        assert not client.get(server + "/").reused
+    assert len(calls) == 1
+    client.close()
+
+
+def test_per_host_concurrency_limit(server):
+    client = HttpClient(max_per_host=1)
+    errors = []
+
+    def call():
+        try:
+            client.get(server + "/slow", timeout=0.2)
+        except HttpError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    slow = threading.Thread(target=lambda: client.get(server + "/slow"))
+    slow.start()
+    time.sleep(0.1)
+    for t in threads:
+        t.start()
+    for t in threads + [slow]:
+        t.join()
+    assert len(errors) == 2
+    assert client.stats()[server]["errors"] == 2
+    client.close()
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="需要 openssl 生成自签名证书")
+def test_tls_session_resumed_on_new_connection(tmp_path):
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", str(key), "-out", str(cert), "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    server_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_ctx.load_cert_chain(cert, key)
+    srv = _serve(server_ctx)
+    try:
+        url = f"https://127.0.0.1:{srv.server_address[1]}/"
+        client = HttpClient(max_idle_per_host=0, ssl_context=ssl.create_default_context(cafile=str(cert)))
+        first = client.get(url)
+        second = client.get(url)
+        assert "tls_ms" in first.timings and "tls_ms" in second.timings
+        stats = client.stats()[f"https://127.0.0.1:{srv.server_address[1]}"]
+        assert stats["connections"] == 2 and stats["tls_resumed"] == 1
+        client.close()
+    finally:
+        srv.shutdown()
+        srv.server_close()
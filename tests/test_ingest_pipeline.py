@@ -0,0 +1,79 @@
+"""IngestPipeline：按行数 / 时间合并批量写入、批内去重、背压计数与停止时刷写。"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from collectors.base import BaseCollector
+from ingest.pipeline import IngestPipeline
+
+
+def _tick(i, data_type="XAU"):
+    return {"trade_date": "2026-10-18", "trade_time": f"10:00:{i:02d}", "data_type": data_type,
+            "real_time_price": 1.0, "recycle_price": 1.0, "source": "gold_api", "currency": "USD"}
+
+
+def test_batches_by_row_count_and_interval():
+    batches = []
+    pipe = IngestPipeline(batches.append, flush_rows=3, flush_interval_ms=50)
+    pipe.start()
+    pipe.submit([_tick(i) for i in range(4)])
+    time.sleep(0.2)
+    # 前 3 行达到 flush_rows 立即写；第 4 行等到 flush 间隔
+    assert [len(b) for b in batches] == [3, 1]
+    pipe.submit([_tick(10), _tick(11, "XAG")])
+    pipe.stop()
+    assert [len(b) for b in batches] == [3, 1, 2]
+    stats = pipe.stats()
+    assert stats["flushes"] == 3 and stats["flushed_rows"] == 6 and stats["depth"] == 0
+
+
+def test_duplicates_dropped_within_batch():
+    sink = MagicMock()
+    pipe = IngestPipeline(sink, flush_interval_ms=20)
+    pipe.start()
+    pipe.submit([_tick(1), _tick(1), _tick(2)])
+    pipe.stop()
+    sink.assert_called_once()
+    assert len(sink.call_args.args[0]) == 2
+    assert pipe.stats()["duplicates"] == 1
+
+
+def test_backpressure_blocks_then_drops():
+    release = threading.Event()
+    pipe = IngestPipeline(lambda rows: release.wait(2), max_queue=2, flush_rows=1, put_timeout=0.05)
+    pipe.start()
+    pipe.submit([_tick(0)])  # 写线程取走后阻塞在 sink
+    time.sleep(0.05)
+    accepted = pipe.submit([_tick(i) for i in range(1, 5)])
+    assert accepted == 2
+    stats = pipe.stats()
+    assert stats["blocked"] == 2 and stats["dropped"] == 2 and stats["max_depth"] == 2
+    release.set()
+    pipe.stop()
+    assert pipe.stats()["flushed_rows"] == 3
+
+
+def test_sink_errors_counted_and_writer_continues():
+    sink = MagicMock(side_effect=[Exception("db down"), None])
+    pipe = IngestPipeline(sink, flush_rows=1)
+    pipe.start()
+    pipe.submit([_tick(1), _tick(2)])
+    pipe.stop()
+    stats = pipe.stats()
+    assert stats["flush_errors"] == 1 and stats["flushed_rows"] == 1
+
+
+def test_collector_emit_goes_through_pipeline():
+    class Dummy(BaseCollector):
+        name = "dummy"
+
+        def fetch(self):
+            return [_tick(1)]
+
+    mm = MagicMock()
+    pipe = IngestPipeline(mm.batch_insert_data, flush_interval_ms=10)
+    pipe.start()
+    Dummy(mm, pipe).run_once()
+    pipe.stop()
+    mm.batch_insert_data.assert_called_once_with([_tick(1)])
@@ -0,0 +1,43 @@
+"""latest_price 点查与回退 price_data。"""
+
+from unittest.mock import MagicMock
+
+from db.price_reader import PriceReader
+
+
+def _reader(rows_by_table):
+    """按 SQL 中的表名返回预置结果的 PriceReader。"""
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    state = {}
+
+    def execute(sql, params=()):
+        state["table"] = "latest_price" if "FROM latest_price" in sql else "price_data"
+
+    cursor.execute.side_effect = execute
+    cursor.fetchall.side_effect = lambda: rows_by_table.get(state["table"], [])
+    cursor.fetchone.side_effect = lambda: (rows_by_table.get(state["table"]) or [None])[0]
+    return PriceReader(pool), cursor
+
+
+def test_latest_reads_latest_price_table():
+    row = {"data_type": "XAU", "recycle_price": 100.0}
+    reader, cursor = _reader({"latest_price": [row], "price_data": [{"data_type": "stale"}]})
+    assert reader.get_latest_data("XAU") == row
+    assert reader.get_latest_data_by_type() == [row]
+    assert cursor.execute.call_count == 2
+    assert all("FROM latest_price" in c.args[0] for c in cursor.execute.call_args_list)
+
+
+def test_latest_falls_back_to_price_data_when_table_empty():
+    row = {"data_type": "XAU", "recycle_price": 99.0}
+    reader, cursor = _reader({"price_data": [row]})
+    assert reader.get_latest_data("XAU") == row
+    assert reader.get_price_overview_data_fallback() == [row]
+    assert "FROM price_data" in cursor.execute.call_args_list[-1].args[0]
+
+
+def test_latest_market_price_prefers_table():
+    reader, cursor = _reader({"latest_price": [(101.5,)], "price_data": [(1.0,)]})
+    assert reader.get_latest_market_price("XAU") == 101.5
+    cursor.execute.assert_called_once()
@@ -48,3 +48,14 @@ def test_build_quality_metrics_payload():
     # missing rate = 1 - (50/60) = 0.1667
     assert abs(g["missing_rate"] - 0.1667) < 0.001
     assert abs(g["collector_success_rate"] - (50/60)) < 0.001
+
+
+def test_quality_metrics_tolerate_deadband_heartbeat():
+    now = datetime(2026, 5, 13, 10, 0, 0)
+    latest = [{"data_type": "XAU", "source": "gold_api", "latest_at": "2026-05-13 09:56:00"}]
+    counts = [{"data_type": "XAU", "source": "gold_api", "cnt_last_hour": 12}]
+    payload = build_quality_metrics_payload(latest, counts, now, heartbeat_seconds=300)
+    g = payload["groups"][0]
+    assert g["data_status"] == "normal"
+    assert g["expected_count_last_hour"] == 12
+    assert g["missing_rate"] == 0
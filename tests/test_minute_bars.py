@@ -0,0 +1,95 @@
+"""入库分钟 K 线构建、写入与按分钟读取。"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from db.forward_fill import last_per_minute
+from db.price_writer import PriceWriter
+from ingest.bars import MinuteBarBuilder
+from ingest.pipeline import IngestPipeline
+
+
+def _tick(t, price, data_type="XAU", source="gold_api", real=None):
+    return {"trade_date": "2026-10-16", "trade_time": t, "data_type": data_type, "source": source,
+            "currency": "USD", "recycle_price": price, "real_time_price": price if real is None else real}
+
+
+def test_bar_closes_when_next_minute_arrives():
+    b = MinuteBarBuilder()
+    assert b.update([_tick("10:00:05", 2.0), _tick("10:00:40", 3.0), _tick("10:00:20", 1.0)]) == []
+    closed = b.update([_tick("10:01:00", 4.0)])
+    assert len(closed) == 1
+    bar = closed[0]
+    assert (bar["minute_time"], bar["open_price"], bar["high_price"], bar["low_price"], bar["close_price"]) == (
+        "10:00:00", 2.0, 3.0, 1.0, 3.0)
+    assert (bar["first_time"], bar["last_time"]) == ("10:00:05", "10:00:40")
+    assert b.stats() == {"open_bars": 1, "closed": 1}
+
+
+def test_idle_key_is_closed_after_grace_and_late_tick_reopens():
+    b = MinuteBarBuilder(grace_seconds=60)
+    b.update([_tick("10:00:00", 1.0, data_type="XAG"), _tick("10:00:00", 5.0)])
+    # XAG 停止上报；XAU 推进到 10:02 后 XAG 的 10:00 分钟关闭
+    closed = b.update([_tick("10:02:00", 6.0)])
+    assert sorted((c["data_type"], c["minute_time"]) for c in closed) == [("XAG", "10:00:00"), ("XAU", "10:00:00")]
+    late = b.update([_tick("10:00:30", 7.0)])
+    assert [(c["minute_time"], c["close_price"]) for c in late] == [("10:00:00", 7.0)]
+    assert [c["minute_time"] for c in b.flush_all()] == ["10:02:00"]
+
+
+def test_pipeline_writes_bars_before_deadband_and_on_stop():
+    from ingest.deadband import Deadband
+
+    sink, bar_sink = MagicMock(), MagicMock()
+    pipe = IngestPipeline(sink, flush_interval_ms=10, deadband=Deadband(heartbeat_seconds=300),
+                          bars=MinuteBarBuilder(), bar_sink=bar_sink)
+    pipe.start()
+    pipe.submit([_tick("10:00:00", 1.0), _tick("10:00:30", 1.0, real=9.0), _tick("10:01:00", 1.0)])
+    pipe.stop()
+    bars = [b for call in bar_sink.call_args_list for b in call.args[0]]
+    assert [b["minute_time"] for b in bars] == ["10:00:00", "10:01:00"]
+    # 被死区抑制的 10:00:30 仍计入分钟 K 线
+    assert bars[0]["real_time_price"] == 9.0
+    assert pipe.stats()["bars_written"] == 2
+
+
+def test_pipeline_keeps_bars_when_write_fails():
+    bar_sink = MagicMock(side_effect=RuntimeError("db down"))
+    pipe = IngestPipeline(MagicMock(), bars=MinuteBarBuilder(), bar_sink=bar_sink, retry_interval=0)
+    pipe._flush([_tick("10:00:00", 1.0), _tick("10:01:00", 2.0)])
+    assert pipe.stats()["pending_bars"] == 1 and pipe.stats()["bar_errors"] == 1
+    bar_sink.side_effect = None
+    pipe._flush([])
+    assert pipe.stats()["pending_bars"] == 0 and pipe.stats()["bars_written"] == 1
+
+
+def test_upsert_minute_bars_single_statement():
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    bars = MinuteBarBuilder().update([_tick("10:00:00", 1.0), _tick("10:01:00", 2.0)])
+    PriceWriter(pool).upsert_minute_bars(bars)
+    sql, params = cursor.execute.call_args[0]
+    assert "INSERT INTO minute_ohlc" in sql and "ON DUPLICATE KEY UPDATE" in sql
+    assert params[:5] == ["2026-10-16", "10:00:00", "XAU", "gold_api", "USD"]
+
+
+def test_last_per_minute_keeps_minute_close():
+    base = datetime(2026, 10, 16, 10, 0)
+    rows = [{"created_at": base + timedelta(seconds=s), "trade_time": timedelta(hours=10), "recycle_price": p}
+            for s, p in ((5, 1.0), (50, 2.0), (65, 3.0))]
+    out = last_per_minute(rows)
+    assert [(r["created_at"], r["recycle_price"]) for r in out] == [
+        (base, 2.0), (base + timedelta(minutes=1), 3.0)]
+
+
+def test_last_hour_reads_minute_bars_when_cold(monkeypatch):
+    monkeypatch.setenv("INGEST_DEADBAND_HEARTBEAT", "0")
+    with patch("db.ConnectionPool"):
+        from db import DatabaseManager
+
+        mm = DatabaseManager({})
+    mm.reader = MagicMock()
+    recent = datetime.now() + timedelta(hours=12)  # 晚于任何时区下的窗口起点
+    mm.reader.get_minute_bars_since.return_value = [{"created_at": recent, "recycle_price": 1.0}]
+    assert mm.get_price_history_last_hour("XAU") == [{"created_at": recent, "recycle_price": 1.0}]
+    mm.reader.get_price_history_last_hour.assert_not_called()
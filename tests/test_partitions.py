@@ -0,0 +1,86 @@
+"""price_data 月分区管理（db.partitions）测试。"""
+
+from datetime import date
+from unittest.mock import MagicMock
+
+from db.partitions import PartitionManager, add_months, monthly_bounds, partition_definitions
+
+
+def _manager(partitions, min_date=None):
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    state = {}
+
+    def execute(sql, params=()):
+        state["sql"] = sql
+
+    def fetchall():
+        return list(partitions) if "information_schema.PARTITIONS" in state["sql"] else []
+
+    cursor.execute.side_effect = execute
+    cursor.fetchall.side_effect = fetchall
+    cursor.fetchone.side_effect = lambda: (min_date,)
+    return PartitionManager(pool), cursor
+
+
+def _ddl(cursor):
+    return [c.args[0] for c in cursor.execute.call_args_list if c.args[0].startswith(("ALTER", "CREATE"))]
+
+
+def test_month_helpers():
+    assert add_months(date(2026, 11, 15), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert monthly_bounds(date(2026, 11, 20), date(2027, 1, 1)) == [
+        ("p202611", date(2026, 12, 1)), ("p202612", date(2027, 1, 1)), ("p202701", date(2027, 2, 1))]
+    assert partition_definitions([("p202611", date(2026, 12, 1))]) == (
+        "PARTITION p202611 VALUES LESS THAN ('2026-12-01'),\n  PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+
+
+def test_partition_table_covers_history_and_future():
+    pm, cursor = _manager([], min_date=date(2026, 8, 3))
+    assert pm.partition_table(date(2026, 10, 18), months_ahead=1) == 4
+    ddl = _ddl(cursor)[0]
+    assert ddl.startswith("ALTER TABLE price_data PARTITION BY RANGE COLUMNS(trade_date)")
+    assert "PARTITION p202608 VALUES LESS THAN ('2026-09-01')" in ddl
+    assert "PARTITION p202611 VALUES LESS THAN ('2026-12-01')" in ddl
+    assert ddl.rstrip(")\n").endswith("PARTITION pmax VALUES LESS THAN (MAXVALUE")
+
+
+def test_partition_table_skips_when_already_partitioned():
+    pm, cursor = _manager([{"name": "pmax", "upper": "MAXVALUE"}])
+    assert pm.partition_table(date(2026, 10, 18)) == 0
+    assert _ddl(cursor) == []
+
+
+def test_ensure_future_splits_only_missing_months():
+    existing = [{"name": "p202610", "upper": "'2026-11-01'"}, {"name": "pmax", "upper": "MAXVALUE"}]
+    pm, cursor = _manager(existing)
+    assert pm.ensure_future(date(2026, 10, 18), months_ahead=2) == ["p202611", "p202612"]
+    ddl = _ddl(cursor)[0]
+    assert ddl.startswith("ALTER TABLE price_data REORGANIZE PARTITION pmax INTO")
+    assert "p202610" not in ddl
+
+
+def test_ensure_future_noop_when_unpartitioned():
+    pm, cursor = _manager([])
+    assert pm.ensure_future(date(2026, 10, 18)) == []
+    assert _ddl(cursor) == []
+
+
+def test_drop_before_drops_whole_months_only():
+    existing = [{"name": "p202608", "upper": "'2026-09-01'"}, {"name": "p202609", "upper": "'2026-10-01'"},
+                {"name": "p202610", "upper": "'2026-11-01'"}, {"name": "pmax", "upper": "MAXVALUE"}]
+    pm, cursor = _manager(existing)
+    assert pm.drop_before(date(2026, 9, 15)) == ["p202608"]
+    assert _ddl(cursor) == ["ALTER TABLE price_data DROP PARTITION p202608"]
+
+
+def test_drop_before_archives_via_exchange():
+    pm, cursor = _manager([{"name": "p202608", "upper": "'2026-09-01'"}, {"name": "pmax", "upper": "MAXVALUE"}])
+    assert pm.drop_before(date(2026, 10, 1), archive=True) == ["p202608"]
+    assert _ddl(cursor) == [
+        "CREATE TABLE price_data_archive_p202608 LIKE price_data",
+        "ALTER TABLE price_data_archive_p202608 REMOVE PARTITIONING",
+        "ALTER TABLE price_data EXCHANGE PARTITION p202608 WITH TABLE price_data_archive_p202608",
+        "ALTER TABLE price_data DROP PARTITION p202608",
+    ]
@@ -0,0 +1,90 @@
+"""Playwright 子进程采集器：JSON 行 IPC、入库转发与退出后重启。"""
+
+import io
+import json
+import subprocess
+import sys
+import time
+from unittest.mock import MagicMock
+
+from collectors import playwright_process
+from collectors import stats as collector_stats
+
+_ROW = {"trade_date": "2026-10-16", "trade_time": "10:00:00", "data_type": "黄金",
+        "real_time_price": 620.3, "recycle_price": 612.5, "high_price": 625.0, "low_price": 0,
+        "source": "playwright", "currency": "CNY"}
+
+
+class _FakeWorker(playwright_process.PlaywrightProcessCollector):
+    """子进程替身：输出一批 tick、一条浏览器指标和一行非协议输出后退出"""
+
+    def _spawn(self):
+        script = (
+            "import json, sys\n"
+            f"print(json.dumps({{'type': 'ticks', 'rows': [{_ROW!r}]}}))\n"
+            "print('driver noise')\n"
+            "print(json.dumps({'type': 'browser', 'metrics': {'rss_mb': 123.0}}))\n"
+        )
+        return subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True)
+
+
+class _HungWorker(playwright_process.PlaywrightProcessCollector):
+    """子进程替身：发出一条消息后一直存活但不再输出（模拟浏览器卡死）"""
+
+    def _spawn(self):
+        script = (
+            "import json, sys, time\n"
+            "print(json.dumps({'type': 'browser', 'metrics': {}}), flush=True)\n"
+            "time.sleep(60)\n"
+        )
+        return subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True)
+
+
+def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not cond():
+        time.sleep(0.02)
+    return cond()
+
+
+def test_ticks_reach_ingest_and_worker_is_restarted(monkeypatch):
+    monkeypatch.setattr(playwright_process, "RESTART_DELAY", 0.05)
+    collector_stats.reset_for_tests()
+    ingest = MagicMock()
+    c = _FakeWorker(MagicMock(), ingest)
+    c.start()
+    try:
+        assert _wait(lambda: c.restarts >= 2)
+    finally:
+        c.stop()
+    assert ingest.submit.call_args_list[0].args[0] == [_ROW]
+    row = collector_stats.snapshot()[0]
+    assert row["browser"]["rss_mb"] == 123.0
+    assert row["failure_count"] >= 2
+    collector_stats.reset_for_tests()
+
+
+def test_pipe_sink_writes_json_lines():
+    out = io.StringIO()
+    sink = playwright_process._PipeSink(out)
+    assert sink.submit([_ROW]) == 1
+    sink.send({"type": "browser", "metrics": {"reloads": 1}})
+    lines = out.getvalue().splitlines()
+    assert playwright_process.decode_message(lines[0]) == {"type": "ticks", "rows": [_ROW]}
+    assert json.loads(lines[1])["metrics"] == {"reloads": 1}
+    assert playwright_process.decode_message("not json") is None
+
+
+def test_silent_worker_is_killed_and_restarted(monkeypatch):
+    monkeypatch.setattr(playwright_process, "RESTART_DELAY", 0.05)
+    monkeypatch.setenv("PLAYWRIGHT_HANG_SECONDS", "0.3")
+    collector_stats.reset_for_tests()
+    c = _HungWorker(MagicMock(), MagicMock())
+    c.start()
+    try:
+        assert _wait(lambda: c.restarts >= 1 and c.hangs >= 1)
+    finally:
+        c.stop()
+    collector_stats.reset_for_tests()
@@ -1,4 +1,5 @@
 from unittest.mock import MagicMock
+import pytest
 from db.price_writer import PriceWriter
 
 
@@ -33,3 +34,64 @@ def test_batch_insert_empty_data():
     writer = PriceWriter(mock_pool)
     writer.batch_insert_data([])
     mock_pool.get_connection.assert_not_called()
+
+
+def test_batch_insert_updates_daily_rollup_in_same_transaction():
+    mock_pool = MagicMock()
+    writer = PriceWriter(mock_pool)
+    mock_cursor = MagicMock()
+    mock_pool.get_connection.return_value.cursor.return_value = mock_cursor
+
+    row = {"trade_date": "2026-05-13", "data_type": "XAU", "real_time_price": 0}
+    writer.batch_insert_data([
+        {**row, "trade_time": "10:01:00", "recycle_price": 101.0},
+        {**row, "trade_time": "10:00:00", "recycle_price": 100.0},
+        {**row, "trade_time": "10:02:00", "recycle_price": 99.0},
+    ])
+
+    assert mock_cursor.execute.call_count == 2  # rollup + latest_price
+    sql, params = mock_cursor.execute.call_args_list[0][0]
+    assert "INSERT INTO price_daily_rollup" in sql
+    assert params == ["2026-05-13", "XAU", 100.0, 101.0, 99.0, 99.0, "10:00:00", "10:02:00"]
+    mock_pool.get_connection.return_value.commit.assert_called_once()
+
+
+def test_aggregate_daily_rollup_skips_zero_prices():
+    from db.price_writer import aggregate_daily_rollup
+
+    rows = aggregate_daily_rollup([
+        {"trade_date": "2026-05-13", "trade_time": "10:00:00", "data_type": "XAU", "recycle_price": 0},
+    ])
+    assert rows == []
+
+
+def test_batch_insert_reports_failure():
+    mock_pool = MagicMock()
+    writer = PriceWriter(mock_pool)
+    mock_pool.get_connection.return_value.cursor.return_value.executemany.side_effect = RuntimeError("down")
+    with pytest.raises(RuntimeError):
+        writer.batch_insert_data([{
+            "trade_date": "2026-05-13", "trade_time": "10:00:00", "data_type": "XAU",
+            "real_time_price": 100.0, "recycle_price": 99.0,
+        }])
+
+
+def test_batch_insert_upserts_latest_price_in_same_transaction():
+    mock_pool = MagicMock()
+    writer = PriceWriter(mock_pool)
+    mock_cursor = MagicMock()
+    mock_pool.get_connection.return_value.cursor.return_value = mock_cursor
+
+    row = {"trade_date": "2026-05-13", "data_type": "XAU", "source": "gold_api", "currency": "USD"}
+    writer.batch_insert_data([
+        {**row, "trade_time": "10:02:00", "recycle_price": 102.0, "real_time_price": 102.5},
+        {**row, "trade_time": "10:01:00", "recycle_price": 101.0, "real_time_price": 101.5},
+        {**row, "trade_time": "10:03:00", "recycle_price": 0, "real_time_price": 0},
+    ])
+
+    sql, params = mock_cursor.execute.call_args_list[1][0]
+    assert "INSERT INTO latest_price" in sql and "ON DUPLICATE KEY UPDATE" in sql
+    # 批内取最晚的有效点；recycle_price 为 0 的点不更新最新价
+    assert params == ["XAU", "gold_api", "USD", "2026-05-13", "10:02:00", "2026-05-13 10:02:00",
+                      102.5, 102.0, 0, 0]
+    mock_pool.get_connection.return_value.commit.assert_called_once()
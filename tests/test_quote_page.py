@@ -0,0 +1,45 @@
+"""行情页快照解析（PlaywrightCollector 页内推送）。"""
+
+from datetime import datetime
+
+from collectors import quote_page
+
+
+def test_rows_from_snapshot_maps_columns():
+    items = [
+        {"name": "黄金", "prices": ["¥ 612.50", "620.3", "625"]},
+        {"name": "", "prices": ["--"]},
+    ]
+    rows = quote_page.rows_from_snapshot(items, datetime(2026, 10, 16, 10, 0, 5))
+    assert rows[0] == {
+        "trade_date": "2026-10-16", "trade_time": "10:00:05", "data_type": "黄金",
+        "real_time_price": 620.3, "recycle_price": 612.5, "high_price": 625.0, "low_price": 0,
+        "source": "playwright", "currency": "CNY",
+    }
+    # 缺列 / 无法解析的价格按 0 处理，与逐单元格抓取时一致
+    assert rows[1]["data_type"] == "未知商品"
+    assert (rows[1]["recycle_price"], rows[1]["real_time_price"], rows[1]["high_price"]) == (0.0, 0.0, 0.0)
+
+
+def test_changed_items_keeps_only_moved_products():
+    last = {}
+    first = [{"name": "黄金", "prices": ["612", "620", "625"]}, {"name": "白银", "prices": ["7", "8", "9"]}]
+    assert quote_page.changed_items(first, last) == first
+    # 页面上任一单元格变化都会推送整表，只有价格变了的品种入库
+    second = [{"name": "黄金", "prices": ["612", "620", "625"]}, {"name": "白银", "prices": ["7", "8.1", "9"]}]
+    assert quote_page.changed_items(second, last) == [second[1]]
+    assert quote_page.changed_items(second, last) == []
+
+
+def test_observer_script_pushes_through_binding():
+    assert f"window.{quote_page.PUSH_BINDING}(items)" in quote_page.INSTALL_OBSERVER_JS
+    assert quote_page.ROW_SELECTOR in quote_page.INSTALL_OBSERVER_JS
+
+
+def test_should_block_heavy_types_and_trackers():
+    types = quote_page.blocked_types("image, font,media")
+    assert types == {"image", "font", "media"}
+    assert quote_page.should_block("image", "https://i.jzj9999.com/logo.png", types)
+    assert quote_page.should_block("script", "https://hm.baidu.com/hm.js?x", types)
+    assert not quote_page.should_block("script", "https://i.jzj9999.com/app.js", types)
+    assert not quote_page.should_block("xhr", "https://i.jzj9999.com/quote", quote_page.blocked_types(""))
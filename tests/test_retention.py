@@ -0,0 +1,204 @@
+"""分层保留（db.retention）：选层、后台压缩与读取路径。"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db import BEIJING_TZ
+from db.partitions import month_start
+from db.price_writer import PriceWriter
+from db.retention import Compactor, RetentionPolicy
+
+TODAY = date(2026, 10, 18)
+
+
+def test_policy_tiers():
+    policy = RetentionPolicy(raw_days=30, minute_months=6)
+    assert policy.raw_cutoff(TODAY) == date(2026, 9, 19)
+    assert policy.minute_cutoff(TODAY) == date(2026, 4, 1)
+    assert policy.tier(date(2026, 9, 19), TODAY) == "raw"
+    assert policy.tier(date(2026, 9, 18), TODAY) == "minute"
+    assert policy.tier(date(2026, 3, 31), TODAY) == "daily"
+    assert RetentionPolicy().tier(date(2000, 1, 1), TODAY) == "raw"
+
+
+def test_policy_minute_tier_never_shorter_than_raw():
+    assert RetentionPolicy(raw_days=90, minute_months=1).minute_months == 4
+
+
+def test_split_range_newest_first():
+    policy = RetentionPolicy(raw_days=30, minute_months=6)
+    assert policy.split_range(date(2026, 1, 1), TODAY, TODAY) == [
+        ("raw", date(2026, 9, 19), TODAY),
+        ("minute", date(2026, 4, 1), date(2026, 9, 18)),
+        ("daily", date(2026, 1, 1), date(2026, 3, 31)),
+    ]
+    assert policy.split_range(date(2026, 5, 1), date(2026, 5, 31), TODAY) == [
+        ("minute", date(2026, 5, 1), date(2026, 5, 31))]
+    assert RetentionPolicy().split_range(date(2020, 1, 1), TODAY, TODAY) == [("raw", date(2020, 1, 1), TODAY)]
+
+
+def _compactor(days, partitioned=False, deleted=(0,), max_days=31):
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    cursor.fetchall.return_value = [{"trade_date": d} for d in days]
+    counts = iter(deleted)
+    type(cursor).rowcount = property(lambda self: next(counts, 0))
+    writer, partitions = MagicMock(), MagicMock()
+    partitions.is_partitioned.return_value = partitioned
+    partitions.drop_before.return_value = ["p202608"]
+    return Compactor(pool, writer, partitions, batch_rows=2, pause_seconds=0, max_days=max_days), cursor
+
+
+def _deletes(cursor):
+    return [c.args for c in cursor.execute.call_args_list if c.args[0].startswith("DELETE")]
+
+
+def test_compactor_merges_then_deletes_in_batches():
+    compactor, cursor = _compactor([date(2026, 9, 17)], deleted=(2, 2, 1))
+    stats = compactor.run(RetentionPolicy(raw_days=30), TODAY)
+    compactor.writer.merge_day_from_raw.assert_called_once_with("2026-09-17")
+    assert _deletes(cursor) == [("DELETE FROM price_data WHERE trade_date = %s LIMIT %s", (date(2026, 9, 17), 2))] * 3
+    assert stats == {"days_compacted": 1, "partitions_dropped": 0, "raw_deleted": 5, "minute_deleted": 0}
+    compactor.partitions.drop_before.assert_not_called()
+
+
+def test_compactor_drops_whole_month_partitions():
+    days = [date(2026, 8, 30), date(2026, 8, 31), date(2026, 9, 1)]
+    compactor, cursor = _compactor(days, partitioned=True, deleted=(1,))
+    stats = compactor.run(RetentionPolicy(raw_days=30), TODAY)
+    assert compactor.writer.merge_day_from_raw.call_count == 3
+    # 8 月整月在截止日所在月之前：整分区删除；9 月逐日 DELETE
+    assert [a[1][0] for a in _deletes(cursor)] == [date(2026, 9, 1)]
+    compactor.partitions.drop_before.assert_called_once_with(date(2026, 9, 1))
+    assert stats["partitions_dropped"] == 1
+
+
+def test_compactor_partial_run_only_drops_finished_months():
+    days = [date(2026, 7, 30), date(2026, 7, 31)]
+    compactor, cursor = _compactor(days, partitioned=True, max_days=2)
+    compactor.run(RetentionPolicy(raw_days=30), TODAY)
+    compactor.partitions.drop_before.assert_called_once_with(date(2026, 8, 1))
+    assert _deletes(cursor) == []
+
+
+def test_compactor_partial_month_deletes_by_day():
+    days = [date(2026, 7, 1), date(2026, 7, 2)]
+    compactor, cursor = _compactor(days, partitioned=True, max_days=2)
+    compactor.run(RetentionPolicy(raw_days=30), TODAY)
+    assert [a[1][0] for a in _deletes(cursor)] == days
+    compactor.partitions.drop_before.assert_not_called()
+
+
+def test_compactor_small_budget_finishes_partitioned_table():
+    # 有状态的分区表替身：每轮至多处理 5 天，反复执行（同 compact-history --until-done）直到清空
+    stored = {date(2026, 7, 20) + timedelta(days=i) for i in range(75)}
+    cutoff = RetentionPolicy(raw_days=30).raw_cutoff(TODAY)
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    last = {}
+
+    def execute(sql, params=()):
+        last["sql"], last["params"] = sql, params
+        if sql.startswith("DELETE FROM price_data"):
+            stored.discard(params[0])
+
+    def drop_before(bound):
+        dropped = {d for d in stored if d < month_start(bound)}
+        stored.difference_update(dropped)
+        return sorted({f"p{d:%Y%m}" for d in dropped})
+
+    cursor.execute.side_effect = execute
+    cursor.fetchall.side_effect = lambda: [
+        {"trade_date": d} for d in sorted(d for d in stored if d < last["params"][0])][:last["params"][1]]
+    type(cursor).rowcount = property(lambda self: 1)
+    partitions = MagicMock()
+    partitions.is_partitioned.return_value = True
+    partitions.drop_before.side_effect = drop_before
+    compactor = Compactor(pool, MagicMock(), partitions, batch_rows=2, pause_seconds=0, max_days=5)
+
+    for _ in range(100):
+        before = len(stored)
+        stats = compactor.run(RetentionPolicy(raw_days=30), TODAY)
+        assert len(stored) == before - stats["days_compacted"]
+        if stats["days_compacted"] < compactor.max_days:
+            break
+    else:
+        raise AssertionError("压缩未收敛")
+    assert min(stored) == cutoff
+    assert compactor.writer.merge_day_from_raw.call_count == (cutoff - date(2026, 7, 20)).days
+
+
+def test_compactor_expires_minute_bars():
+    compactor, cursor = _compactor([], deleted=(1,))
+    stats = compactor.run(RetentionPolicy(raw_days=30, minute_months=6), TODAY)
+    assert _deletes(cursor) == [("DELETE FROM minute_ohlc WHERE trade_date < %s LIMIT %s", (date(2026, 4, 1), 2))]
+    assert stats["minute_deleted"] == 1
+
+
+def test_merge_day_from_raw_upserts_without_delete():
+    pool = MagicMock()
+    cursor = pool.get_connection.return_value.cursor.return_value
+    minute = ("2026-09-17", "10:00:00", "XAU", "gold_api", "USD", 1, 2, 0.5, 1.5, 0, "10:00:01", "10:00:59")
+    rollup = ("2026-09-17", "XAU", 1, 2, 0.5, 1.5, "10:00:01", "10:00:59")
+    cursor.fetchall.side_effect = [[minute, minute], [rollup]]
+    assert PriceWriter(pool).merge_day_from_raw("2026-09-17") == 3
+    sqls = [c.args[0] for c in cursor.execute.call_args_list]
+    assert not any(s.lstrip().startswith("DELETE") for s in sqls)
+    assert sqls[1].startswith("INSERT INTO minute_ohlc") and "ON DUPLICATE KEY UPDATE" in sqls[1]
+    assert sqls[3].startswith("INSERT INTO price_daily_rollup") and "ON DUPLICATE KEY UPDATE" in sqls[3]
+    assert len(cursor.execute.call_args_list[1].args[1]) == 24
+
+
+def _manager(monkeypatch):
+    monkeypatch.setenv("RETENTION_RAW_DAYS", "30")
+    monkeypatch.setenv("RETENTION_MINUTE_MONTHS", "6")
+    with patch("db.ConnectionPool"):
+        from db import DatabaseManager
+
+        mm = DatabaseManager({})
+    mm.reader = MagicMock()
+    return mm
+
+
+def test_query_data_stitches_tiers(monkeypatch):
+    mm = _manager(monkeypatch)
+    mm.reader.query_data.return_value = [{"tier": "raw"}]
+    mm.reader.query_minute_bars.return_value = [{"tier": "minute"}] * 2
+    with patch("db.datetime") as dt:
+        dt.now.return_value.date.return_value = TODAY
+        dt.strptime.side_effect = datetime.strptime
+        rows = mm.query_data("2026-01-01", "2026-10-18", "XAU", limit=3)
+    assert [r["tier"] for r in rows] == ["raw", "minute", "minute"]
+    mm.reader.query_data.assert_called_once_with("2026-09-19", "2026-10-18", "XAU", 3)
+    mm.reader.query_minute_bars.assert_called_once_with("2026-04-01", "2026-09-18", "XAU", 2)
+    mm.reader.query_daily_rollup.assert_not_called()
+
+
+def test_daily_history_reads_minute_tier_for_compacted_days(monkeypatch):
+    mm = _manager(monkeypatch)
+    day = (datetime.now(BEIJING_TZ).date() - timedelta(days=60)).strftime("%Y-%m-%d")
+    mm.reader.query_minute_bars.return_value = [{"trade_time": "10:01:00"}, {"trade_time": "10:00:00"}]
+    assert [r["trade_time"] for r in mm.get_daily_history(day, "XAU")] == ["10:00:00", "10:01:00"]
+    mm.reader.get_daily_history.assert_not_called()
+
+    mm.reader.query_minute_bars.return_value = []
+    mm.reader.get_daily_history.return_value = [{"raw": True}]
+    assert mm.get_daily_history(day, "XAU") == [{"raw": True}]
+
+
+def test_rebuild_refuses_compacted_dates(monkeypatch):
+    mm = _manager(monkeypatch)
+    mm.writer = MagicMock()
+    today = datetime.now(BEIJING_TZ).date()
+    old = (today - timedelta(days=60)).strftime("%Y-%m-%d")
+    for rebuild in (mm.rebuild_daily_rollup, mm.rebuild_minute_bars):
+        with pytest.raises(ValueError):
+            rebuild(old)
+    mm.writer.rebuild_daily_rollup.assert_not_called()
+    mm.writer.rebuild_minute_bars.assert_not_called()
+
+    mm.rebuild_minute_bars(today.strftime("%Y-%m-%d"))
+    mm.writer.rebuild_minute_bars.assert_called_once()
+    assert mm.raw_cutoff() == today - timedelta(days=29)
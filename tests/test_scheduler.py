@@ -0,0 +1,66 @@
+"""Scheduler：截止时间堆调度、退避重排期、超时计数与立即停止。"""
+
+import threading
+import time
+
+from collectors import stats as collector_stats
+from collectors.scheduler import Scheduler
+
+
+def test_runs_on_interval_without_drift():
+    runs = []
+    sched = Scheduler(max_workers=2, jitter=0)
+    sched.add("fast", 0.05, lambda: runs.append(time.monotonic()))
+    sched.start()
+    time.sleep(0.33)
+    sched.stop()
+    # 0, 0.05, ..., 0.30 → 7 次，计划时刻不随执行耗时漂移
+    assert 6 <= len(runs) <= 7
+    assert sched.stats()["fast"]["overruns"] == 0
+
+
+def test_backoff_reschedules_from_completion():
+    runs = []
+
+    def fn():
+        runs.append(time.monotonic())
+        return 0.2  # 退避 0.2s
+
+    sched = Scheduler(jitter=0)
+    sched.add("failing", 0.01, fn)
+    sched.start()
+    time.sleep(0.3)
+    sched.stop()
+    assert len(runs) == 2
+    assert runs[1] - runs[0] >= 0.2
+
+
+def test_overruns_counted_and_missed_slots_skipped():
+    collector_stats.reset_for_tests()
+    runs = []
+
+    def slow():
+        runs.append(time.monotonic())
+        time.sleep(0.12)
+
+    sched = Scheduler(jitter=0)
+    sched.add("slow", 0.05, slow)
+    sched.start()
+    time.sleep(0.3)
+    sched.stop()
+    stats = sched.stats()["slow"]
+    assert stats["overruns"] >= 2
+    # 跳过错过的时刻，不会连续补跑
+    assert len(runs) <= 3
+    assert collector_stats.snapshot()[0]["overruns"] == stats["overruns"]
+
+
+def test_stop_is_immediate_and_cancels_pending():
+    ran = threading.Event()
+    sched = Scheduler()
+    sched.add("hourly", 3600, ran.set, delay=3600)
+    sched.start()
+    started = time.monotonic()
+    sched.stop()
+    assert time.monotonic() - started < 0.5
+    assert not ran.is_set()
@@ -0,0 +1,145 @@
+"""SingleFlight 与 cached_response：并发未命中只加载一次。"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from cache.single_flight import SingleFlight
+from route import create_app
+from routes.api.cache import api_single_flight, api_ttl_cache, cached_response
+
+
+def _run_concurrently(n, target):
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_execution():
+    sf = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return {"v": 1}
+
+    threads, results, _ = _run_concurrently(8, lambda: sf.do("k", load))
+    deadline = time.monotonic() + 5
+    while sf.stats()["shared"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert all(r == {"v": 1} for r in results)
+    assert sf.stats() == {"executed": 1, "shared": 7, "background": 0, "in_flight": 0}
+
+
+def test_error_propagates_to_waiters_and_is_not_cached():
+    sf = SingleFlight()
+    release = threading.Event()
+
+    def load():
+        release.wait(5)
+        raise RuntimeError("db down")
+
+    threads, _, errors = _run_concurrently(3, lambda: sf.do("k", load))
+    deadline = time.monotonic() + 5
+    while sf.stats()["shared"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert sf.do("k", lambda: "ok") == "ok"
+
+
+def test_cached_response_fills_cache_once():
+    api_ttl_cache.clear()
+    try:
+        loader_calls = []
+
+        def load():
+            loader_calls.append(1)
+            return {"data": [1]}
+
+        assert cached_response("sf_test", 60, load) == {"data": [1]}
+        assert cached_response("sf_test", 60, load) == {"data": [1]}
+        assert len(loader_calls) == 1
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            cached_response("sf_err", 60, fail)
+        assert api_ttl_cache.get("sf_err") is None
+        assert api_single_flight.stats()["in_flight"] == 0
+    finally:
+        api_ttl_cache.clear()
+
+
+def test_stale_entry_served_while_one_background_refresh_runs():
+    api_ttl_cache.clear()
+    try:
+        # ttl=0：写入即软过期，但在 stale_ttl 内仍可读
+        cached_response("swr_test", 0, lambda: "old", stale_ttl=60)
+        release = threading.Event()
+        refreshes = []
+
+        def refresh():
+            refreshes.append(1)
+            release.wait(5)
+            return "new"
+
+        assert cached_response("swr_test", 0, refresh, stale_ttl=60) == "old"
+        assert cached_response("swr_test", 0, refresh, stale_ttl=60) == "old"
+        release.set()
+        deadline = time.monotonic() + 5
+        while api_single_flight.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(refreshes) == 1
+        assert api_ttl_cache.get_stale("swr_test") == ("new", False)
+    finally:
+        api_ttl_cache.clear()
+
+
+def test_version_change_serves_old_body_and_refreshes_in_background():
+    api_ttl_cache.clear()
+    try:
+        mm = MagicMock()
+        mm.data_version.return_value = "v1"
+        mm.get_ohlc_trend.return_value = [{"date": "2026-10-17", "open_price": 1, "high_price": 1,
+                                           "low_price": 1, "close_price": 1}]
+        client = create_app(mm).test_client()
+        first = client.get("/api/price-trend?data_type=XAU&range=1y")
+        # 入库换了数据版本：缓存键不变，直接返回旧响应体，由一次后台刷新更新
+        mm.data_version.return_value = "v2"
+        mm.get_ohlc_trend.return_value = []
+        second = client.get("/api/price-trend?data_type=XAU&range=1y")
+        assert second.data == first.data
+        deadline = time.monotonic() + 5
+        while mm.get_ohlc_trend.call_count < 2 or api_single_flight.stats()["in_flight"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        third = client.get("/api/price-trend?data_type=XAU&range=1y")
+        assert third.data != first.data
+        assert mm.get_ohlc_trend.call_count == 2
+    finally:
+        api_ttl_cache.clear()
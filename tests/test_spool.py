@@ -0,0 +1,151 @@
+"""Spool：分段追加、游标确认、容量上限、重启恢复，以及数据库故障期间经 spool 不丢数据。"""
+
+import json
+import os
+import time
+from unittest.mock import MagicMock
+
+from ingest.pipeline import IngestPipeline
+from ingest.spool import Spool
+
+
+def _tick(i):
+    return {"trade_date": "2026-10-18", "trade_time": f"10:{i // 60:02d}:{i % 60:02d}", "data_type": "XAU",
+            "real_time_price": 1.0 + i, "recycle_price": 1.0 + i, "source": "gold_api", "currency": "USD"}
+
+
+def _segments(path):
+    return sorted(n for n in os.listdir(path) if n.startswith("seg-"))
+
+
+def test_append_read_commit_across_segments(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=400)
+    spool.append([_tick(i) for i in range(10)])
+    spool.sync()
+    assert len(_segments(tmp_path)) > 1
+
+    rows, pos = spool.read(4)
+    assert [r["real_time_price"] for r in rows] == [1.0, 2.0, 3.0, 4.0]
+    # 未确认前重复读取得到同样的数据
+    assert spool.read(4)[0] == rows
+    spool.commit(pos, len(rows))
+    rest, pos = spool.read(100)
+    assert len(rest) == 6
+    spool.commit(pos, len(rest))
+    assert not spool.has_backlog()
+    # 已消费的分段被删除，只剩当前写入段
+    assert len(_segments(tmp_path)) == 1
+    assert spool.stats()["replayed"] == 10
+    spool.close()
+
+
+def test_cursor_survives_restart_and_torn_tail_skipped(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append([_tick(i) for i in range(3)])
+    rows, pos = spool.read(1)
+    spool.commit(pos, 1)
+    spool.close()
+    # 模拟崩溃时写了半行
+    with open(os.path.join(tmp_path, _segments(tmp_path)[-1]), "ab") as f:
+        f.write(b'{"trade_date": "2026-')
+
+    reopened = Spool(str(tmp_path))
+    reopened.append([_tick(9)])
+    rows, _ = reopened.read(100)
+    assert [r["real_time_price"] for r in rows] == [2.0, 3.0, 10.0]
+    assert reopened.stats()["corrupt"] == 1
+    reopened.close()
+
+
+def test_size_bounded_by_evicting_oldest_segment(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=300, max_bytes=1000)
+    for i in range(40):
+        spool.append([_tick(i)])
+    stats = spool.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["evicted_segments"] > 0
+    rows, _ = spool.read(100)
+    # 保留的是最新的数据
+    assert rows[-1]["real_time_price"] == 40.0
+    spool.close()
+
+
+def test_pipeline_replays_spool_after_db_outage(tmp_path):
+    written = []
+    down = True
+
+    def sink(rows):
+        if down:
+            raise Exception("MySQL server has gone away")
+        written.extend(rows)
+
+    spool = Spool(str(tmp_path))
+    pipe = IngestPipeline(sink, flush_interval_ms=10, spool=spool, retry_interval=0.05)
+    pipe.start()
+    pipe.submit([_tick(i) for i in range(5)])
+    time.sleep(0.1)
+    pipe.submit([_tick(i) for i in range(5, 8)])
+    time.sleep(0.05)
+    assert written == []
+    assert spool.stats()["pending_bytes"] > 0
+
+    down = False
+    time.sleep(0.2)
+    pipe.stop()
+    assert [r["real_time_price"] for r in written] == [float(i + 1) for i in range(8)]
+    stats = pipe.stats()
+    assert stats["flush_errors"] >= 1
+    assert stats["spool"]["pending_bytes"] == 0
+
+
+def test_pipeline_keeps_spooled_rows_for_next_start(tmp_path):
+    sink = MagicMock(side_effect=Exception("db down"))
+    pipe = IngestPipeline(sink, flush_interval_ms=10, spool=Spool(str(tmp_path)), retry_interval=60)
+    pipe.start()
+    pipe.submit([_tick(1), _tick(2)])
+    pipe.stop()
+
+    written = []
+    pipe = IngestPipeline(written.extend, flush_interval_ms=10, spool=Spool(str(tmp_path)))
+    pipe.start()
+    time.sleep(0.1)
+    pipe.stop()
+    assert [r["real_time_price"] for r in written] == [2.0, 3.0]
+
+
+def test_poison_row_moved_to_dead_letter(tmp_path):
+    written = []
+
+    def sink(rows):
+        if any(len(r["data_type"]) > 50 for r in rows):
+            raise Exception("Data too long for column 'data_type'")
+        written.extend(rows)
+
+    spool = Spool(str(tmp_path))
+    pipe = IngestPipeline(sink, flush_interval_ms=10, spool=spool, retry_interval=0.01, poison_after=2)
+    pipe.start()
+    rows = [_tick(i) for i in range(5)]
+    rows[2] = dict(rows[2], data_type="X" * 60)
+    pipe.submit(rows)
+    time.sleep(0.2)
+    pipe.submit([_tick(9)])
+    time.sleep(0.1)
+    pipe.stop()
+    assert sorted(r["real_time_price"] for r in written) == [1.0, 2.0, 4.0, 5.0, 10.0]
+    with open(os.path.join(str(tmp_path), "dead-letter.log")) as f:
+        assert [json.loads(line)["data_type"] for line in f] == ["X" * 60]
+    stats = pipe.stats()
+    assert stats["dead_lettered"] == 1 and stats["spool"]["dead_lettered"] == 1
+    assert stats["spool"]["pending_bytes"] == 0
+
+
+def test_outage_never_dead_letters(tmp_path):
+    sink = MagicMock(side_effect=Exception("MySQL server has gone away"))
+    spool = Spool(str(tmp_path))
+    pipe = IngestPipeline(sink, flush_interval_ms=10, spool=spool, retry_interval=0.01, poison_after=1)
+    pipe.start()
+    pipe.submit([_tick(i) for i in range(8)])
+    time.sleep(0.1)
+    pipe.stop()
+    assert pipe.stats()["dead_lettered"] == 0
+    assert spool.stats()["pending_bytes"] > 0
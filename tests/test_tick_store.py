@@ -0,0 +1,122 @@
+"""TickStore 与 DatabaseManager 内存优先读取测试。"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from cache.tick_store import TickStore
+
+
+def _tick(t, price, data_type="XAU", source="gold_api", trade_date="2026-05-13"):
+    return {
+        "trade_date": trade_date,
+        "trade_time": t,
+        "data_type": data_type,
+        "real_time_price": price,
+        "recycle_price": price,
+        "source": source,
+        "currency": "USD",
+        "created_at": datetime.strptime(f"{trade_date} {t}", "%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _freeze(monkeypatch, now):
+    monkeypatch.setattr("cache.tick_store._now", lambda: now)
+
+
+def test_cold_store_defers_to_database():
+    store = TickStore()
+    assert store.latest("XAU") is None
+    assert store.latest_by_type() is None
+    assert store.since("XAU", datetime(2026, 5, 13, 9)) is None
+    assert store.day("XAU", "2026-05-13") is None
+
+
+def test_latest_merges_sources_and_skips_zero(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    store = TickStore()
+    store.extend([
+        _tick("10:00:00", 100.0, source="a"),
+        _tick("10:01:00", 101.0, source="b"),
+        _tick("10:02:00", 0, source="b"),
+    ])
+    row = store.latest("XAU")
+    assert row["recycle_price"] == 101.0
+    assert row["trade_date"] == date(2026, 5, 13)
+    assert row["trade_time"] == timedelta(hours=10, minutes=1)
+
+
+def test_window_queries_require_coverage(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    store = TickStore()
+    store.extend([_tick("10:00:00", 100.0)])
+    # 覆盖起点为首次写入时刻，更早的窗口无法由内存确定
+    assert store.since("XAU", datetime(2026, 5, 13, 9, 5)) is None
+    assert store.day("XAU", "2026-05-13") is None
+
+    store.load([_tick("09:00:00", 99.0), _tick("10:00:00", 100.0)],
+               covered_from=datetime(2026, 5, 12))
+    rows = store.since("XAU", datetime(2026, 5, 13, 9, 5))
+    assert [r["recycle_price"] for r in rows] == [100.0]
+    assert len(store.day("XAU", "2026-05-13")) == 2
+
+
+def test_history_needs_enough_rows(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    store = TickStore()
+    store.extend([_tick(f"10:0{i}:00", 100.0 + i) for i in range(3)])
+    assert store.history("XAU", 5) is None
+    assert [r["recycle_price"] for r in store.history("XAU", 2)] == [101.0, 102.0]
+
+
+def test_evicts_days_outside_window(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    store = TickStore(window_days=2)
+    store.load(
+        [_tick("10:00:00", 90.0, trade_date="2026-05-11"), _tick("10:00:00", 100.0)],
+        covered_from=datetime(2026, 5, 11),
+    )
+    assert store.stats()["ticks"] == 1
+    assert store.covers(datetime(2026, 5, 12))
+    assert not store.covers(datetime(2026, 5, 11, 12))
+
+
+def test_maxlen_truncation_shrinks_coverage(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    store = TickStore(max_ticks_per_key=2)
+    store.load([_tick("09:00:00", 1.0), _tick("09:30:00", 2.0), _tick("10:00:00", 3.0)],
+               covered_from=datetime(2026, 5, 12))
+    assert store.day("XAU", "2026-05-13") is None
+    assert len(store.since("XAU", datetime(2026, 5, 13, 9, 30))) == 2
+
+
+def test_warmed_rows_with_utc_created_at_use_trade_time(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    store = TickStore()
+    warmed = _tick("09:50:00", 99.0, source="a")
+    warmed["created_at"] = datetime(2026, 5, 13, 1, 50)  # 数据库 UTC 时钟
+    store.load([warmed], covered_from=datetime(2026, 5, 12))
+    live = _tick("10:00:00", 100.0, source="b")
+    del live["created_at"]
+    store.extend([live])
+    rows = store.since("XAU", datetime(2026, 5, 13, 9, 45))
+    assert [(r["recycle_price"], r["created_at"]) for r in rows] == [
+        (99.0, datetime(2026, 5, 13, 9, 50)), (100.0, datetime(2026, 5, 13, 10, 0))]
+    assert store.latest("XAU")["recycle_price"] == 100.0
+
+
+def test_database_manager_prefers_memory(monkeypatch):
+    _freeze(monkeypatch, datetime(2026, 5, 13, 10, 5))
+    with patch("db.ConnectionPool"):
+        from db import DatabaseManager
+
+        mm = DatabaseManager({})
+    mm.writer = MagicMock()
+    mm.reader = MagicMock()
+    mm.reader.get_latest_market_price.return_value = 1.0
+
+    assert mm.get_latest_market_price("XAU") == 1.0
+    mm.batch_insert_data([_tick("10:00:00", 100.0)])
+    mm.writer.batch_insert_data.assert_called_once()
+    assert mm.get_latest_market_price("XAU") == 100.0
+    assert mm.get_latest_data("XAU")["recycle_price"] == 100.0
+    assert mm.reader.get_latest_market_price.call_count == 1
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from db.trend_reader import TrendReader
+
+
+def _reader(results):
+    reader = TrendReader(MagicMock())
+    reader._exec = MagicMock(side_effect=results)
+    return reader
+
+
+def test_ohlc_trend_reads_rollup():
+    row = {"date": "2026-05-01", "open_price": 1, "high_price": 2, "low_price": 1, "close_price": 2}
+    reader = _reader([[row]])
+    assert reader.get_ohlc_trend("XAU", "2026-05-01", "2026-05-13") == [row]
+    assert "price_daily_rollup" in reader._exec.call_args[0][0]
+    assert reader._exec.call_count == 1
+
+
+def test_ohlc_trend_falls_back_to_ticks_when_rollup_empty():
+    reader = _reader([[], [{"date": "2026-05-13"}]])
+    assert reader.get_ohlc_trend("XAU", "2026-05-01", "2026-05-13") == [{"date": "2026-05-13"}]
+    assert "FROM price_data" in reader._exec.call_args[0][0]
+
+
+def test_partial_rollup_reads_raw_for_uncovered_prefix():
+    rolled = {"date": "2026-05-10", "open_price": 1, "high_price": 2, "low_price": 1, "close_price": 2}
+    raw = {"date": "2026-05-02", "open_price": 3, "high_price": 3, "low_price": 3, "close_price": 3}
+    reader = _reader([[rolled], [raw]])
+    assert reader.get_ohlc_trend("XAU", "2026-05-01", "2026-05-13") == [raw, rolled]
+    sql, params = reader._exec.call_args[0]
+    assert "FROM price_data" in sql and params == ("XAU", "2026-05-01", "2026-05-09")
+
+
+def test_gold_silver_ratio_prefix_params():
+    reader = _reader([[{"date": "2026-05-10", "ratio": 80}], []])
+    assert reader.get_gold_silver_ratio("2026-05-01", "2026-05-13") == [{"date": "2026-05-10", "ratio": 80}]
+    assert reader._exec.call_args[0][1] == ("2026-05-01", "2026-05-09", "2026-05-01", "2026-05-09")
+
+
+def test_last_n_days_maps_close_to_recycle_price():
+    reader = _reader([[{"date": "2026-05-07", "recycle_price": 5}]])
+    assert reader.get_last_n_days_daily_price("XAU", "2026-05-07", "2026-05-13")[0]["recycle_price"] == 5
+    assert "close_price AS recycle_price" in reader._exec.call_args[0][0]
+
+
+def test_intraday_reads_raw_ticks_before_first_minute_bar():
+    bar = {"time": timedelta(hours=10), "recycle_price": 3, "real_time_price": 3,
+           "created_at": datetime(2026, 5, 13, 10, 0)}
+    ticks = [{"time": timedelta(hours=9, minutes=58, seconds=s), "recycle_price": p, "real_time_price": p,
+              "created_at": datetime(2026, 5, 13, 9, 58, s)} for s, p in ((5, 1), (40, 2))]
+    reader = _reader([[bar], ticks])
+    rows = reader.get_intraday_trend("XAU", "2026-05-13")
+    assert [(r["time"], r["recycle_price"]) for r in rows] == [
+        (timedelta(hours=9, minutes=58), 2), (timedelta(hours=10), 3)]
+    sql, params = reader._exec.call_args[0]
+    assert "FROM price_data" in sql and params == ("XAU", "2026-05-13", timedelta(hours=10))
+
+
+def test_intraday_falls_back_to_ticks_without_minute_bars():
+    tick = {"time": timedelta(hours=9), "recycle_price": 1, "created_at": datetime(2026, 5, 13, 9, 0, 5)}
+    reader = _reader([[], [tick]])
+    assert reader.get_intraday_trend("XAU", "2026-05-13") == [tick]
@@ -31,3 +31,57 @@ def test_expires_after_ttl_seconds():
         c.set("k", "v")
         assert c.get("k", ttl=10) == "v"
         assert c.get("k", ttl=10) is None
+
+
+def test_ttl_set_per_entry():
+    c = TtlCache()
+    with patch("cache.ttl_cache.time") as mock_time:
+        mock_time.time.side_effect = [100.0, 100.0, 104.0, 106.0]
+        c.set("short", 1, ttl=5)
+        c.set("forever", 2)
+        assert c.get("short") == 1
+        assert c.get("short") is None
+    assert c.stats()["expirations"] == 1
+
+
+def test_lru_eviction_by_entry_count():
+    c = TtlCache(max_entries=2, stripes=1)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # a 变为最近使用
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_byte_budget_evicts_oldest():
+    c = TtlCache(max_bytes=2000, stripes=1)
+    c.set("a", "x" * 900)
+    c.set("b", "y" * 900)
+    c.set("c", "z" * 900)
+    assert len(c) == 2
+    assert c.get("a") is None
+    assert c.stats()["bytes"] <= 2000
+
+
+def test_sweep_removes_expired_without_access():
+    c = TtlCache()
+    with patch("cache.ttl_cache.time") as mock_time:
+        mock_time.time.side_effect = [100.0, 100.0, 200.0]
+        c.set("a", 1, ttl=10)
+        c.set("b", 2, ttl=1000)
+        assert c.sweep() == 1
+    assert len(c) == 1
+
+
+def test_stale_window_between_soft_and_hard_ttl():
+    c = TtlCache()
+    with patch("cache.ttl_cache.time") as mock_time:
+        mock_time.time.side_effect = [100.0, 105.0, 115.0, 115.0, 131.0]
+        c.set("k", "v", ttl=10, stale_ttl=20)
+        assert c.get_stale("k") == ("v", True)
+        assert c.get_stale("k") == ("v", False)
+        assert c.get("k") is None  # 普通 get 只返回新鲜值
+        assert c.get_stale("k") is None
+    assert c.stats()["stale_hits"] == 1
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+价格提醒 SSE 连接上限压测。
+
+在子进程中以 werkzeug（app.run 线程模式）或 asgi（uvicorn）启动服务，价格来源为内存桩，
+客户端用 asyncio 逐批建立 N 个长连接并等待首个 price 事件，统计成功连接数、
+服务端 RSS 与线程数。不依赖 MySQL。
+
+    python tools/sse_load_test.py --mode werkzeug --connections 10000
+    python tools/sse_load_test.py --mode asgi --connections 10000
+
+需要足够的文件描述符：ulimit -n 应大于 连接数 + 100（客户端、服务端各自计算）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+
+class _StubManager:
+    """create_app 所需的最小 DatabaseManager 替身：只提供最新价。"""
+
+    def get_latest_market_price(self, data_type: str) -> float:
+        return 500.0
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: None
+
+
+def serve(mode: str, port: int) -> None:
+    sys.path.insert(0, str(SRC))
+    from route import create_app
+
+    app = create_app(_StubManager())
+    if mode == "asgi":
+        from app import serve_asgi
+
+        serve_asgi(app, {"host": "127.0.0.1", "port": port})
+    else:
+        import logging
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        app.run(host="127.0.0.1", port=port, debug=False, use_reloader=False, threaded=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_listening(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("服务未能启动")
+
+
+def _proc_status(pid: int) -> dict:
+    out = {}
+    try:
+        for line in pathlib.Path(f"/proc/{pid}/status").read_text().splitlines():
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "Threads"):
+                out[key] = value.strip()
+    except OSError:
+        pass
+    return out
+
+
+async def _open_stream(port: int, idx: int, timeout: float):
+    """建立连接并读到第一个 price 事件；成功返回 writer（保持连接），失败返回 None。"""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+        target = 10000 + idx  # gte 永不触发，连接保持空闲
+        writer.write(
+            f"GET /api/price-alert/subscribe?data_type=XAU&target={target}&op=gte HTTP/1.1\r\n"
+            f"Host: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        await writer.drain()
+        buf = b""
+        while b"event: price" not in buf:
+            chunk = await asyncio.wait_for(reader.read(1024), timeout)
+            if not chunk:
+                writer.close()
+                return None
+            buf += chunk
+        return writer
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+
+async def run_clients(port: int, connections: int, batch: int, timeout: float, pid: int) -> dict:
+    writers = []
+    failed = 0
+    started = time.monotonic()
+    for offset in range(0, connections, batch):
+        size = min(batch, connections - offset)
+        results = await asyncio.gather(*(_open_stream(port, offset + i, timeout) for i in range(size)))
+        ok = [w for w in results if w is not None]
+        writers.extend(ok)
+        failed += size - len(ok)
+        if failed and failed >= batch:
+            # 整批失败即认为触顶，不再继续加压
+            break
+    elapsed = time.monotonic() - started
+    status = _proc_status(pid)
+    for w in writers:
+        w.close()
+    return {
+        "established": len(writers),
+        "failed": failed,
+        "seconds": round(elapsed, 1),
+        "server_rss": status.get("VmRSS"),
+        "server_threads": status.get("Threads"),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=("werkzeug", "asgi"), default="asgi")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=20.0, help="单个连接等待首个事件的秒数")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.mode, args.port)
+        return 0
+
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--mode", args.mode, "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_listening(port)
+        result = asyncio.run(run_clients(port, args.connections, args.batch, args.timeout, server.pid))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    print(f"mode={args.mode} target={args.connections} " + " ".join(f"{k}={v}" for k, v in result.items()))
+    return 0 if result["established"] == args.connections else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())